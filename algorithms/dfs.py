@@ -1,20 +1,5 @@
-def dfs(grid, start, end):
-    stack = [(start, [start])]
-    visited = set()
+from algorithms.engine import run_search
 
-    while stack:
-        node, path = stack.pop()
 
-        if node == end:
-            return visited, path
-
-        if node in visited:
-            continue
-
-        visited.add(node)
-
-        for neighbor in grid.get_neighbors(node):
-            if neighbor not in visited and not neighbor.is_obstacle:
-                stack.append((neighbor, path + [neighbor]))
-
-    return visited, None  # No path found
\ No newline at end of file
+def dfs(grid, start, end, **options):
+    return run_search("DFS", grid, start, end, **options)
@@ -0,0 +1,282 @@
+"""
+Adapter from the algorithms/ grid interface to the shared search engines.
+
+The functions in this package take a grid object with rows, cols and
+get_node(row, col), plus start/end Node objects, and return
+(visited_set, path_list), with path_list None when there is no path. They
+don't search themselves: the grid goes through the common FlatGrid protocol
+and the algorithm runs on the "flat" engine registered in
+visualization.pathfinding.ENGINES, the same code the visualizer uses.
+
+Moves come from the grid's get_neighbors(node) when it has one:
+neighbor_steps() reads the (dr, dc) steps it returns, in its order, off a
+small sample of cells, and the kernels search with exactly those steps.
+get_neighbors may leave out off-grid and obstacle cells. Grids without
+get_neighbors move 4-connected. DFS tries the steps last to first, the
+order a stack of get_neighbors() results pops them in.
+
+visited holds every cell the search reached, including end when a path is
+found, for all four algorithms.
+
+The FlatGrid snapshot and the steps are cached per grid object. Node
+attributes can change between calls, so after each search run_search()
+checks the cells it visited, and their neighbors, against the live grid:
+these are all the cells the search looked at, so if they match, the result
+is the one a search of the live grid gives. Otherwise it takes a new
+snapshot and searches again. When get_neighbors turns out to depend on the
+cell (one-way cells, rules on cost), there are no steps the kernels could
+use and the search runs on get_neighbors directly, as search_neighbors().
+"""
+import heapq
+import itertools
+import weakref
+from collections import deque, namedtuple
+
+from visualization.pathfinding import get_algorithm_function
+from visualization.search.flat_grid import FlatGrid
+from visualization.search.neighbors import FOUR_CONNECTED, NEIGHBORHOODS
+
+# FlatGrid snapshot of a grid plus the steps of its get_neighbors(); flat
+# is None for grids whose get_neighbors depends on the cell
+PreparedGrid = namedtuple("PreparedGrid", ["flat", "neighbors"])
+
+# Cells per side of the sample neighbor_steps() reads the steps off
+SAMPLE_SIDE = 4
+
+# grid -> PreparedGrid of its last search
+_prepared = weakref.WeakKeyDictionary()
+
+
+def _step_order(cells):
+    """
+    One order of all steps that agrees with every cell's own order, or
+    None when the cells contradict each other.
+    """
+    earlier = {}
+    for _, _, cell_steps in cells:
+        for i, step in enumerate(cell_steps):
+            earlier.setdefault(step, set()).update(cell_steps[:i])
+
+    steps = []
+    while earlier:
+        # Of the steps with nothing left before them, take the first seen
+        ready = [step for step, before in earlier.items() if not before - set(steps)]
+        if not ready:
+            return None
+        steps.append(ready[0])
+        del earlier[ready[0]]
+    return steps
+
+
+def _sample(grid):
+    """SAMPLE_SIDE x SAMPLE_SIDE cells spread over grid, borders included."""
+    rows = {r * (grid.rows - 1) // (SAMPLE_SIDE - 1) for r in range(SAMPLE_SIDE)}
+    cols = {c * (grid.cols - 1) // (SAMPLE_SIDE - 1) for c in range(SAMPLE_SIDE)}
+    return [(r, c) for r in sorted(rows) for c in sorted(cols)]
+
+
+def neighbor_steps(grid, cells=()):
+    """
+    The (dr, dc) steps of grid.get_neighbors, in the order it returns them.
+
+    Args:
+        cells: (row, col) cells to read as well as the sample
+
+    Returns:
+        Tuple of steps, None when grid has no get_neighbors or no cell read
+        has a neighbor
+
+    Raises:
+        ValueError: The cells read return the same steps in different orders
+    """
+    get_neighbors = getattr(grid, 'get_neighbors', None)
+    if get_neighbors is None:
+        return None
+
+    read = []
+    for r, c in itertools.chain(_sample(grid), cells):
+        cell_steps = [(node.row - r, node.col - c) for node in get_neighbors(grid.get_node(r, c))]
+        read.append((r, c, cell_steps))
+
+    steps = _step_order(read)
+    if steps is None:
+        raise ValueError("get_neighbors returns the same steps in different orders")
+    return tuple(steps) or None
+
+
+def prepare(grid, cells=()):
+    """
+    Snapshot grid for run_search(). Returns a PreparedGrid.
+
+    Args:
+        cells: (row, col) cells to read steps off besides the sample
+    """
+    try:
+        steps = neighbor_steps(grid, cells)
+    except ValueError:
+        return PreparedGrid(None, None)
+    return PreparedGrid(FlatGrid(grid), steps)
+
+
+def _matches(grid, flat, steps, cells, get_neighbors):
+    """
+    Whether the live grid still agrees with the flat snapshot at cells and
+    their neighbors by steps, and get_neighbors (if not None) returns those
+    steps there, leaving out only off-grid and obstacle cells.
+    """
+    width, blocked, cost, delay = flat.width, flat.blocked, flat.cost, flat.delay
+    node = grid.get_node
+    rows, cols = grid.rows, grid.cols
+
+    def same(n):
+        i = (n.row + 1) * width + n.col + 1
+        return (bool(n.is_obstacle) == blocked[i] and getattr(n, 'cost', 1) == cost[i]
+                and getattr(n, 'delay', 0) == (delay[i] if delay else 0))
+
+    for r, c in cells:
+        current = node(r, c)
+        if not same(current):
+            return False
+        expected = [(r + dr, c + dc) for dr, dc in steps
+                    if 0 <= r + dr < rows and 0 <= c + dc < cols]
+        for cell in expected:
+            if not same(node(*cell)):
+                return False
+        if get_neighbors is None:
+            continue
+        actual = [(n.row, n.col) for n in get_neighbors(current)]
+        if [cell for cell in expected if cell in actual] != actual:
+            return False
+        if any(cell not in actual and not node(*cell).is_obstacle for cell in expected):
+            return False
+    return True
+
+
+def run_search(algorithm, grid, start, end, prepared=None, **options):
+    # options (frontier, neighbors) are passed through to the kernel;
+    # neighbors overrides the steps read from get_neighbors
+    if prepared is None:
+        prepared = _prepared.get(grid) if _cacheable(grid) else None
+        if prepared is None:
+            prepared = prepare(grid, [(start.row, start.col), (end.row, end.col)])
+
+    for _ in range(2):
+        if prepared.flat is None:
+            break
+        visited, path = _flat_search(algorithm, prepared, start, end, dict(options))
+        cells = itertools.chain(visited, [(start.row, start.col)])
+        if "neighbors" in options:
+            steps = options["neighbors"]
+            steps = NEIGHBORHOODS[steps] if isinstance(steps, str) else steps
+            matches = _matches(grid, prepared.flat, steps, cells, None)
+        else:
+            matches = _matches(grid, prepared.flat, prepared.neighbors or FOUR_CONNECTED, cells,
+                               getattr(grid, 'get_neighbors', None))
+        if matches:
+            _remember(grid, prepared)
+            node = grid.get_node
+            visited = {node(r, c) for r, c in visited}
+            return visited, [node(r, c) for r, c in path] or None
+        # The grid changed since the snapshot, or get_neighbors gives
+        # steps the sample didn't show
+        prepared = prepare(grid, visited)
+
+    _remember(grid, prepared)
+    return search_neighbors(algorithm, grid, start, end)
+
+
+def _flat_search(algorithm, prepared, start, end, options):
+    if "neighbors" not in options and prepared.neighbors is not None:
+        steps = prepared.neighbors
+        options["neighbors"] = steps[::-1] if algorithm == "DFS" else steps
+    search = get_algorithm_function(algorithm, engine="flat")
+    return search(prepared.flat, (start.row, start.col), (end.row, end.col), **options)
+
+
+def _cacheable(grid):
+    try:
+        weakref.ref(grid)
+        hash(grid)
+    except TypeError:
+        return False
+    return True
+
+
+def _remember(grid, prepared):
+    if _cacheable(grid):
+        _prepared[grid] = prepared
+
+
+def _reconstruct_path(came_from, end):
+    path = [end]
+    while end in came_from:
+        end = came_from[end]
+        path.append(end)
+    return path[::-1]
+
+
+def search_neighbors(algorithm, grid, start, end):
+    """
+    Search straight over grid.get_neighbors, for grids whose moves depend
+    on the cell. Returns (visited_set, path_list) like run_search().
+    """
+    get_neighbors = grid.get_neighbors
+    came_from = {}
+
+    if algorithm == "BFS":
+        queue = deque([start])
+        visited = {start}
+        while queue:
+            current = queue.popleft()
+            if current == end:
+                return visited, _reconstruct_path(came_from, current)
+            for neighbor in get_neighbors(current):
+                if neighbor in visited or neighbor.is_obstacle:
+                    continue
+                visited.add(neighbor)
+                came_from[neighbor] = current
+                queue.append(neighbor)
+        return visited, None
+
+    if algorithm == "DFS":
+        stack = [(start, None)]
+        visited = set()
+        while stack:
+            current, parent = stack.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            if parent is not None:
+                came_from[current] = parent
+            if current == end:
+                return visited, _reconstruct_path(came_from, current)
+            for neighbor in get_neighbors(current):
+                if neighbor not in visited and not neighbor.is_obstacle:
+                    stack.append((neighbor, current))
+        return visited, None
+
+    # Dijkstra, and A* with the Manhattan heuristic
+    astar = algorithm == "A*"
+    counter = itertools.count()
+    heap = [(0, next(counter), start)]
+    distances = {start: 0}
+    visited = set()
+    while heap:
+        _, _, current = heapq.heappop(heap)
+        if current in visited:
+            continue
+        visited.add(current)
+        if current == end:
+            return visited, _reconstruct_path(came_from, current)
+        for neighbor in get_neighbors(current):
+            if neighbor.is_obstacle:
+                continue
+            new_cost = distances[current] + getattr(neighbor, 'cost', 1) + getattr(neighbor, 'delay', 0)
+            if neighbor not in distances or new_cost < distances[neighbor]:
+                distances[neighbor] = new_cost
+                came_from[neighbor] = current
+                priority = new_cost
+                if astar:
+                    priority += abs(neighbor.row - end.row) + abs(neighbor.col - end.col)
+                heapq.heappush(heap, (priority, next(counter), neighbor))
+    return visited, None
@@ -0,0 +1,466 @@
+"""
+Headless benchmark runner for the pathfinding engines.
+
+Sweeps every algorithm of every engine in visualization.pathfinding.ENGINES
+across GridLoader grid types, sizes and seeds, and records wall time, nodes
+expanded, peak memory and frontier operations. Results can be written as JSON or
+CSV and compared against a previously saved baseline.
+
+With --scen it runs MovingAI scenario files instead (see
+visualization/movingai.py): every query of the scenario on its map, for
+every selected engine, recording throughput and checking each path cost
+against the scenario's optimal length.
+
+Does not import pygame, so it runs on machines without a display.
+
+Examples:
+    python benchmark.py
+    python benchmark.py --sizes 100x100,500x500 --seeds 1,2 --json bench.json
+    python benchmark.py --baseline bench.json --tolerance 0.2
+    python benchmark.py --scen maps/arena.map.scen --algorithms BFS,A*,JPS
+"""
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from visualization.grid_loader import GridLoader, GridDefaults
+from visualization.movingai import load_map, load_scenarios, octile_distance
+from visualization.pathfinding import ENGINES, get_algorithm_function
+from visualization.search.frontier import count_operations
+
+RESULT_FIELDS = [
+    "engine", "algorithm", "grid", "rows", "cols", "seed",
+    "time_ms", "expanded", "path_len", "path_cost",
+    "frontier_pushes", "frontier_pops", "peak_kb",
+    "build_ms", "abstract_nodes", "abstract_edges",
+]
+CASE_KEY = ("engine", "algorithm", "grid", "rows", "cols", "seed")
+
+SCENARIO_FIELDS = [
+    "engine", "algorithm", "scen", "map", "queries",
+    "time_ms", "queries_per_s", "expanded",
+    "optimal", "suboptimal", "failed", "below_scen", "mean_stretch",
+]
+
+# Relative slack when comparing against the scenario's float lengths
+SCEN_EPSILON = 1e-6
+
+
+class FrontierCounter:
+    """
+    Context manager counting frontier pushes/pops made by the engines.
+
+    BFS, DFS, Dijkstra and A* keep their open list in the frontier classes,
+    which count_operations() counts through a wrapping frontier, whichever
+    frontier (bucket, heap, queue, stack) the search picked. JPS, the
+    bidirectional searches, HPA* and D* Lite keep a plain heapq heap as
+    their open list, so heapq calls are counted too. The frontier classes
+    bind heapq when they are imported, so no operation is counted twice.
+    DFS and bidirectional BFS use neither; their counts stay None.
+    """
+
+    def __enter__(self):
+        self._counting = count_operations()
+        self._stats = self._counting.__enter__()
+        self._heap_pushes = 0
+        self._heap_pops = 0
+        self._push, self._pop = heapq.heappush, heapq.heappop
+
+        def counting_push(heap, item):
+            self._heap_pushes += 1
+            self._push(heap, item)
+
+        def counting_pop(heap):
+            self._heap_pops += 1
+            return self._pop(heap)
+
+        heapq.heappush, heapq.heappop = counting_push, counting_pop
+        return self
+
+    def __exit__(self, *exc):
+        heapq.heappush, heapq.heappop = self._push, self._pop
+        self._counting.__exit__(*exc)
+        return False
+
+    @property
+    def pushes(self):
+        # Every search pushes its start, so 0 means nothing was counted
+        return (self._stats.pushes + self._heap_pushes) or None
+
+    @property
+    def pops(self):
+        return (self._stats.pops + self._heap_pops) if self.pushes else None
+
+
+def parse_sizes(text):
+    """Parse "30x20,100x100" into [(rows, cols), ...]."""
+    sizes = []
+    for item in text.split(","):
+        rows, cols = item.lower().split("x")
+        sizes.append((int(rows), int(cols)))
+    return sizes
+
+
+def build_grid(grid_type, rows, cols, seed, vectorized=False):
+    """Create a benchmark grid with the visualizer's start/end, both kept open."""
+    grid = GridLoader.create_grid(grid_type, rows, cols, seed=seed, vectorized=vectorized)
+    start = GridDefaults.get_start_position(rows, cols)
+    end = GridDefaults.get_end_position(rows, cols)
+    grid[start[0]][start[1]].is_obstacle = False
+    grid[end[0]][end[1]].is_obstacle = False
+    return grid, start, end
+
+
+def path_cost(grid, path):
+    """Sum of cost + delay of every cell entered along the path."""
+    return sum(grid[r][c].cost + grid[r][c].delay for r, c in path[1:])
+
+
+def run_case(func, grid, start, end, repeat=3, measure_memory=True):
+    """
+    Benchmark one search.
+
+    Timing uses the best of `repeat` plain runs. Frontier operations and
+    peak memory come from one extra instrumented run, since tracemalloc and
+    the frontier counter both slow the search down.
+
+    Engines with a prepare(grid) method (HPA*) build their preprocessed
+    data first, so time_ms is query latency and the build is reported
+    separately as build_ms. Engines with a reset() method (D* Lite) are
+    reset before every run, so time_ms is a plan from scratch rather than
+    a no-op repair of the previous one.
+    """
+    prepared = {"build_ms": None, "abstract_nodes": None, "abstract_edges": None}
+    if hasattr(func, "prepare"):
+        prepared.update(func.prepare(grid))
+
+    best = float("inf")
+    for _ in range(repeat):
+        if hasattr(func, "reset"):
+            func.reset()
+        t0 = time.perf_counter()
+        visited, path = func(grid, start, end)
+        best = min(best, time.perf_counter() - t0)
+
+    result = {
+        "time_ms": round(best * 1000, 3),
+        "expanded": len(visited),
+        "path_len": len(path),
+        "path_cost": path_cost(grid, path) if path else None,
+        "frontier_pushes": None,
+        "frontier_pops": None,
+        "peak_kb": None,
+    }
+    result.update(prepared)
+
+    if measure_memory:
+        if hasattr(func, "reset"):
+            func.reset()
+        tracemalloc.start()
+        with FrontierCounter() as frontier:
+            func(grid, start, end)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result.update(frontier_pushes=frontier.pushes, frontier_pops=frontier.pops,
+                      peak_kb=round(peak / 1024, 1))
+
+    return result
+
+
+def run_suite(engines, algorithms, grid_types, sizes, seeds, repeat=3,
+              measure_memory=True, vectorized=False, log=print):
+    """
+    Run every combination and return a list of result dicts.
+
+    algorithms=None runs everything each engine registers; algorithms an
+    engine does not register are skipped rather than falling back to BFS.
+    """
+    results = []
+    for grid_type in grid_types:
+        for rows, cols in sizes:
+            for seed in seeds:
+                grid, start, end = build_grid(grid_type, rows, cols, seed, vectorized)
+                for engine in engines:
+                    for algorithm in ENGINES[engine]:
+                        if algorithms is not None and algorithm not in algorithms:
+                            continue
+                        func = get_algorithm_function(algorithm, engine=engine)
+                        row = {
+                            "engine": engine, "algorithm": algorithm, "grid": grid_type,
+                            "rows": rows, "cols": cols, "seed": seed,
+                        }
+                        row.update(run_case(func, grid, start, end, repeat, measure_memory))
+                        results.append(row)
+                        log(format_row(row))
+    return results
+
+
+def resolve_map(scen_path, map_name, map_dir=None):
+    """
+    Find the .map file a scenario line names.
+
+    Scenario files name their map either by a path from the benchmark set's
+    root or by bare file name; both are tried in map_dir (default: the
+    scenario's own directory).
+    """
+    directory = map_dir if map_dir is not None else os.path.dirname(scen_path)
+    for candidate in (os.path.join(directory, map_name),
+                      os.path.join(directory, os.path.basename(map_name))):
+        if os.path.exists(candidate):
+            return candidate
+    raise FileNotFoundError(f"{scen_path}: map {map_name} not found in {directory or '.'}")
+
+
+def check_scenarios(grid, scenarios):
+    """
+    Scenarios whose optimal length doesn't match the map's octile distance.
+
+    A mismatch means the map or the scenario was read wrongly (or they
+    don't belong together), so the engine checks against it would be void.
+    """
+    wrong = []
+    for scenario in scenarios:
+        distance = octile_distance(grid, scenario.start, scenario.end)
+        if distance is None or abs(distance - scenario.optimal) > 1e-4 * max(1.0, scenario.optimal):
+            wrong.append((scenario, distance))
+    return wrong
+
+
+def run_scenario_case(func, grid, scenarios, reference):
+    """
+    Run one engine over every query of a scenario.
+
+    Every path cost is checked against two optima. The engines move
+    4-connected, while MovingAI's optimal lengths are octile (8-connected,
+    diagonals sqrt(2)), so a 4-connected cost lies between the scenario's
+    length and sqrt(2) times it: below it counts as below_scen (a bug).
+    The exact 4-connected optimum is the reference Dijkstra cost; a path
+    costing more counts as suboptimal, no path where the reference has one
+    as failed. mean_stretch is the average cost / scenario length.
+
+    D* Lite is reset before every query, so each one is a plan from scratch.
+    HPA* builds its abstract graph before timing starts.
+    """
+    if hasattr(func, "prepare"):
+        func.prepare(grid)
+
+    elapsed = 0.0
+    expanded = optimal = suboptimal = failed = below = 0
+    stretch = []
+    for scenario, best in zip(scenarios, reference):
+        if hasattr(func, "reset"):
+            func.reset()
+        t0 = time.perf_counter()
+        visited, path = func(grid, scenario.start, scenario.end)
+        elapsed += time.perf_counter() - t0
+        expanded += len(visited)
+
+        if not path:
+            failed += best is not None
+            continue
+        cost = path_cost(grid, path)
+        if best is not None and cost > best:
+            suboptimal += 1
+        else:
+            optimal += 1
+        if cost < scenario.optimal * (1 - SCEN_EPSILON):
+            below += 1
+        if scenario.optimal > 0:
+            stretch.append(cost / scenario.optimal)
+
+    return {
+        "queries": len(scenarios),
+        "time_ms": round(elapsed * 1000, 3),
+        "queries_per_s": round(len(scenarios) / elapsed, 1) if elapsed > 0 else None,
+        "expanded": expanded,
+        "optimal": optimal,
+        "suboptimal": suboptimal,
+        "failed": failed,
+        "below_scen": below,
+        "mean_stretch": round(sum(stretch) / len(stretch), 4) if stretch else None,
+    }
+
+
+def run_scenarios(scen_paths, engines, algorithms, map_dir=None, limit=None,
+                  check=True, log=print):
+    """
+    Run MovingAI scenario files and return a list of result dicts.
+
+    Args:
+        scen_paths: .scen files; each line's map is found with resolve_map()
+        engines, algorithms: As for run_suite()
+        map_dir: Directory holding the maps, default each .scen's directory
+        limit: Run only the first `limit` queries of each file
+        check: Verify the scenario lengths against the parsed map first
+    """
+    results = []
+    for scen_path in scen_paths:
+        scenarios = load_scenarios(scen_path)[:limit]
+        by_map = {}
+        for scenario in scenarios:
+            by_map.setdefault(scenario.map, []).append(scenario)
+
+        for map_name, queries in by_map.items():
+            grid = load_map(resolve_map(scen_path, map_name, map_dir))
+            if (grid.cols, grid.rows) != (queries[0].width, queries[0].height):
+                raise ValueError(f"{scen_path}: {map_name} is {grid.cols}x{grid.rows}, "
+                                 f"scenario says {queries[0].width}x{queries[0].height}")
+            if check:
+                wrong = check_scenarios(grid, queries)
+                log(f"{scen_path} {map_name}: {len(queries) - len(wrong)}/{len(queries)} "
+                    f"scenario lengths match the map")
+                for scenario, distance in wrong[:5]:
+                    log(f"  {scenario.start} -> {scenario.end}: scen {scenario.optimal}, map {distance}")
+
+            dijkstra = get_algorithm_function("Dijkstra", engine="flat")
+            reference = []
+            for scenario in queries:
+                path = dijkstra(grid, scenario.start, scenario.end)[1]
+                reference.append(path_cost(grid, path) if path else None)
+
+            for engine in engines:
+                for algorithm in ENGINES[engine]:
+                    if algorithms is not None and algorithm not in algorithms:
+                        continue
+                    func = get_algorithm_function(algorithm, engine=engine)
+                    row = {"engine": engine, "algorithm": algorithm,
+                           "scen": os.path.basename(scen_path), "map": map_name}
+                    row.update(run_scenario_case(func, grid, queries, reference))
+                    results.append(row)
+                    log(format_scenario_row(row))
+    return results
+
+
+def format_scenario_row(row):
+    return (f"{row['engine']:>10} {row['algorithm']:>9} {row['map']:>20} "
+            f"queries={row['queries']:<6} {row['time_ms']:>10.2f} ms  "
+            f"{row['queries_per_s']} q/s  optimal={row['optimal']} "
+            f"suboptimal={row['suboptimal']} failed={row['failed']} "
+            f"below_scen={row['below_scen']} stretch={row['mean_stretch']}")
+
+
+def format_row(row):
+    return (f"{row['engine']:>10} {row['algorithm']:>9} {row['grid']:>17} "
+            f"{row['rows']:>5}x{row['cols']:<5} seed={row['seed']:<4} "
+            f"{row['time_ms']:>10.2f} ms  expanded={row['expanded']:<9} "
+            f"path={row['path_len']:<6} pushes={row['frontier_pushes']} peak_kb={row['peak_kb']}"
+            + (f" build_ms={row['build_ms']} abstract={row['abstract_nodes']}/{row['abstract_edges']}"
+               if row.get('build_ms') is not None else ""))
+
+
+def compare_to_baseline(results, baseline, tolerance=0.25, min_ms=1.0):
+    """
+    Compare results to a baseline result list.
+
+    A case regresses when it is more than `tolerance` slower than the
+    baseline (ignoring cases faster than min_ms, which are mostly noise),
+    or when its path cost changed.
+
+    Returns:
+        List of human readable regression messages
+    """
+    by_key = {tuple(row[k] for k in CASE_KEY): row for row in baseline}
+    problems = []
+
+    for row in results:
+        key = tuple(row[k] for k in CASE_KEY)
+        old = by_key.get(key)
+        if old is None:
+            continue
+
+        name = "/".join(str(k) for k in key)
+        if row["path_cost"] != old["path_cost"]:
+            problems.append(f"{name}: path cost {old['path_cost']} -> {row['path_cost']}")
+
+        if old["time_ms"] >= min_ms and row["time_ms"] > old["time_ms"] * (1 + tolerance):
+            ratio = row["time_ms"] / old["time_ms"]
+            problems.append(f"{name}: {old['time_ms']:.2f} ms -> {row['time_ms']:.2f} ms ({ratio:.2f}x)")
+
+    return problems
+
+
+def write_json(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def write_csv(results, path, fields=RESULT_FIELDS):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pathfinding engines headlessly.")
+    parser.add_argument("--engines", default=",".join(ENGINES))
+    parser.add_argument("--algorithms", help="comma separated, default: all registered")
+    parser.add_argument("--grids", default=",".join(GridLoader.GRID_DIMENSIONS))
+    parser.add_argument("--sizes", default="20x30,100x100,300x300", help="ROWSxCOLS list")
+    parser.add_argument("--seeds", default="1,2,3")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--vectorized", action="store_true", help="generate grids with NumPy")
+    parser.add_argument("--no-memory", action="store_true", help="skip the instrumented run")
+    parser.add_argument("--json", help="write results as JSON")
+    parser.add_argument("--csv", help="write results as CSV")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--scen", help="comma separated MovingAI .scen files to run instead")
+    parser.add_argument("--map-dir", help="directory of the .scen maps, default next to each .scen")
+    parser.add_argument("--limit", type=int, help="first N queries of each .scen")
+    parser.add_argument("--no-check", action="store_true",
+                        help="skip checking scenario lengths against the map")
+    args = parser.parse_args(argv)
+
+    if args.scen:
+        results = run_scenarios(
+            scen_paths=args.scen.split(","),
+            engines=args.engines.split(","),
+            algorithms=args.algorithms.split(",") if args.algorithms else None,
+            map_dir=args.map_dir,
+            limit=args.limit,
+            check=not args.no_check,
+        )
+        if args.json:
+            write_json(results, args.json)
+        if args.csv:
+            write_csv(results, args.csv, SCENARIO_FIELDS)
+        return 1 if any(row["below_scen"] for row in results) else 0
+
+    results = run_suite(
+        engines=args.engines.split(","),
+        algorithms=args.algorithms.split(",") if args.algorithms else None,
+        grid_types=args.grids.split(","),
+        sizes=parse_sizes(args.sizes),
+        seeds=[int(s) for s in args.seeds.split(",")],
+        repeat=args.repeat,
+        measure_memory=not args.no_memory,
+        vectorized=args.vectorized,
+    )
+
+    if args.json:
+        write_json(results, args.json)
+    if args.csv:
+        write_csv(results, args.csv)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        problems = compare_to_baseline(results, baseline, args.tolerance)
+        if problems:
+            print(f"\n{len(problems)} regression(s) against {args.baseline}:")
+            for problem in problems:
+                print("  " + problem)
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
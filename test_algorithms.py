@@ -3,24 +3,27 @@ from algorithms.dfs import dfs
 from algorithms.astar import astar
 from algorithms.dijkstra import dijkstra
 
-# Dummy Node class
+# Dummy Node class (slotted, like visualization.grid_loader.Node)
 class Node:
+    __slots__ = ("row", "col", "is_obstacle", "cost", "delay", "_hash")
+
     def __init__(self, row, col, is_obstacle=False, cost=1, delay=0):
         self.row = row
         self.col = col
         self.is_obstacle = is_obstacle
         self.cost = cost
         self.delay = delay
+        # Needed for sets & dict keys; cells never move, so hash once
+        self._hash = hash((row, col))
 
     def __repr__(self):
         return f"({self.row},{self.col})"
 
-    # Needed for sets & dict keys
     def __hash__(self):
-        return hash((self.row, self.col))
+        return self._hash
 
     def __eq__(self, other):
-        return (self.row, self.col) == (other.row, other.col)
+        return self.row == other.row and self.col == other.col
 
 # Dummy Grid class
 class Grid:
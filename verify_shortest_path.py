@@ -1,5 +1,28 @@
-from visualization.pathfinding import get_algorithm_function
+import itertools
+import os
+import random
+import tempfile
+
+import numpy as np
+
+from algorithms.bfs import bfs
+from algorithms.dfs import dfs
+from algorithms.dijkstra import dijkstra
+from algorithms.engine import prepare
+from visualization.compare import compare_engines
+from visualization.grid_array import ArrayGrid
+from visualization.pathfinding import get_algorithm_function, stream_search, visited_event
 from visualization.grid_loader import GridLoader
+from visualization.movingai import load_map, load_scenarios, octile_distance
+from visualization.search.flat_grid import FlatGrid
+from visualization.search.frontier import HeapFrontier
+from visualization.search.hpa import hpa_pathfind
+from visualization.search.distance_field import build_distance_field
+from visualization.search.events import EVENT_KERNELS, FOUND
+from visualization.search.incremental import IncrementalPathfinder
+from visualization.search.kernels import astar_ids, bfs_flat, dijkstra_ids
+from visualization.search.neighbors import EIGHT_CONNECTED, FOUR_CONNECTED
+from visualization.search.waypoints import WaypointRouter, route_cost
 
 print("=" * 70)
 print("SHORTEST PATH GUARANTEE VERIFICATION")
@@ -62,6 +85,578 @@ if len(set(results.values())) == 1:
 else:
     print(f"\n  ⚠️  Different results: {results}")
 
+# Test 4: Flat engine matches reference engine
+print("\nTest 4: FLAT ENGINE vs REFERENCE (all grid types)")
+print("-" * 70)
+mismatches = []
+for grid_type in GridLoader.GRID_DIMENSIONS:
+    grid = GridLoader.create_grid(grid_type, seed=42)
+    grid[1][1].is_obstacle = False
+    for algo in ['BFS', 'Dijkstra', 'A*']:
+        reference = get_algorithm_function(algo)(grid, (1, 1), (18, 18))
+        flat = get_algorithm_function(algo, engine="flat")(grid, (1, 1), (18, 18))
+        if reference != flat:
+            mismatches.append((grid_type, algo))
+
+if not mismatches:
+    print(f"  ✅ VERIFIED: Flat engine returns identical visited order and paths")
+else:
+    print(f"  ⚠️  Mismatches: {mismatches}")
+
+# Test 5: Jump Point Search finds BFS-length paths on unweighted grids
+print("\nTest 5: JPS vs BFS (unweighted grid types)")
+print("-" * 70)
+mismatches = []
+for grid_type in ['Empty Grid', 'Random Obstacles', 'Maze Grid']:
+    for seed in range(20):
+        grid = GridLoader.create_grid(grid_type, seed=seed)
+        grid[1][1].is_obstacle = False
+        grid[18][18].is_obstacle = False
+        _, bfs_path = get_algorithm_function('BFS')(grid, (1, 1), (18, 18))
+        _, jps_path = get_algorithm_function('JPS')(grid, (1, 1), (18, 18))
+        if len(bfs_path) != len(jps_path):
+            mismatches.append((grid_type, seed, len(bfs_path), len(jps_path)))
+
+if not mismatches:
+    print(f"  ✅ VERIFIED: JPS path lengths match BFS on every grid")
+else:
+    print(f"  ⚠️  Mismatches: {mismatches}")
+
+# Test 6: Bidirectional searches find equally short/cheap paths
+print("\nTest 6: BIDIRECTIONAL vs ONE-SIDED (all grid types)")
+print("-" * 70)
+def calculate_path_cost(grid, path):
+    return sum(grid[r][c].cost + grid[r][c].delay for r, c in path[1:])
+
+mismatches = []
+for grid_type in GridLoader.GRID_DIMENSIONS:
+    for seed in range(10):
+        grid = GridLoader.create_grid(grid_type, seed=seed)
+        grid[1][1].is_obstacle = False
+        grid[18][18].is_obstacle = False
+        _, bfs_path = get_algorithm_function('BFS')(grid, (1, 1), (18, 18))
+        _, bi_bfs_path = get_algorithm_function('Bi-BFS')(grid, (1, 1), (18, 18))
+        _, dijkstra_path = get_algorithm_function('Dijkstra')(grid, (1, 1), (18, 18))
+        _, bi_astar_path = get_algorithm_function('Bi-A*')(grid, (1, 1), (18, 18))
+        if len(bfs_path) != len(bi_bfs_path):
+            mismatches.append((grid_type, seed, 'Bi-BFS'))
+        if calculate_path_cost(grid, dijkstra_path) != calculate_path_cost(grid, bi_astar_path):
+            mismatches.append((grid_type, seed, 'Bi-A*'))
+
+if not mismatches:
+    print(f"  ✅ VERIFIED: Bi-BFS matches BFS lengths, Bi-A* matches Dijkstra costs")
+else:
+    print(f"  ⚠️  Mismatches: {mismatches}")
+
+# Test 7: Component index answers unreachable queries and follows obstacle edits
+print("\nTest 7: UNREACHABLE END (component index, walls toggled)")
+print("-" * 70)
+grid = GridLoader.create_grid("Empty Grid")
+start, end = (1, 1), (18, 18)
+walls = [(17, 18), (19, 18), (18, 17), (18, 19)]
+problems = []
+for blocked in (True, False):
+    for r, c in walls:
+        grid[r][c].is_obstacle = blocked
+    for engine in ("reference", "flat"):
+        for algo in ['BFS', 'Dijkstra', 'A*', 'DFS']:
+            visited, path = get_algorithm_function(algo, engine=engine)(grid, start, end)
+            if blocked and (visited or path):
+                problems.append((engine, algo, "searched a sealed-off end"))
+            if not blocked and not path:
+                problems.append((engine, algo, "no path after reopening"))
+
+if not problems:
+    print(f"  ✅ VERIFIED: Sealed end answered without searching, path found again after reopening")
+else:
+    print(f"  ⚠️  Problems: {problems}")
+
+# Test 8: HPA* paths are valid and within the documented error bound
+print("\nTest 8: HPA* vs DIJKSTRA (all grid types, error bound)")
+print("-" * 70)
+def border_crossings(path, cluster_size):
+    return sum(1 for (r1, c1), (r2, c2) in zip(path, path[1:])
+               if r1 // cluster_size != r2 // cluster_size or c1 // cluster_size != c2 // cluster_size)
+
+problems = []
+cluster_size = hpa_pathfind.cluster_size
+for grid_type in GridLoader.GRID_DIMENSIONS:
+    for seed in range(10):
+        grid = GridLoader.create_grid(grid_type, seed=seed)
+        grid[1][1].is_obstacle = False
+        grid[18][18].is_obstacle = False
+        _, dijkstra_path = get_algorithm_function('Dijkstra')(grid, (1, 1), (18, 18))
+        _, hpa_path = get_algorithm_function('HPA*')(grid, (1, 1), (18, 18))
+        if bool(dijkstra_path) != bool(hpa_path):
+            problems.append((grid_type, seed, "reachability differs"))
+            continue
+        if not hpa_path:
+            continue
+        steps_ok = all(abs(r1 - r2) + abs(c1 - c2) == 1 and not grid[r2][c2].is_obstacle
+                       for (r1, c1), (r2, c2) in zip(hpa_path, hpa_path[1:]))
+        w_max = max(grid[r][c].cost + grid[r][c].delay
+                    for r in range(len(grid)) for c in range(len(grid[0])))
+        bound = (calculate_path_cost(grid, dijkstra_path)
+                 + border_crossings(dijkstra_path, cluster_size) * 2 * (cluster_size // 2) * w_max)
+        if not steps_ok or calculate_path_cost(grid, hpa_path) > bound:
+            problems.append((grid_type, seed, "invalid path or bound exceeded"))
+
+if not problems:
+    print(f"  ✅ VERIFIED: HPA* paths are connected and within the error bound")
+else:
+    print(f"  ⚠️  Problems: {problems}")
+
+# Test 9: Bucket queue and heap frontiers expand cells in the same order
+print("\nTest 9: BUCKET QUEUE vs HEAP FRONTIER (Dijkstra and A*)")
+print("-" * 70)
+mismatches = []
+for grid_type in GridLoader.GRID_DIMENSIONS:
+    for seed in range(5):
+        flat = FlatGrid(GridLoader.create_grid(grid_type, seed=seed))
+        s, t = flat.index((1, 1)), flat.index((18, 18))
+        for kernel in (dijkstra_ids, astar_ids):
+            if kernel(flat, s, t) != kernel(flat, s, t, HeapFrontier(flat.size)):
+                mismatches.append((grid_type, seed, kernel.__name__))
+
+# With 8 steps a search may push 8 * size + 1 times; the packed heap keys
+# must not let the push counter spill into the priority
+frontier = HeapFrontier(size=2, degree=8)
+frontier.push(2, 1)
+for _ in range(8 * 2):
+    frontier.push(1, 0)
+if list(frontier) != [0] * 16 + [1]:
+    mismatches.append("HeapFrontier push order with 8 steps")
+
+if not mismatches:
+    print(f"  ✅ VERIFIED: Bucket queue gives identical visited order and paths")
+else:
+    print(f"  ⚠️  Mismatches: {mismatches}")
+
+# Test 10: Every engine charges cost + delay, including the algorithms/ package
+print("\nTest 10: DELAYS (reference vs flat vs algorithms/, all grid types)")
+print("-" * 70)
+class NodeGrid:
+    """The rows/cols/get_node grid interface algorithms/ is written for."""
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.rows, self.cols = len(nodes), len(nodes[0])
+
+    def get_node(self, row, col):
+        return self.nodes[row][col]
+
+
+mismatches = []
+for grid_type in GridLoader.GRID_DIMENSIONS:
+    grid = GridLoader.create_grid(grid_type, seed=7)
+    grid[1][1].is_obstacle = False
+    grid[18][18].is_obstacle = False
+    rng = random.Random(7)
+    for _ in range(60):
+        grid[rng.randrange(len(grid))][rng.randrange(len(grid[0]))].delay = rng.randint(1, 9)
+    for algo in ['Dijkstra', 'A*']:
+        if get_algorithm_function(algo)(grid, (1, 1), (18, 18)) != \
+                get_algorithm_function(algo, engine="flat")(grid, (1, 1), (18, 18)):
+            mismatches.append((grid_type, algo))
+    _, path = get_algorithm_function('Dijkstra')(grid, (1, 1), (18, 18))
+    node_grid = NodeGrid(grid)
+    _, node_path = dijkstra(node_grid, node_grid.get_node(1, 1), node_grid.get_node(18, 18))
+    node_path = [(node.row, node.col) for node in node_path or []]
+    if calculate_path_cost(grid, path) != calculate_path_cost(grid, node_path):
+        mismatches.append((grid_type, 'algorithms.dijkstra'))
+
+if not mismatches:
+    print(f"  ✅ VERIFIED: All engines agree on delayed grids")
+else:
+    print(f"  ⚠️  Mismatches: {mismatches}")
+
+# Test 11: D* Lite stays optimal across grid edits and repairs instead of replanning
+print("\nTest 11: D* LITE vs DIJKSTRA (random edits, all grid types)")
+print("-" * 70)
+mismatches = []
+initial_work = repair_work = 0
+for grid_type in GridLoader.GRID_DIMENSIONS:
+    grid = GridLoader.create_grid(grid_type, seed=3)
+    grid[1][1].is_obstacle = False
+    grid[18][18].is_obstacle = False
+    planner = IncrementalPathfinder()
+    rng = random.Random(3)
+    for step in range(30):
+        visited, path = planner(grid, (1, 1), (18, 18))
+        _, dijkstra_path = get_algorithm_function('Dijkstra')(grid, (1, 1), (18, 18))
+        if bool(path) != bool(dijkstra_path) or \
+                calculate_path_cost(grid, path) != calculate_path_cost(grid, dijkstra_path):
+            mismatches.append((grid_type, step))
+        if step == 0:
+            initial_work += len(visited)
+        else:
+            repair_work += len(visited)
+        r, c = rng.randrange(1, 19), rng.randrange(1, 19)
+        if (r, c) not in ((1, 1), (18, 18)):
+            grid[r][c].is_obstacle = not grid[r][c].is_obstacle
+        grid[rng.randrange(20)][rng.randrange(20)].delay = rng.randint(0, 5)
+
+if not mismatches:
+    print(f"  ✅ VERIFIED: D* Lite matches Dijkstra costs after every edit "
+          f"(first plans expanded {initial_work} cells, all later repairs {repair_work})")
+else:
+    print(f"  ⚠️  Mismatches: {mismatches}")
+
+# Test 12: Event streams replay exactly what the list-returning kernels return
+print("\nTest 12: EVENT STREAMS vs KERNELS (all grid types)")
+print("-" * 70)
+mismatches = []
+for grid_type in GridLoader.GRID_DIMENSIONS:
+    grid = GridLoader.create_grid(grid_type, seed=5)
+    for algo in EVENT_KERNELS:
+        kind = visited_event(algo)
+        visited, path = [], []
+        for event in stream_search(algo, grid, (1, 1), (18, 18)):
+            if event[0] == kind:
+                visited.append(event[1])
+            elif event[0] == FOUND:
+                path = event[1]
+        if (visited, path) != get_algorithm_function(algo, engine="flat")(grid, (1, 1), (18, 18)):
+            mismatches.append((grid_type, algo))
+
+if not mismatches:
+    print(f"  ✅ VERIFIED: Streamed events reproduce every kernel's visited order and path")
+else:
+    print(f"  ⚠️  Mismatches: {mismatches}")
+
+# Test 13: Waypoint routes take the cheapest order and stitch legs correctly
+print("\nTest 13: WAYPOINT ROUTING vs EVERY ORDER (all grid types)")
+print("-" * 70)
+mismatches = []
+router = WaypointRouter()
+for grid_type in GridLoader.GRID_DIMENSIONS:
+    grid = GridLoader.create_grid(grid_type, seed=11)
+    rng = random.Random(11)
+    stops = [(1, 1), (18, 18)]
+    waypoints = []
+    while len(waypoints) < 5:
+        cell = (rng.randrange(20), rng.randrange(20))
+        if cell not in stops + waypoints:
+            waypoints.append(cell)
+    for r, c in stops + waypoints:
+        grid[r][c].is_obstacle = False
+
+    matrix = router.leg_matrix(grid, (1, 1), (18, 18), waypoints)
+    best = min(route_cost(matrix, [0, *order, 6]) for order in itertools.permutations(range(1, 6)))
+    order, path, cost = router.route(grid, (1, 1), (18, 18), waypoints)
+    _, leg_path = router.pathfinder(get_algorithm_function('Dijkstra', engine="flat"), waypoints)(
+        grid, (1, 1), (18, 18))
+    if order is None:
+        if best != float('inf'):
+            mismatches.append((grid_type, 'missed route'))
+    elif cost != best or calculate_path_cost(grid, path) != best or \
+            calculate_path_cost(grid, leg_path) != best or not set(waypoints) <= set(path):
+        mismatches.append((grid_type, cost, best))
+
+# An unreachable waypoint means no route, in either order
+grid = ArrayGrid(5, 5)
+grid[3][4].is_obstacle = True
+grid[4][3].is_obstacle = True
+for waypoints in ([(0, 4), (4, 4)], [(4, 4), (0, 4)]):
+    if router.route(grid, (0, 0), (2, 2), waypoints)[0] is not None:
+        mismatches.append(("unreachable waypoint", waypoints))
+
+# Legs searched once stay cached while the grid is unchanged
+searched = []
+
+
+def counting_dijkstra(grid, start, end):
+    searched.append((start, end))
+    return get_algorithm_function('Dijkstra', engine="flat")(grid, start, end)
+
+
+grid = GridLoader.create_grid("Empty Grid")
+first = router.pathfinder(counting_dijkstra, [(5, 5)])(grid, (1, 1), (18, 18))
+again = router.pathfinder(counting_dijkstra, [(5, 5)])(grid, (1, 1), (18, 18))
+if again != first or len(searched) != 2:
+    mismatches.append(("leg cache", searched))
+grid[10][10].is_obstacle = True
+router.pathfinder(counting_dijkstra, [(5, 5)])(grid, (1, 1), (18, 18))
+if len(searched) != 4:
+    mismatches.append(("leg cache after an edit", searched))
+
+if not mismatches:
+    print(f"  ✅ VERIFIED: Routes visit every waypoint at the cheapest order's cost, legs are cached")
+else:
+    print(f"  ⚠️  Mismatches: {mismatches}")
+
+# Test 14: Compare-all on a process pool matches running each engine here
+print("\nTest 14: COMPARE ALL (process pool on shared memory vs in-process)")
+print("-" * 70)
+mismatches = []
+grid = GridLoader.create_grid("Weighted Grid", seed=13)
+grid[1][1].is_obstacle = False
+grid[18][18].is_obstacle = False
+for result in compare_engines(grid, (1, 1), (18, 18), workers=2):
+    visited, path = get_algorithm_function(result.algorithm, engine="flat")(grid, (1, 1), (18, 18))
+    if (result.visited, result.path) != (list(visited), list(path)) or \
+            result.cost != (calculate_path_cost(grid, path) if path else None):
+        mismatches.append(result.algorithm)
+
+if not mismatches:
+    print(f"  ✅ VERIFIED: Every engine gives the same result in a pool worker")
+else:
+    print(f"  ⚠️  Mismatches: {mismatches}")
+
+# Test 15: Saved grid files load back identical and search the same
+print("\nTest 15: GRID FILES (save, then memory-mapped load)")
+print("-" * 70)
+mismatches = []
+with tempfile.TemporaryDirectory() as directory:
+    for grid_type in GridLoader.GRID_DIMENSIONS:
+        grid = GridLoader.create_grid(grid_type, seed=15)
+        grid[1][1].is_obstacle = False
+        grid[18][18].is_obstacle = False
+        path = GridLoader.save_grid(grid, os.path.join(directory, "test.grid"))
+        loaded = GridLoader.load_grid(path)
+        original = ArrayGrid.from_nodes(grid)
+        if any((getattr(loaded, plane) != getattr(original, plane)).any()
+               for plane in ("obstacle", "cost", "delay", "terrain")):
+            mismatches.append(f"{grid_type} cells")
+        for algo in ("BFS", "Dijkstra", "A*"):
+            algorithm_func = get_algorithm_function(algo, engine="flat")
+            if algorithm_func(loaded, (1, 1), (18, 18)) != algorithm_func(grid, (1, 1), (18, 18)):
+                mismatches.append(f"{grid_type} {algo}")
+        del loaded
+
+    # Widened cost/delay planes keep their values
+    grid = ArrayGrid(4, 4)
+    grid[0][1].cost = 300
+    grid[1][1].cost = 2.5
+    grid[2][2].delay = 3_000_000_000
+    path = GridLoader.save_grid(grid, os.path.join(directory, "wide.grid"))
+    loaded = GridLoader.load_grid(path)
+    if loaded.cost[0, 1] != 300 or loaded.cost[1, 1] != 2.5 or loaded.delay[2, 2] != 3_000_000_000:
+        mismatches.append("wide costs")
+    del loaded
+
+    # Version 1 files (no dtype codes) still open
+    grid = ArrayGrid(3, 3)
+    grid[1][1].cost = 7
+    path = GridLoader.save_grid(grid, os.path.join(directory, "v1.grid"))
+    with open(path, "r+b") as f:
+        f.seek(8)
+        f.write(b"\x01\x00\x40\x00\x00\x00\x00\x00")
+    loaded = GridLoader.load_grid(path)
+    if loaded.cost[1, 1] != 7 or loaded.cost.dtype != np.uint8:
+        mismatches.append("version 1 file")
+    del loaded
+
+if not mismatches:
+    print(f"  ✅ VERIFIED: Every preset and wide/fractional costs round-trip through a grid file")
+else:
+    print(f"  ⚠️  Mismatches: {mismatches}")
+
+# Test 16: MovingAI maps and scenarios, checked by hand
+print("\nTest 16: MOVINGAI IMPORT (.map/.scen)")
+print("-" * 70)
+problems = []
+with tempfile.TemporaryDirectory() as directory:
+    map_path = os.path.join(directory, "walls.map")
+    with open(map_path, "wb") as f:
+        f.write(b"type octile\r\nheight 4\r\nwidth 5\r\nmap\r\n"
+                b".....\r\n.@@@.\r\n..S..\r\nGTW..\r\n")
+    scen_path = os.path.join(directory, "walls.map.scen")
+    with open(scen_path, "w") as f:
+        # Around the wall: 6 either way, no diagonal can cut its corners
+        f.write("version 1\n0\twalls.map\t5\t4\t0\t0\t4\t2\t6.00000000\n"
+                # (2, 0) -> (0, 4) goes up the left side, then along the top
+                "0\twalls.map\t5\t4\t0\t2\t4\t0\t6.00000000\n"
+                # One diagonal step from (2, 3) to (3, 4), then along the bottom row: 1 + sqrt(2)
+                "0\twalls.map\t5\t4\t2\t2\t4\t3\t2.41421356\n")
+
+    grid = load_map(map_path)
+    blocked = [(r, c) for r in range(grid.rows) for c in range(grid.cols) if grid[r][c].is_obstacle]
+    if (grid.rows, grid.cols) != (4, 5) or blocked != [(1, 1), (1, 2), (1, 3), (3, 1), (3, 2)]:
+        problems.append(f"map parsed as {grid.rows}x{grid.cols}, obstacles {blocked}")
+    if grid[3][2].terrain != "water":
+        problems.append("water cell lost its terrain")
+
+    for scenario in load_scenarios(scen_path):
+        distance = octile_distance(grid, scenario.start, scenario.end)
+        if distance is None or abs(distance - scenario.optimal) > 1e-6:
+            problems.append(f"{scenario.start}->{scenario.end}: octile {distance}, scen {scenario.optimal}")
+        # 4-connected costs lie between the octile length and sqrt(2) times it
+        path = get_algorithm_function("A*", engine="flat")(grid, scenario.start, scenario.end)[1]
+        cost = calculate_path_cost(grid, path)
+        if not scenario.optimal - 1e-6 <= cost <= scenario.optimal * 2 ** 0.5 + 1e-6:
+            problems.append(f"{scenario.start}->{scenario.end}: A* cost {cost}, scen {scenario.optimal}")
+
+if not problems:
+    print(f"  ✅ VERIFIED: Maps, scenarios and octile lengths read correctly")
+else:
+    print(f"  ⚠️  Problems: {problems}")
+
+# Test 17: vectorized only changes the grid types that draw from NumPy
+print("\nTest 17: VECTORIZED GENERATION (deterministic grid types unaffected)")
+print("-" * 70)
+mismatches = []
+for grid_type in ("Empty Grid", "Maze Grid", "Terrain Grid"):
+    plain = ArrayGrid.from_nodes(GridLoader.create_grid(grid_type, seed=17))
+    vectorized = ArrayGrid.from_nodes(GridLoader.create_grid(grid_type, seed=17, vectorized=True))
+    if (plain.obstacle != vectorized.obstacle).any() or (plain.cost != vectorized.cost).any():
+        mismatches.append(grid_type)
+
+if not mismatches:
+    print(f"  ✅ VERIFIED: Same seed, same grid with or without vectorized")
+else:
+    print(f"  ⚠️  Mismatches: {mismatches}")
+
+# Test 18: The 4-connected component shortcut stays out of 8-connected searches
+print("\nTest 18: UNREACHABLE SHORTCUT vs NEIGHBORHOODS (diagonal-only corridor)")
+print("-" * 70)
+problems = []
+grid = ArrayGrid(3, 3)
+grid.obstacle[:] = True
+for i in range(3):
+    grid.obstacle[i, i] = False
+if bfs_flat(grid, (0, 0), (2, 2)) != ([], []):
+    problems.append("4-connected search crossed a diagonal")
+if bfs_flat(grid, (0, 0), (2, 2), neighbors="8")[1] != [(0, 0), (1, 1), (2, 2)]:
+    problems.append("8-connected bfs_flat")
+events = list(stream_search("BFS", grid, (0, 0), (2, 2), neighbors="8"))
+if events[-1] != (FOUND, [(0, 0), (1, 1), (2, 2)]):
+    problems.append("8-connected stream_search")
+try:
+    stream_search("BFS", grid, (0, 0), (2, 2), engine="reference", neighbors="8")
+    problems.append("reference stream_search accepted neighbors")
+except ValueError:
+    pass
+
+if not problems:
+    print(f"  ✅ VERIFIED: Diagonal steps are searched, not cut short by 4-connected labels")
+else:
+    print(f"  ⚠️  Problems: {problems}")
+
+# Test 19: Costs above 255 and fractional costs survive the array planes
+print("\nTest 19: WIDE AND FRACTIONAL COSTS (cost 300 wall, cost 2.5 cells)")
+print("-" * 70)
+problems = []
+grid = GridLoader.create_grid("Empty Grid")
+for r in range(len(grid) - 1):
+    grid[r][10].cost = 300
+for c in range(5, 15):
+    grid[5][c].cost = 2.5
+
+array_grid = ArrayGrid.from_nodes(grid)
+if array_grid.cost[0, 10] != 300 or array_grid.cost[5, 6] != 2.5:
+    problems.append("ArrayGrid.from_nodes")
+
+_, path = get_algorithm_function('Dijkstra')(grid, (1, 1), (18, 18))
+expected = calculate_path_cost(grid, path)
+for algo in ['Dijkstra', 'A*']:
+    _, flat_path = get_algorithm_function(algo, engine="flat")(grid, (1, 1), (18, 18))
+    if calculate_path_cost(grid, flat_path) != expected:
+        problems.append(f"flat {algo}")
+node_grid = NodeGrid(grid)
+_, node_path = dijkstra(node_grid, node_grid.get_node(1, 1), node_grid.get_node(18, 18))
+if calculate_path_cost(grid, [(node.row, node.col) for node in node_path or []]) != expected:
+    problems.append("algorithms.dijkstra")
+field = build_distance_field(grid, (1, 1))
+if field.distance((18, 18)) != expected or field.distance((5, 5)) != 9.5:
+    problems.append("distance field")
+try:
+    get_algorithm_function('Bi-A*', engine="flat")(grid, (1, 1), (18, 18))
+    problems.append("Bi-A* accepted fractional costs")
+except ValueError:
+    pass
+
+if not problems:
+    print(f"  ✅ VERIFIED: Path cost {expected} on all engines, Bi-A* rejects fractional costs")
+else:
+    print(f"  ⚠️  Problems: {problems}")
+
+# Test 20: algorithms/ searches with the grid's own get_neighbors
+print("\nTest 20: GET_NEIGHBORS HONORED (step order, diagonals, position rules)")
+print("-" * 70)
+
+
+class StepGrid(NodeGrid):
+    """NodeGrid whose get_neighbors returns the in-bounds cells of steps."""
+
+    def __init__(self, nodes, steps):
+        super().__init__(nodes)
+        self.steps = steps
+
+    def get_neighbors(self, node):
+        cells = [(node.row + dr, node.col + dc) for dr, dc in self.steps]
+        return [self.nodes[r][c] for r, c in cells if 0 <= r < self.rows and 0 <= c < self.cols]
+
+
+def stack_dfs(grid, start, end):
+    """The original algorithms/dfs.py: a stack of (node, path) entries."""
+    stack = [(start, [start])]
+    seen = set()
+    while stack:
+        node, path = stack.pop()
+        if node == end:
+            return path
+        if node in seen:
+            continue
+        seen.add(node)
+        for neighbor in grid.get_neighbors(node):
+            if neighbor not in seen and not neighbor.is_obstacle:
+                stack.append((neighbor, path + [neighbor]))
+    return None
+
+
+problems = []
+nodes = GridLoader.create_grid("Maze Grid", seed=20)
+nodes[1][1].is_obstacle = False
+nodes[18][18].is_obstacle = False
+for steps in [((1, 0), (-1, 0), (0, 1), (0, -1)), ((0, -1), (-1, 0), (0, 1), (1, 0))]:
+    step_grid = StepGrid(nodes, steps)
+    start, end = step_grid.get_node(1, 1), step_grid.get_node(18, 18)
+    if dfs(step_grid, start, end)[1] != stack_dfs(step_grid, start, end):
+        problems.append(f"DFS order {steps}")
+
+diagonal_grid = StepGrid(GridLoader.create_grid("Empty Grid"), EIGHT_CONNECTED)
+visited, path = bfs(diagonal_grid, diagonal_grid.get_node(0, 0), diagonal_grid.get_node(5, 5))
+if len(path) != 6 or diagonal_grid.get_node(5, 5) not in visited:
+    problems.append("8-connected get_neighbors")
+prepared = prepare(diagonal_grid)
+if bfs(diagonal_grid, diagonal_grid.get_node(0, 0), diagonal_grid.get_node(5, 5), prepared=prepared)[1] != path:
+    problems.append("prepared grid")
+
+
+class CheckerGrid(StepGrid):
+    """Only moves right from even columns: a position-dependent rule."""
+
+    def get_neighbors(self, node):
+        return [n for n in super().get_neighbors(node) if node.col % 2 == 0 or n.col <= node.col]
+
+
+# Position-dependent moves fall back to searching get_neighbors directly
+checker_grid = CheckerGrid(GridLoader.create_grid("Empty Grid"), FOUR_CONNECTED)
+start = checker_grid.get_node(0, 0)
+visited, path = bfs(checker_grid, start, checker_grid.get_node(5, 5))
+if path is not None or {(node.row, node.col) for node in visited} != \
+        {(r, c) for r in range(checker_grid.rows) for c in range(2)}:
+    problems.append("position-dependent get_neighbors")
+if dfs(checker_grid, start, checker_grid.get_node(7, 1))[1] != \
+        stack_dfs(checker_grid, start, checker_grid.get_node(7, 1)):
+    problems.append("position-dependent DFS order")
+
+# The cached snapshot notices edits made after the first search
+step_grid = StepGrid(GridLoader.create_grid("Empty Grid"), FOUR_CONNECTED)
+start, end = step_grid.get_node(0, 0), step_grid.get_node(0, 4)
+dijkstra(step_grid, start, end)
+step_grid.get_node(0, 2).is_obstacle = True
+step_grid.get_node(1, 3).cost = 5
+visited, path = dijkstra(step_grid, start, end)
+if calculate_path_cost(step_grid.nodes, [(node.row, node.col) for node in path]) != 8:
+    problems.append("edit after a cached search")
+
+if not problems:
+    print(f"  ✅ VERIFIED: Steps and order come from get_neighbors, DFS matches the stack version")
+else:
+    print(f"  ⚠️  Problems: {problems}")
+
 print("\n" + "=" * 70)
 print("CONCLUSION: Green tiles show the CORRECT and SHORTEST path! ✅")
 print("=" * 70)
@@ -0,0 +1,142 @@
+"""
+Run every registered algorithm on the same query, in parallel.
+
+compare_engines() puts the grid in shared memory once (SharedArrayGrid) and
+hands one algorithm per task to a process pool, so comparing the whole
+registry on a big grid takes about as long as its slowest engine instead
+of the sum of all of them. Each worker times its own engine call, so the
+reported seconds are the engine's latency, not pool overhead.
+
+Visited lists come back from the workers as packed int32 cell numbers
+(row * cols + col), which pickle far faster than lists of tuples, and are
+unpacked to (row, col) tuples here.
+
+The pool starts its workers with the platform's default method unless given
+an mp_context. Forking copies every thread's locks in whatever state they
+are in, so a caller with other threads running (the pygame pages) should
+pass multiprocessing.get_context("spawn"). A cancel event stops waiting
+for the pool: queued algorithms are dropped and running ones finish in the
+background.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait
+import os
+import time
+
+import numpy as np
+
+from visualization.grid_array import ArrayGrid
+from visualization.pathfinding import ENGINES, get_algorithm_function
+from visualization.search.batch import SharedArrayGrid
+from visualization.search.incremental import IncrementalPathfinder
+
+ComparisonResult = namedtuple("ComparisonResult", ["algorithm", "visited", "path", "cost", "seconds"])
+
+# How often a cancellable comparison checks its cancel event
+CANCEL_POLL_SECONDS = 0.05
+
+
+def compare_engines(grid, start, end, algorithms=None, engine="flat", workers=None,
+                    mp_context=None, cancel=None):
+    """
+    Run several algorithms on one (start, end) query.
+
+    Args:
+        grid: ArrayGrid, 2D list of Node objects or node grid
+        start, end: (row, col) tuples
+        algorithms: Names to run, default every algorithm in ENGINES[engine]
+        engine: Key into ENGINES, as for get_algorithm_function()
+        workers: Worker processes, default one per algorithm up to the CPU
+            count. 1 runs every algorithm in this process, one after another
+        mp_context: multiprocessing context the pool starts workers with,
+            default the platform's
+        cancel: Optional threading.Event; once set, the comparison stops
+            and returns None
+
+    Returns:
+        List of ComparisonResult(algorithm, visited, path, cost, seconds) in
+        algorithm order. cost is the path's cost + delay, None without a
+        path; seconds is the engine call's wall time. None if cancelled.
+    """
+    if not isinstance(grid, ArrayGrid):
+        grid = ArrayGrid.from_nodes(grid)
+    algorithms = list(algorithms if algorithms is not None else ENGINES[engine])
+    if workers is None:
+        workers = min(len(algorithms), os.cpu_count() or 1)
+
+    tasks = [(algorithm, engine, start, end) for algorithm in algorithms]
+    packed = None
+    if workers <= 1:
+        packed = []
+        for task in tasks:
+            if cancel is not None and cancel.is_set():
+                return None
+            packed.append(_run_algorithm(grid, task))
+    else:
+        with SharedArrayGrid(grid) as shared:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                       initializer=_init_worker, initargs=(shared.spec,))
+            try:
+                packed = _pool_results(pool, tasks, cancel)
+            finally:
+                # Cancelled: drop the queued tasks and don't wait for running ones
+                pool.shutdown(wait=packed is not None, cancel_futures=True)
+    if packed is None:
+        return None
+
+    results = []
+    for algorithm, visited, path, cost, seconds in packed:
+        rows, cols = np.divmod(visited, grid.cols)
+        results.append(ComparisonResult(
+            algorithm, list(zip(rows.tolist(), cols.tolist())), path, cost, seconds))
+    return results
+
+
+def _path_cost(grid, path):
+    """cost + delay of every cell entered along path, None for no path."""
+    if not path:
+        return None
+    rows, cols = np.array(path[1:], dtype=np.int64).reshape(-1, 2).T
+    return (grid.cost[rows, cols].astype(np.result_type(grid.cost, np.int64)).sum()
+            + grid.delay[rows, cols].sum()).item()
+
+
+def _pool_results(pool, tasks, cancel):
+    """Every task's result in task order, or None once cancel is set."""
+    futures = [pool.submit(_run_task, task) for task in tasks]
+    pending = futures
+    while pending:
+        if cancel is not None and cancel.is_set():
+            return None
+        _, pending = wait(pending, timeout=CANCEL_POLL_SECONDS)
+    return [future.result() for future in futures]
+
+
+def _run_algorithm(grid, task):
+    """Run and time one algorithm. Returns (algorithm, packed visited, path, cost, seconds)."""
+    algorithm, engine, start, end = task
+    algorithm_func = get_algorithm_function(algorithm, engine)
+    if isinstance(algorithm_func, IncrementalPathfinder):
+        # The shared instance may already hold a plan for this grid; time a
+        # full plan like every other engine's
+        algorithm_func = IncrementalPathfinder()
+
+    began = time.perf_counter()
+    visited, path = algorithm_func(grid, start, end)
+    seconds = time.perf_counter() - began
+
+    packed = np.fromiter((r * grid.cols + c for r, c in visited), dtype=np.int32, count=len(visited))
+    return algorithm, packed, list(path), _path_cost(grid, path), seconds
+
+
+# Per-worker ArrayGrid, set up once by the pool initializer
+_worker_grid = None
+
+
+def _init_worker(spec):
+    global _worker_grid
+    _worker_grid = SharedArrayGrid.attach(spec)
+
+
+def _run_task(task):
+    return _run_algorithm(_worker_grid, task)
@@ -0,0 +1,262 @@
+"""
+Compact NumPy-backed grid representation.
+
+Instead of one Node object per cell, an ArrayGrid keeps every cell attribute
+in its own contiguous array. Indexing with grid[r][c] returns a lightweight
+view that behaves like a Node, so code written against the old
+list-of-lists grids (pathfinding, GridRenderer, GridUtils) keeps working.
+"""
+import itertools
+
+import numpy as np
+
+# Terrain names are stored as small integer codes into this table
+TERRAIN_TYPES = ("normal", "water", "sand", "road")
+TERRAIN_CODES = {name: code for code, name in enumerate(TERRAIN_TYPES)}
+
+# Grid versions come from one global counter, so a version number alone
+# identifies both the grid and the state it was in
+_versions = itertools.count(1)
+
+
+class CellView:
+    """Node-like view of a single cell of an ArrayGrid."""
+
+    __slots__ = ("_grid", "row", "col")
+
+    def __init__(self, grid, row, col):
+        self._grid = grid
+        self.row = row
+        self.col = col
+
+    @property
+    def is_obstacle(self):
+        return bool(self._grid.obstacle[self.row, self.col])
+
+    @is_obstacle.setter
+    def is_obstacle(self, value):
+        self._grid.set_obstacle(self.row, self.col, value)
+
+    @property
+    def cost(self):
+        return self._grid.cost[self.row, self.col].item()
+
+    @cost.setter
+    def cost(self, value):
+        self._grid.set_number("cost", self.row, self.col, value)
+
+    @property
+    def delay(self):
+        return self._grid.delay[self.row, self.col].item()
+
+    @delay.setter
+    def delay(self, value):
+        self._grid.set_number("delay", self.row, self.col, value)
+
+    @property
+    def terrain(self):
+        return TERRAIN_TYPES[self._grid.terrain[self.row, self.col]]
+
+    @terrain.setter
+    def terrain(self, value):
+        self._grid.terrain[self.row, self.col] = TERRAIN_CODES[value]
+        self._grid.mark_changed(obstacles=False)
+
+    def __repr__(self):
+        return f"({self.row},{self.col})"
+
+    def __hash__(self):
+        return hash((self.row, self.col))
+
+    def __eq__(self, other):
+        return (self.row, self.col) == (other.row, other.col)
+
+
+class RowView:
+    """Sequence view of one grid row, returned by ArrayGrid[row]."""
+
+    __slots__ = ("_grid", "row")
+
+    def __init__(self, grid, row):
+        self._grid = grid
+        self.row = row
+
+    def __len__(self):
+        return self._grid.cols
+
+    def __getitem__(self, col):
+        if col < 0:
+            col += self._grid.cols
+        if not 0 <= col < self._grid.cols:
+            raise IndexError("grid column out of range")
+        return CellView(self._grid, self.row, col)
+
+    def __iter__(self):
+        for col in range(self._grid.cols):
+            yield CellView(self._grid, self.row, col)
+
+
+def _terrain_code(node):
+    code = getattr(node, 'terrain_code', None)
+    if code is None:
+        code = TERRAIN_CODES[getattr(node, 'terrain', "normal")]
+    return code
+
+
+def _number_plane(values, dtype, name):
+    """
+    Cell values as an array of dtype, or of int64/float64 when dtype can't
+    hold them exactly.
+    """
+    array = np.array(values)
+    if array.dtype.kind == 'b':
+        array = array.astype(np.int64)
+    if array.dtype.kind in 'iu':
+        limits = np.iinfo(dtype)
+        if array.size == 0 or (limits.min <= array.min() and array.max() <= limits.max):
+            return array.astype(dtype)
+        return array.astype(np.int64)
+    if array.dtype.kind == 'f':
+        return array.astype(np.float64)
+    raise ValueError(f"cell {name} values must be numbers, got {array.dtype}")
+
+
+class ArrayGrid:
+    """
+    Grid whose cells are stored as parallel NumPy arrays.
+
+    Attributes:
+        obstacle: (rows, cols) bool array
+        cost: (rows, cols) uint8 array of movement costs; from_nodes() and
+            set_number() widen it to int64 or float64 for costs outside
+            0-255 or fractional costs
+        delay: (rows, cols) int32 array of waypoint delays, widened the
+            same way
+        terrain: (rows, cols) uint8 array of codes into TERRAIN_TYPES
+        version: Changes whenever a cell changes; caches key on it
+        components: ComponentIndex kept in sync with obstacle toggles, or
+            None until a search first needs one
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.obstacle = np.zeros((rows, cols), dtype=np.bool_)
+        self.cost = np.ones((rows, cols), dtype=np.uint8)
+        self.delay = np.zeros((rows, cols), dtype=np.int32)
+        self.terrain = np.zeros((rows, cols), dtype=np.uint8)
+        self.version = next(_versions)
+        self.components = None
+
+    def mark_changed(self, obstacles=True):
+        """
+        Give the grid a new version. Call after writing the cell arrays directly.
+
+        Args:
+            obstacles: Whether obstacles may have changed, which drops the
+                component index so it is rebuilt on next use
+        """
+        self.version = next(_versions)
+        if obstacles:
+            self.components = None
+
+    def set_obstacle(self, row, col, blocked):
+        """Block or clear one cell, updating the component index in place."""
+        blocked = bool(blocked)
+        if self.obstacle[row, col] == blocked:
+            return
+        self.obstacle[row, col] = blocked
+        self.mark_changed(obstacles=False)
+        if self.components is not None:
+            self.components.set_obstacle(row, col, blocked)
+
+    def set_number(self, name, row, col, value):
+        """
+        Set one cell of the cost or delay plane, first widening the plane
+        (see _number_plane) if it can't hold value exactly.
+        """
+        plane = getattr(self, name)
+        if plane.dtype.kind != 'f':
+            dtype = _number_plane([value], plane.dtype, name).dtype
+            if dtype != plane.dtype and np.result_type(dtype, plane.dtype) != plane.dtype:
+                plane = plane.astype(np.result_type(dtype, plane.dtype))
+                setattr(self, name, plane)
+        plane[row, col] = value
+        self.mark_changed(obstacles=False)
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        """
+        Build an ArrayGrid from a 2D list of Node objects, or from a grid
+        object exposing rows, cols and get_node(row, col).
+        """
+        if hasattr(nodes, 'get_node'):
+            nodes = [[nodes.get_node(r, c) for c in range(nodes.cols)]
+                     for r in range(nodes.rows)]
+
+        rows = len(nodes)
+        cols = len(nodes[0]) if rows > 0 else 0
+        grid = cls(rows, cols)
+        if rows == 0 or cols == 0:
+            return grid
+
+        grid.obstacle[:] = [[node.is_obstacle for node in row] for row in nodes]
+        grid.cost = _number_plane([[getattr(node, 'cost', 1) for node in row] for row in nodes],
+                                  np.uint8, "cost")
+        grid.delay = _number_plane([[getattr(node, 'delay', 0) for node in row] for row in nodes],
+                                   np.int32, "delay")
+        grid.terrain[:] = [[_terrain_code(node) for node in row] for row in nodes]
+        return grid
+
+    @classmethod
+    def from_arrays(cls, obstacle, cost, delay=None, terrain=None):
+        """
+        Wrap existing (rows, cols) cell arrays in an ArrayGrid without copying.
+
+        Missing delay/terrain arrays are created as all-zero. The arrays are
+        used as given, so read-only ones (shared memory, memory maps) give a
+        grid that can be searched but not edited.
+        """
+        rows, cols = obstacle.shape
+        grid = cls(0, 0)
+        grid.rows, grid.cols = rows, cols
+        grid.obstacle = obstacle
+        grid.cost = cost
+        grid.delay = delay if delay is not None else np.zeros((rows, cols), dtype=np.int32)
+        grid.terrain = terrain if terrain is not None else np.zeros((rows, cols), dtype=np.uint8)
+        return grid
+
+    @property
+    def shape(self):
+        return (self.rows, self.cols)
+
+    @property
+    def nbytes(self):
+        """Total bytes used by the cell arrays."""
+        return (self.obstacle.nbytes + self.cost.nbytes +
+                self.delay.nbytes + self.terrain.nbytes)
+
+    def copy(self):
+        grid = ArrayGrid(self.rows, self.cols)
+        grid.obstacle[:] = self.obstacle
+        grid.cost = self.cost.copy()
+        grid.delay = self.delay.copy()
+        grid.terrain[:] = self.terrain
+        return grid
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self.rows
+        if not 0 <= row < self.rows:
+            raise IndexError("grid row out of range")
+        return RowView(self, row)
+
+    def __iter__(self):
+        for row in range(self.rows):
+            yield RowView(self, row)
+
+    def __repr__(self):
+        return f"ArrayGrid({self.rows}x{self.cols})"
@@ -0,0 +1,178 @@
+"""
+Binary grid files.
+
+A grid file is a fixed 64-byte little-endian header followed by one packed
+(rows, cols) plane per ArrayGrid cell array:
+
+    magic        8 bytes  b"SPGRID\\0\\0"
+    version      uint16   FORMAT_VERSION
+    header_size  uint16   64
+    dtypes       4 x uint8, index into DTYPES of each plane's dtype
+    rows, cols   uint64 each
+    offsets      4 x uint64, byte offset of each plane in PLANES order
+
+Planes are stored row-major and start on ALIGNMENT-byte boundaries. Since
+the layout on disk is exactly ArrayGrid's layout in memory, load_grid() maps
+the planes with numpy.memmap instead of reading them: opening a file costs
+the same for any size, and pages are read from disk when a search first
+touches them.
+
+Each plane keeps the dtype it has in the ArrayGrid, so costs above 255 and
+fractional costs (widened planes, see grid_array.py) round-trip. Version 1
+files had zeros in place of dtypes and always used the dtypes in PLANES.
+
+Readers reject files with a newer version than FORMAT_VERSION; a new
+version may add planes or header fields, but must keep these first fields.
+"""
+import os
+
+import numpy as np
+
+from visualization.grid_array import ArrayGrid
+
+MAGIC = b"SPGRID\0\0"
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+
+HEADER = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u2"),
+    ("header_size", "<u2"),
+    ("dtypes", "<u1", (4,)),
+    ("rows", "<u8"),
+    ("cols", "<u8"),
+    ("offsets", "<u8", (4,)),
+])
+
+# ArrayGrid attribute and default (version 1) dtype of every plane, in file order
+PLANES = (
+    ("obstacle", np.dtype("|b1")),
+    ("cost", np.dtype("|u1")),
+    ("delay", np.dtype("<i4")),
+    ("terrain", np.dtype("|u1")),
+)
+
+# Plane dtypes a file may use; the header stores indexes into this table
+DTYPES = (
+    np.dtype("|b1"),
+    np.dtype("|u1"),
+    np.dtype("<i4"),
+    np.dtype("<i8"),
+    np.dtype("<f8"),
+)
+
+
+def _plane_dtype(array, default):
+    """On-disk dtype for an ArrayGrid plane: its own if DTYPES has it, else widened."""
+    dtype = array.dtype.newbyteorder("<")
+    if dtype in DTYPES:
+        return dtype
+    if dtype.kind in "iu":
+        return np.dtype("<i8")
+    if dtype.kind == "f":
+        return np.dtype("<f8")
+    return default
+
+
+def _plane_offsets(rows, cols, dtypes):
+    offsets = []
+    position = HEADER.itemsize
+    for dtype in dtypes:
+        position = -(-position // ALIGNMENT) * ALIGNMENT
+        offsets.append(position)
+        position += rows * cols * dtype.itemsize
+    return offsets, position
+
+
+def save_grid(grid, path):
+    """
+    Write a grid to path in the binary grid format.
+
+    Args:
+        grid: ArrayGrid, 2D list of Node objects or node grid
+        path: File to write; replaced atomically if it exists
+    """
+    if not isinstance(grid, ArrayGrid):
+        grid = ArrayGrid.from_nodes(grid)
+
+    dtypes = [_plane_dtype(getattr(grid, name), default) for name, default in PLANES]
+    offsets, size = _plane_offsets(grid.rows, grid.cols, dtypes)
+    header = np.zeros(1, dtype=HEADER)
+    header["magic"] = MAGIC
+    header["version"] = FORMAT_VERSION
+    header["header_size"] = HEADER.itemsize
+    header["dtypes"] = [DTYPES.index(dtype) for dtype in dtypes]
+    header["rows"] = grid.rows
+    header["cols"] = grid.cols
+    header["offsets"] = offsets
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header.tobytes())
+        for (name, _), dtype, offset in zip(PLANES, dtypes, offsets):
+            f.seek(offset)
+            f.write(np.ascontiguousarray(getattr(grid, name), dtype=dtype).tobytes())
+        f.truncate(size)
+    os.replace(temp_path, path)
+
+
+def read_header(path):
+    """
+    Read and check a grid file's header.
+
+    Returns:
+        (rows, cols, offsets, dtypes)
+
+    Raises:
+        ValueError: Not a grid file, an unsupported version, an unknown
+            plane dtype, or truncated
+    """
+    with open(path, "rb") as f:
+        raw = f.read(HEADER.itemsize)
+    if len(raw) < HEADER.itemsize:
+        raise ValueError(f"{path}: too short for a grid file")
+
+    header = np.frombuffer(raw, dtype=HEADER)[0]
+    if header["magic"] != MAGIC.rstrip(b"\0"):
+        raise ValueError(f"{path}: not a grid file")
+    if header["version"] > FORMAT_VERSION:
+        raise ValueError(f"{path}: grid file version {header['version']} is newer than "
+                         f"the supported version {FORMAT_VERSION}")
+
+    if header["version"] < 2:
+        dtypes = [dtype for _, dtype in PLANES]
+    elif max(header["dtypes"]) >= len(DTYPES):
+        raise ValueError(f"{path}: unknown plane dtype codes {list(header['dtypes'])}")
+    else:
+        dtypes = [DTYPES[code] for code in header["dtypes"]]
+
+    rows, cols = int(header["rows"]), int(header["cols"])
+    offsets = [int(offset) for offset in header["offsets"]]
+    end = max(offset + rows * cols * dtype.itemsize
+              for offset, dtype in zip(offsets, dtypes))
+    if os.path.getsize(path) < end:
+        raise ValueError(f"{path}: truncated, expected at least {end} bytes")
+    return rows, cols, offsets, dtypes
+
+
+def load_grid(path, mode="c"):
+    """
+    Open a grid file as an ArrayGrid whose arrays are memory maps of the file.
+
+    Args:
+        path: Grid file
+        mode: numpy.memmap mode. "c" (default) gives an editable grid whose
+            edits stay in memory, "r" a read-only grid, "r+" writes edits
+            straight back to the file.
+
+    Returns:
+        ArrayGrid
+    """
+    rows, cols, offsets, dtypes = read_header(path)
+    if rows == 0 or cols == 0:
+        # Zero-length files can't be mapped, and there is nothing to map
+        return ArrayGrid(rows, cols)
+
+    planes = [np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=(rows, cols))
+              for dtype, offset in zip(dtypes, offsets)]
+    return ArrayGrid.from_arrays(*planes)
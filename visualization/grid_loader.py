@@ -1,24 +1,103 @@
+import os
 import random
 
+import numpy as np
+
+from visualization.grid_array import ArrayGrid, TERRAIN_CODES, TERRAIN_TYPES
+from visualization import grid_file
+
 FIXED_GRID_SEED = 1337
 random.seed(FIXED_GRID_SEED)
 
+
+# --------------------------------------------------
+# MAZE SHUFFLE HELPERS
+# --------------------------------------------------
+
+def _shuffle_orders(items):
+    """
+    All 24 orders random.shuffle() can leave a 4-item list in, indexed by
+    j3 * 6 + j2 * 2 + j1 where j3, j2, j1 are its three swap draws.
+    """
+    orders = []
+    for j3 in range(4):
+        for j2 in range(3):
+            for j1 in range(2):
+                order = list(items)
+                for i, j in ((3, j3), (2, j2), (1, j1)):
+                    order[i], order[j] = order[j], order[i]
+                orders.append(tuple(order))
+    return orders
+
+
+def _draw_order(getrandbits):
+    """Make the same draws random.shuffle() makes for a 4-item list."""
+    j3 = getrandbits(3)
+    while j3 >= 4:
+        j3 = getrandbits(3)
+    j2 = getrandbits(2)
+    while j2 >= 3:
+        j2 = getrandbits(2)
+    j1 = getrandbits(2)
+    while j1 >= 2:
+        j1 = getrandbits(2)
+    return j3 * 6 + j2 * 2 + j1
+
+
+def _draws_match_shuffle():
+    """Check _draw_order() reproduces this interpreter's random.shuffle()."""
+    shuffled, drawn = random.Random(FIXED_GRID_SEED), random.Random(FIXED_GRID_SEED)
+    orders = _shuffle_orders(range(4))
+    for _ in range(256):
+        order = [0, 1, 2, 3]
+        shuffled.shuffle(order)
+        if tuple(order) != orders[_draw_order(drawn.getrandbits)]:
+            return False
+    return True
+
+
+# Shuffling is the bulk of maze generation time, so draw the orders directly
+# when that is guaranteed to give the same mazes as random.shuffle()
+_FAST_MAZE_SHUFFLE = _draws_match_shuffle()
+
 class Node:
-    def __init__(self, row, col, is_obstacle=False, cost=1, terrain="normal"):
+    """
+    A standalone grid cell, for code that works with node objects.
+
+    Nodes are slotted (no per-instance __dict__) and store their terrain as
+    a small integer code into TERRAIN_TYPES, the table ArrayGrid uses, while
+    the terrain property still reads and writes names. The hash is computed
+    once on creation, so row and col must not change afterwards. Hashing
+    and equality match CellView, so both can be mixed in sets and dicts.
+    """
+
+    __slots__ = ("row", "col", "is_obstacle", "cost", "delay", "terrain_code", "_hash")
+
+    def __init__(self, row, col, is_obstacle=False, cost=1, terrain="normal", delay=0):
         self.row = row
         self.col = col
         self.is_obstacle = is_obstacle
         self.cost = cost
-        self.terrain = terrain  # normal, sand, water, road
+        self.delay = delay
+        self.terrain_code = TERRAIN_CODES[terrain]  # normal, water, sand, road
+        self._hash = hash((row, col))
+
+    @property
+    def terrain(self):
+        return TERRAIN_TYPES[self.terrain_code]
+
+    @terrain.setter
+    def terrain(self, value):
+        self.terrain_code = TERRAIN_CODES[value]
 
     def __repr__(self):
         return f"({self.row},{self.col})"
 
     def __hash__(self):
-        return hash((self.row, self.col))
+        return self._hash
 
     def __eq__(self, other):
-        return (self.row, self.col) == (other.row, other.col)
+        return self.row == other.row and self.col == other.col
 
 
 class GridLoader:
@@ -31,8 +110,28 @@ class GridLoader:
         "Terrain Grid": (30, 20),
     }
 
+    # Where save_grid() puts grids by default and saved_grids() lists them
+    SAVED_GRID_DIRECTORY = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "grids")
+    GRID_FILE_EXTENSION = ".grid"
+
     @staticmethod
-    def create_grid(grid_type, rows=None, cols=None, seed=None):
+    def create_grid(grid_type, rows=None, cols=None, seed=None, vectorized=False):
+        """
+        Build a grid of the given preset type.
+
+        Args:
+            grid_type: One of GRID_DIMENSIONS' keys, or a saved grid file
+                name (see saved_grids()), which is loaded as is
+            rows, cols: Grid size, defaults to the preset dimensions
+            seed: Seed for reproducible layouts, None uses the module random state
+            vectorized: Fill random grids in one shot from a seeded NumPy
+                Generator. Much faster on large grids, but gives different
+                layouts than the default per-cell random stream.
+        """
+        if GridLoader.is_saved_grid(grid_type):
+            return GridLoader.load_grid(grid_type)
+
         if rows is None or cols is None:
             cols, rows = GridLoader.GRID_DIMENSIONS.get(grid_type, (30, 20))
 
@@ -43,15 +142,17 @@ class GridLoader:
             # APPLY THE SEED
             if seed is not None:
                 random.seed(seed)
-            
+
             if grid_type == "Empty Grid":
                 return GridLoader._create_empty_grid(rows, cols)
             elif grid_type == "Random Obstacles":
-                return GridLoader._create_random_obstacles_grid(rows, cols)
+                rng = GridLoader._vectorized_rng() if vectorized else None
+                return GridLoader._create_random_obstacles_grid(rows, cols, rng)
             elif grid_type == "Maze Grid":
                 return GridLoader._create_maze_grid(rows, cols)
             elif grid_type == "Weighted Grid":
-                return GridLoader._create_weighted_grid(rows, cols)
+                rng = GridLoader._vectorized_rng() if vectorized else None
+                return GridLoader._create_weighted_grid(rows, cols, rng)
             elif grid_type == "Terrain Grid":
                 return GridLoader._create_terrain_grid(rows, cols)
             else:
@@ -60,43 +161,151 @@ class GridLoader:
             # RESTORE original random state
             random.setstate(old_state)
 
+    @staticmethod
+    def _vectorized_rng():
+        # NumPy generator seeded from the module random stream, so seed=None
+        # keeps following the module random state like the per-cell
+        # generators. Only the grid types that use it draw the seed, so the
+        # others come out the same with or without vectorized.
+        return np.random.default_rng(random.getrandbits(64))
+
+    # --------------------------------------------------
+    # SAVED GRIDS
+    # --------------------------------------------------
+
+    @staticmethod
+    def is_saved_grid(name):
+        return name.endswith(GridLoader.GRID_FILE_EXTENSION)
+
+    @staticmethod
+    def _grid_path(name):
+        # Bare names live in SAVED_GRID_DIRECTORY, anything else is a path
+        if os.path.dirname(name):
+            return name
+        return os.path.join(GridLoader.SAVED_GRID_DIRECTORY, name)
+
+    @staticmethod
+    def saved_grids():
+        """Names of the grid files in SAVED_GRID_DIRECTORY, newest first."""
+        directory = GridLoader.SAVED_GRID_DIRECTORY
+        if not os.path.isdir(directory):
+            return []
+        names = [name for name in os.listdir(directory) if GridLoader.is_saved_grid(name)]
+        return sorted(names, key=lambda name: os.path.getmtime(os.path.join(directory, name)),
+                      reverse=True)
+
+    @staticmethod
+    def save_grid(grid, name):
+        """
+        Save a grid in the binary grid format (see visualization/grid_file.py).
+
+        Args:
+            grid: ArrayGrid or 2D list of Node objects
+            name: File name in SAVED_GRID_DIRECTORY, or a path
+
+        Returns:
+            Path written
+        """
+        path = GridLoader._grid_path(name)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        grid_file.save_grid(grid, path)
+        return path
+
+    @staticmethod
+    def load_grid(name, mode="c"):
+        """
+        Open a saved grid as an ArrayGrid memory-mapped from its file.
+
+        Args:
+            name: File name in SAVED_GRID_DIRECTORY, or a path
+            mode: numpy.memmap mode; the default "c" keeps edits in memory
+                and leaves the file as saved
+        """
+        return grid_file.load_grid(GridLoader._grid_path(name), mode)
+
     # --------------------------------------------------
     # BASIC GRIDS
     # --------------------------------------------------
 
     @staticmethod
     def _create_empty_grid(rows, cols):
-        return [[Node(r, c) for c in range(cols)] for r in range(rows)]
+        return ArrayGrid(rows, cols)
 
     @staticmethod
-    def _create_random_obstacles_grid(rows, cols):
-        grid = [[Node(r, c) for c in range(cols)] for r in range(rows)]
+    def _create_random_obstacles_grid(rows, cols, rng=None):
+        grid = ArrayGrid(rows, cols)
+
+        if rng is not None:
+            grid.obstacle[:] = rng.random((rows, cols), dtype=np.float32) < 0.3
+            return grid
 
-        for r in range(rows):
-            for c in range(cols):
-                # 🔥 Now using seeded random from create_grid()
-                if random.random() < 0.3:
-                    grid[r][c].is_obstacle = True
+        # 🔥 Now using seeded random from create_grid(), one roll per cell in row-major order
+        rolls = [random.random() < 0.3 for _ in range(rows * cols)]
+        grid.obstacle.flat[:] = rolls
 
         return grid
 
     @staticmethod
     def _create_maze_grid(rows, cols):
-        grid = [[Node(r, c, is_obstacle=True) for c in range(cols)] for r in range(rows)]
-
-        def carve_path(r, c):
-            grid[r][c].is_obstacle = False
-            directions = [(0, 2), (2, 0), (0, -2), (-2, 0)]
-            # Now using seeded random shuffle
-            random.shuffle(directions)
-
-            for dr, dc in directions:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc].is_obstacle:
-                    grid[r + dr // 2][c + dc // 2].is_obstacle = False
-                    carve_path(nr, nc)
-
-        carve_path(0, 0)
+        grid = ArrayGrid(rows, cols)
+
+        # Flat cell ids with a two-cell border that counts as already carved,
+        # so stepping two cells in any direction needs no bounds check
+        width = cols + 4
+        padded = np.ones((rows + 4, width), dtype=np.uint8)
+        padded[2:-2, 2:-2] = 0
+        carved = bytearray(padded.tobytes())
+        steps = (2, 2 * width, -2, -2 * width)  # (0,2), (2,0), (0,-2), (-2,0)
+
+        if _FAST_MAZE_SHUFFLE:
+            orders = _shuffle_orders(steps)
+            getrandbits = random.getrandbits
+
+            def shuffled_steps():
+                # _draw_order() inlined, this runs once per maze cell
+                j3 = getrandbits(3)
+                while j3 >= 4:
+                    j3 = getrandbits(3)
+                j2 = getrandbits(2)
+                while j2 >= 3:
+                    j2 = getrandbits(2)
+                j1 = getrandbits(2)
+                while j1 >= 2:
+                    j1 = getrandbits(2)
+                return orders[j3 * 6 + j2 * 2 + j1]
+        else:
+            def shuffled_steps():
+                directions = list(steps)
+                random.shuffle(directions)
+                return directions
+
+        # Depth-first carving with an explicit stack instead of recursion.
+        # Each frame is (cell, shuffled directions, next direction), and a
+        # cell's directions are shuffled when it is first entered, so the
+        # seeded random calls happen in the same order as the old recursive
+        # carve_path() and a given seed produces the same maze.
+        start = 2 * width + 2
+        carved[start] = 1
+        stack = [(start, shuffled_steps(), 0)]
+
+        while stack:
+            cell, directions, k = stack.pop()
+
+            while k < 4:
+                step = directions[k]
+                k += 1
+                target = cell + step
+                if not carved[target]:
+                    carved[cell + step // 2] = 1
+                    carved[target] = 1
+                    stack.append((cell, directions, k))
+                    stack.append((target, shuffled_steps(), 0))
+                    break
+
+        carved = np.frombuffer(carved, dtype=np.uint8).reshape(rows + 4, width)
+        grid.obstacle[:] = carved[2:-2, 2:-2] == 0
         return grid
 
     # --------------------------------------------------
@@ -104,19 +313,27 @@ class GridLoader:
     # --------------------------------------------------
 
     @staticmethod
-    def _create_weighted_grid(rows, cols):
-        grid = [[Node(r, c) for c in range(cols)] for r in range(rows)]
-
-        for r in range(rows):
-            for c in range(cols):
-                # Now using seeded random
-                roll = random.random()
-
-                if roll < 0.15:
-                    grid[r][c].is_obstacle = True
-                elif roll < 0.45:
-                    # Also using seeded random for cost
-                    grid[r][c].cost = random.randint(2, 5)
+    def _create_weighted_grid(rows, cols, rng=None):
+        grid = ArrayGrid(rows, cols)
+
+        if rng is not None:
+            roll = rng.random((rows, cols), dtype=np.float32)
+            grid.obstacle[:] = roll < 0.15
+            weighted = (roll >= 0.15) & (roll < 0.45)
+            grid.cost[weighted] = rng.integers(2, 6, size=int(weighted.sum()), dtype=np.uint8)
+            return grid
+        obstacle = grid.obstacle.reshape(-1)
+        cost = grid.cost.reshape(-1)
+
+        for i in range(rows * cols):
+            # Now using seeded random
+            roll = random.random()
+
+            if roll < 0.15:
+                obstacle[i] = True
+            elif roll < 0.45:
+                # Also using seeded random for cost
+                cost[i] = random.randint(2, 5)
 
         return grid
 
@@ -128,33 +345,30 @@ class GridLoader:
         - Same layout every run
         """
 
-        grid = [[Node(r, c) for c in range(cols)] for r in range(rows)]
-
-        for r in range(rows):
-            for c in range(cols):
+        grid = ArrayGrid(rows, cols)
 
-                # Solid border walls
-                if r == 0 or c == 0 or r == rows - 1 or c == cols - 1:
-                    grid[r][c].is_obstacle = True
-                    continue
+        # Deterministic pattern based on position, value = (r * 7 + c * 11) % 10,
+        # computed for the whole grid at once from per-row and per-column terms
+        row_term = (np.arange(rows) * 7 % 10).astype(np.uint8)
+        col_term = (np.arange(cols) * 11 % 10).astype(np.uint8)
+        value = (row_term[:, None] + col_term[None, :]) % 10
 
-                # Deterministic pattern based on position
-                value = (r * 7 + c * 11) % 10
+        # Pattern value -> cell attributes:
+        # 0-1 obstacle, 2-3 water (cost 5), 4-5 sand (cost 3), 6-9 road (cost 1)
+        normal, water = TERRAIN_CODES["normal"], TERRAIN_CODES["water"]
+        sand, road = TERRAIN_CODES["sand"], TERRAIN_CODES["road"]
+        terrain_by_value = np.array([normal] * 2 + [water] * 2 + [sand] * 2 + [road] * 4, dtype=np.uint8)
+        cost_by_value = np.array([1, 1, 5, 5, 3, 3, 1, 1, 1, 1], dtype=np.uint8)
 
-                if value < 2:
-                    grid[r][c].is_obstacle = True
+        grid.obstacle[:] = value < 2
+        grid.terrain[:] = terrain_by_value[value]
+        grid.cost[:] = cost_by_value[value]
 
-                elif value < 4:
-                    grid[r][c].terrain = "water"
-                    grid[r][c].cost = 5
-
-                elif value < 6:
-                    grid[r][c].terrain = "sand"
-                    grid[r][c].cost = 3
-
-                else:
-                    grid[r][c].terrain = "road"
-                    grid[r][c].cost = 1
+        # Solid border walls
+        for edge in (np.s_[[0, -1], :], np.s_[:, [0, -1]]):
+            grid.obstacle[edge] = True
+            grid.terrain[edge] = normal
+            grid.cost[edge] = 1
 
         return grid
 
@@ -184,6 +398,13 @@ class GridUtils:
 
     @staticmethod
     def grid_statistics(grid):
+        if isinstance(grid, ArrayGrid):
+            return {
+                "total_cells": grid.rows * grid.cols,
+                "obstacles": int(grid.obstacle.sum()),
+                "weighted_cells": int((grid.cost > 1).sum())
+            }
+
         total = len(grid) * len(grid[0])
         obstacles = sum(n.is_obstacle for row in grid for n in row)
         weighted = sum(n.cost > 1 for row in grid for n in row)
@@ -0,0 +1,171 @@
+"""
+MovingAI benchmark maps (.map) and scenarios (.scen).
+
+A .map file is a short text header followed by one line of characters per
+grid row:
+
+    type octile
+    height 512
+    width 512
+    map
+    ....@@@TT...
+
+'.' and 'G' are open ground and 'S' is swamp, also walkable. '@' and 'O'
+are out of bounds, 'T' trees and 'W' water; all four are obstacles here
+(water is tagged with the "water" terrain). load_map() reads the rows one
+line at a time and translates each with a 256-entry lookup table straight
+into the ArrayGrid planes, so no per-cell Python object is ever created.
+
+A .scen file is a "version 1" line followed by one query per line:
+
+    bucket  map  width  height  start_x  start_y  goal_x  goal_y  optimal_length
+
+x is the column and y the row. optimal_length is the shortest path under
+MovingAI's octile movement: 8-connected, diagonal steps cost sqrt(2) and may
+not cut a corner of an obstacle. The engines here move 4-connected at the
+cost of the entered cell, so octile_distance() computes the scenario's own
+metric to check a map against its scenarios.
+"""
+from collections import namedtuple
+import heapq
+import math
+
+import numpy as np
+
+from visualization.grid_array import ArrayGrid, TERRAIN_CODES
+from visualization.search.kernels import as_flat_grid
+
+Scenario = namedtuple("Scenario", ["bucket", "map", "width", "height", "start", "end", "optimal"])
+
+PASSABLE = b".GS"
+WATER = b"W"
+
+# Byte -> obstacle and byte -> terrain code lookup tables
+_OBSTACLE = np.ones(256, dtype=np.bool_)
+_OBSTACLE[np.frombuffer(PASSABLE, dtype=np.uint8)] = False
+_TERRAIN = np.full(256, TERRAIN_CODES["normal"], dtype=np.uint8)
+_TERRAIN[np.frombuffer(WATER, dtype=np.uint8)] = TERRAIN_CODES["water"]
+
+SQRT2 = math.sqrt(2)
+
+
+def _read_map_header(f, path):
+    """Read header lines up to "map"; returns (rows, cols)."""
+    fields = {}
+    for line in f:
+        words = line.split()
+        if not words:
+            continue
+        if words[0] == b"map":
+            break
+        if len(words) == 2:
+            fields[words[0].decode("ascii", "replace")] = words[1]
+    else:
+        raise ValueError(f"{path}: no 'map' line")
+
+    try:
+        return int(fields["height"]), int(fields["width"])
+    except (KeyError, ValueError):
+        raise ValueError(f"{path}: header needs integer height and width") from None
+
+
+def load_map(path):
+    """
+    Read a MovingAI .map file into an ArrayGrid.
+
+    Returns:
+        ArrayGrid with every cell at cost 1
+
+    Raises:
+        ValueError: Malformed header, short file or a row of the wrong width
+    """
+    with open(path, "rb") as f:
+        rows, cols = _read_map_header(f, path)
+        grid = ArrayGrid(rows, cols)
+        for r in range(rows):
+            line = f.readline().rstrip(b"\r\n")
+            if len(line) != cols:
+                raise ValueError(f"{path}: map row {r} has {len(line)} cells, expected {cols}")
+            cells = np.frombuffer(line, dtype=np.uint8)
+            grid.obstacle[r] = _OBSTACLE[cells]
+            grid.terrain[r] = _TERRAIN[cells]
+    return grid
+
+
+def iter_scenarios(path):
+    """
+    Yield the queries of a MovingAI .scen file one line at a time.
+
+    Yields:
+        Scenario(bucket, map, width, height, start, end, optimal) with start
+        and end as (row, col) tuples
+    """
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            # Map names may contain spaces, so split on tabs when there are any
+            words = line.rstrip("\r\n").split("\t") if "\t" in line else line.split()
+            if not words or words[0] == "version":
+                continue
+            if len(words) != 9:
+                raise ValueError(f"{path}:{number}: expected 9 fields, got {len(words)}")
+            bucket, map_name, width, height, sx, sy, gx, gy, optimal = words
+            yield Scenario(int(bucket), map_name, int(width), int(height),
+                           (int(sy), int(sx)), (int(gy), int(gx)), float(optimal))
+
+
+def load_scenarios(path):
+    """All queries of a .scen file, as a list of Scenario."""
+    return list(iter_scenarios(path))
+
+
+def scenario_queries(scenarios):
+    """(start, end) pairs for run_batch() and the engines."""
+    return [(scenario.start, scenario.end) for scenario in scenarios]
+
+
+def octile_distance(grid, start, end):
+    """
+    Shortest start -> end distance under MovingAI's octile movement.
+
+    Args:
+        grid: ArrayGrid, 2D list of Node objects or FlatGrid
+        start, end: (row, col) tuples
+
+    Returns:
+        float distance, None when end can't be reached
+    """
+    flat = as_flat_grid(grid)
+    blocked = flat.blocked
+    width = flat.width
+    s, t = flat.index(start), flat.index(end)
+    if blocked[s] or blocked[t]:
+        return None
+
+    straight = (1, width, -1, -width)
+    # Diagonal offset and the two orthogonal cells it must not cut through
+    diagonal = [(dr * width + dc, dr * width, dc) for dr in (1, -1) for dc in (1, -1)]
+
+    dist = {s: 0.0}
+    heap = [(0.0, s)]
+    closed = bytearray(blocked)
+    while heap:
+        d, current = heapq.heappop(heap)
+        if closed[current]:
+            continue
+        if current == t:
+            return d
+        closed[current] = 1
+
+        for offset in straight:
+            neighbor = current + offset
+            if not closed[neighbor] and d + 1 < dist.get(neighbor, math.inf):
+                dist[neighbor] = d + 1
+                heapq.heappush(heap, (d + 1, neighbor))
+        for offset, row_step, col_step in diagonal:
+            neighbor = current + offset
+            if closed[neighbor] or blocked[current + row_step] or blocked[current + col_step]:
+                continue
+            if d + SQRT2 < dist.get(neighbor, math.inf):
+                dist[neighbor] = d + SQRT2
+                heapq.heappush(heap, (d + SQRT2, neighbor))
+    return None
@@ -1,6 +1,7 @@
-import pygame
 from visualization.ui.button import Button
+from visualization.ui.text_cache import TextCache
 from visualization.pages.visualizer import Visualizer
+from visualization.pages.compare import CompareView
 
 class AlgorithmSelect:
     def __init__(self, window, selected_grid=None, grid_mode='random', seed=None):
@@ -18,20 +19,32 @@ class AlgorithmSelect:
         center_x = self.window.width // 2
         start_y = 220
         spacing = 70
+        per_column = 5
 
-        algorithms = ["BFS", "Dijkstra", "A*", "DFS"]
+        algorithms = ["BFS", "Dijkstra", "A*", "DFS", "JPS", "Bi-BFS", "Bi-A*", "HPA*", "D* Lite"]
 
+        # Two columns of up to five buttons each
         for i, algo in enumerate(algorithms):
-            self.buttons.append(Button(center_x - 120, start_y + i * spacing, 240, 50, algo,
+            column, row = divmod(i, per_column)
+            x = center_x - 250 + column * 260
+            self.buttons.append(Button(x, start_y + row * spacing, 240, 50, algo,
                                        lambda a=algo: self.start_visualizer(a)))
 
-        self.buttons.append(Button(center_x - 100, start_y + spacing * 4 + 40, 200, 50, "Back", self.go_back))
+        # Every algorithm side by side, in the slot after the last one
+        column, row = divmod(len(algorithms), per_column)
+        self.buttons.append(Button(center_x - 250 + column * 260, start_y + row * spacing, 240, 50,
+                                   "Compare All", self.start_compare))
+
+        self.buttons.append(Button(center_x - 100, start_y + spacing * per_column + 40, 200, 50, "Back", self.go_back))
 
     def start_visualizer(self, algorithm):
         # Pass all parameters including seed
         print(f"DEBUG: Starting {algorithm} with seed={self.seed}")
         self.window.change_page(Visualizer, self.selected_grid, self.grid_mode, algorithm, self.seed)
 
+    def start_compare(self):
+        self.window.change_page(CompareView, self.selected_grid, self.grid_mode, self.seed)
+
     def go_back(self):
         from visualization.pages.grid_select import GridSelect
         self.window.change_page(GridSelect, self.grid_mode)
@@ -47,12 +60,10 @@ class AlgorithmSelect:
     def draw(self, screen):
         screen.fill((25, 25, 25))
 
-        font = pygame.font.SysFont("arial", 50)
-        text = font.render("Choose Algorithm", True, (255, 255, 255))
+        text = TextCache.render("Choose Algorithm", 50, (255, 255, 255))
         screen.blit(text, (self.window.width // 2 - text.get_width() // 2, 100))
 
         # FIXED DISPLAY: Shows correct mode
-        font2 = pygame.font.SysFont("arial", 30)
         
         # Create the display text
         if self.grid_mode == 'fixed' and self.seed is not None:
@@ -60,7 +71,7 @@ class AlgorithmSelect:
         else:
             display_text = f"Grid: {self.selected_grid} (Random)"
             
-        sub = font2.render(display_text, True, (200, 200, 200))
+        sub = TextCache.render(display_text, 30, (200, 200, 200))
         screen.blit(sub, (self.window.width // 2 - sub.get_width() // 2, 160))
 
         for button in self.buttons:
@@ -0,0 +1,231 @@
+import math
+import multiprocessing
+import threading
+import time
+
+import pygame
+from visualization.ui.button import Button
+from visualization.ui.grid_renderer import GridRenderer
+from visualization.ui.animator import Animator
+from visualization.ui.text_cache import TextCache
+from visualization.grid_loader import GridLoader, GridDefaults
+from visualization.compare import compare_engines
+from visualization.pathfinding import ENGINES
+
+
+class ComparePane:
+    """One algorithm's grid, animation and numbers on the compare page."""
+
+    LABEL_HEIGHT = 36
+
+    def __init__(self, algorithm, rect, grid, start_node, end_node):
+        self.algorithm = algorithm
+        self.rect = rect
+        self.result = None
+        self.animator = None
+
+        # Largest cells that fit the grid into the pane above its labels;
+        # past 1px cells the pane shows the grid's top left corner
+        rows = len(grid)
+        cols = len(grid[0]) if rows > 0 else 0
+        area_h = rect.height - self.LABEL_HEIGHT
+        cell_size = max(1, min(rect.width // max(cols, 1), area_h // max(rows, 1)))
+        self.renderer = GridRenderer(grid_offset_y=rect.y, cell_size=cell_size)
+        if cols * cell_size > rect.width or rows * cell_size > area_h:
+            self.renderer.set_viewport(rect.width, area_h)
+        width, height = self.renderer.shown_size(grid)
+        self.renderer.grid_offset_x = rect.x + (rect.width - width) // 2
+        self.renderer.build_scene(grid, start_node, end_node)
+        self.label_y = rect.y + height + 4
+
+    def set_result(self, result, max_duration):
+        self.result = result
+        self.animator = Animator(
+            visited_nodes=result.visited,
+            path_nodes=result.path,
+            animation_speed=0.05,
+            batched=True,
+            max_duration=max_duration
+        )
+
+    def labels(self):
+        if self.result is None:
+            return [self.algorithm, "searching..."]
+        cost = "no path" if self.result.cost is None else f"cost {self.result.cost}"
+        return [f"{self.algorithm}  {self.result.seconds * 1000:.1f} ms",
+                f"visited {len(self.result.visited)}  {cost}"]
+
+    def paint_new_cells(self, screen):
+        """Paint cells the animator advanced past since the last frame."""
+        if not self.animator:
+            return []
+        dirty = self.renderer.paint_cells(screen, self.animator.take_visited_delta(), 'visited')
+        dirty += self.renderer.paint_cells(screen, self.animator.take_path_delta(), 'path')
+        return dirty
+
+    def draw(self, screen):
+        self.renderer.blit_scene(screen)
+        y = self.label_y
+        for line in self.labels():
+            surface = TextCache.render(line, 14, (200, 200, 200))
+            screen.blit(surface, (self.rect.centerx - surface.get_width() // 2, y))
+            y += 16
+
+
+class CompareView:
+    """
+    Every registered algorithm on the same grid, side by side.
+
+    The searches run in parallel on a process pool (see
+    visualization/compare.py) from a background thread, so the page keeps
+    drawing while they run. When they are done every pane plays its
+    algorithm's animation at the same time. The pool spawns its workers
+    rather than forking this multi-threaded process, and Back cancels it.
+    """
+
+    # Same cap as the single-algorithm visualizer
+    MAX_ANIMATION_SECONDS = 30.0
+
+    def __init__(self, window, selected_grid, grid_mode, seed=None):
+        self.window = window
+        self.selected_grid = selected_grid
+        self.grid_mode = grid_mode
+        self.seed = seed
+        self.buttons = []
+
+        self.grid = None
+        self.start_node = None
+        self.end_node = None
+        self.panes = []
+
+        # Filled in by the comparison thread; read once per frame
+        self.results = None
+        self.error = None
+        self.elapsed = None
+        self.cancelled = threading.Event()
+        self.needs_full_redraw = True
+
+        self._create_layout()
+        self._load_grid()
+        self._create_panes()
+        self._start_comparison()
+
+    def _create_layout(self):
+        self.buttons.append(Button(10, 40, 90, 40, "Replay", self.replay))
+        self.buttons.append(Button(10, 90, 90, 40, "Skip", self.skip))
+        self.buttons.append(Button(10, 140, 90, 40, "Back", self.go_back))
+
+    def _load_grid(self):
+        seed = self.seed if self.grid_mode == 'fixed' else None
+        self.grid = GridLoader.create_grid(self.selected_grid, seed=seed)
+        rows = len(self.grid)
+        cols = len(self.grid[0]) if rows > 0 else 0
+
+        self.start_node = GridDefaults.get_start_position(rows, cols)
+        self.end_node = GridDefaults.get_end_position(rows, cols)
+        for row, col in (self.start_node, self.end_node):
+            self.grid[row][col].is_obstacle = False
+
+    def _create_panes(self):
+        """Lay the panes out in a near-square grid right of the buttons."""
+        algorithms = list(ENGINES["flat"])
+
+        area = pygame.Rect(120, 50, self.window.width - 130, self.window.height - 60)
+        columns = math.ceil(math.sqrt(len(algorithms)))
+        rows = math.ceil(len(algorithms) / columns)
+        width, height = area.width // columns, area.height // rows
+        for i, algorithm in enumerate(algorithms):
+            row, column = divmod(i, columns)
+            rect = pygame.Rect(area.x + column * width, area.y + row * height, width - 10, height - 10)
+            self.panes.append(ComparePane(algorithm, rect, self.grid, self.start_node, self.end_node))
+
+    def _start_comparison(self):
+        algorithms = [pane.algorithm for pane in self.panes]
+        thread = threading.Thread(target=self._compare, args=(algorithms,),
+                                  name="compare-engines", daemon=True)
+        thread.start()
+
+    def _compare(self, algorithms):
+        """Comparison thread: run every algorithm, then publish the results."""
+        began = time.perf_counter()
+        try:
+            results = compare_engines(self.grid, self.start_node, self.end_node, algorithms,
+                                      mp_context=multiprocessing.get_context("spawn"),
+                                      cancel=self.cancelled)
+        except Exception as exc:
+            self.error = exc
+            return
+        if results is None:
+            return
+        self.elapsed = time.perf_counter() - began
+        self.results = results
+
+    def replay(self):
+        for pane in self.panes:
+            if pane.animator:
+                pane.animator.reset()
+            pane.renderer.reset_scene()
+        self.needs_full_redraw = True
+
+    def skip(self):
+        for pane in self.panes:
+            if pane.animator:
+                pane.animator.skip_to_end()
+
+    def go_back(self):
+        # Stops the process pool if the comparison is still running
+        from visualization.pages.algorithm_select import AlgorithmSelect
+        self.cancelled.set()
+        self.window.change_page(AlgorithmSelect, self.selected_grid, self.grid_mode, self.seed)
+
+    def handle_events(self, events):
+        mouse_pos = pygame.mouse.get_pos()
+        for event in events:
+            for button in self.buttons:
+                button.update(mouse_pos)
+                button.handle_event(event)
+
+    def update(self, dt):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+        if self.results is not None and self.panes[0].result is None:
+            for pane, result in zip(self.panes, self.results):
+                pane.set_result(result, self.MAX_ANIMATION_SECONDS)
+            self.needs_full_redraw = True
+
+        for pane in self.panes:
+            if pane.animator:
+                pane.animator.update(dt)
+
+    def _summary(self):
+        if self.results is None:
+            return f"Running {len(self.panes)} algorithms in parallel..."
+        engine_total = sum(result.seconds for result in self.results)
+        return (f"All {len(self.results)} done in {self.elapsed * 1000:.0f} ms "
+                f"(engines alone: {engine_total * 1000:.0f} ms back to back)")
+
+    def draw(self, screen):
+        """Draw the page; returns None after a full repaint, else the dirty rects."""
+        dirty = []
+        for pane in self.panes:
+            dirty += pane.paint_new_cells(screen)
+
+        if self.needs_full_redraw:
+            self.needs_full_redraw = False
+            screen.fill(GridRenderer.COLORS['background'])
+            title = TextCache.render(f"Compare all on {self.selected_grid}: {self._summary()}",
+                                     20, (255, 255, 255), bold=True)
+            screen.blit(title, (self.window.width // 2 - title.get_width() // 2, 15))
+            for pane in self.panes:
+                pane.draw(screen)
+            for button in self.buttons:
+                button.draw(screen)
+            return None
+
+        dirty = GridRenderer.merge_dirty(dirty)
+        for button in self.buttons:
+            button.draw(screen)
+            dirty.append(button.rect)
+        return dirty
@@ -1,10 +1,12 @@
-import pygame
 from visualization.ui.button import Button
+from visualization.ui.text_cache import TextCache
+from visualization.grid_loader import GridLoader
 from visualization.pages.algorithm_select import AlgorithmSelect
 
 
 class GridSelect:
     DEFAULT_FIXED_SEED = 42  # reproducible grid seed
+    MAX_SAVED_GRIDS = 6  # newest saved grids listed beside the presets
 
     def __init__(self, window, grid_mode='random'):
         self.window = window
@@ -12,6 +14,7 @@ class GridSelect:
         self.selected_grid = None
         self.grid_mode = grid_mode  # 'random' or 'fixed'
         self.mode_button = None
+        self.saved_grids = GridLoader.saved_grids()[:self.MAX_SAVED_GRIDS]
         self._create_layout()
 
     def _create_layout(self):
@@ -54,6 +57,21 @@ class GridSelect:
                 )
             )
 
+        # Saved grid files in a column to the right; they load as saved, so
+        # the mode and seed don't change them
+        for i, file_name in enumerate(self.saved_grids):
+            label = file_name[:-len(GridLoader.GRID_FILE_EXTENSION)]
+            self.buttons.append(
+                Button(
+                    center_x + 160,
+                    start_y + i * spacing,
+                    300,
+                    50,
+                    label,
+                    lambda name=file_name: self.select_grid(name)
+                )
+            )
+
         self.buttons.append(
             Button(
                 center_x - 100,
@@ -109,13 +127,16 @@ class GridSelect:
     def draw(self, screen):
         screen.fill((25, 25, 25))
 
-        font = pygame.font.SysFont("arial", 50)
-        text = font.render("Choose Grid", True, (255, 255, 255))
+        text = TextCache.render("Choose Grid", 50, (255, 255, 255))
         screen.blit(
             text,
             (self.window.width // 2 - text.get_width() // 2, 100)
         )
 
+        if self.saved_grids:
+            heading = TextCache.render("Saved Grids", 24, (200, 200, 200))
+            screen.blit(heading, (self.window.width // 2 + 310 - heading.get_width() // 2, 165))
+
         for button in self.buttons:
             button.draw(screen)
 
@@ -1,5 +1,5 @@
-import pygame
 from visualization.ui.button import Button
+from visualization.ui.text_cache import TextCache
 from visualization.pages.algorithm_select import AlgorithmSelect
 from visualization.pages.grid_select import GridSelect
 
@@ -38,8 +38,7 @@ class MainMenu:
     def draw(self, screen):
         screen.fill((30, 30, 30))
 
-        title_font = pygame.font.SysFont("arial", 60)
-        title_surf = title_font.render("Shortest Path Visualizer", True, (255, 255, 255))
+        title_surf = TextCache.render("Shortest Path Visualizer", 60, (255, 255, 255))
 
         screen.blit(title_surf, (self.window.width // 2 - title_surf.get_width() // 2, 120))
 
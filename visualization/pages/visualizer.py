@@ -1,15 +1,35 @@
+import functools
+import logging
 import pygame
 import random
+import time
 from visualization.ui.button import Button
 from visualization.ui.grid_renderer import GridRenderer
 from visualization.ui.animator import Animator
+from visualization.ui.text_cache import TextCache
 from visualization.grid_loader import GridLoader, GridDefaults
-from visualization.pathfinding import get_algorithm_function
+from visualization.pathfinding import BIDIRECTIONAL, get_algorithm_function, stream_search, visited_event
+from visualization.search.background import SearchWorker
+from visualization.search.events import EVENT_KERNELS
+from visualization.search.waypoints import WaypointRouter
+
+logger = logging.getLogger(__name__)
 
 
 class Visualizer:
     """Main visualizer page for displaying pathfinding algorithms."""
     
+    # Upper bound on how long one search animation plays at the default speed
+    MAX_ANIMATION_SECONDS = 30.0
+    
+    # Arrow keys scroll grids that don't fit the window: key -> (dx, dy) steps
+    SCROLL_KEYS = {
+        pygame.K_LEFT: (-1, 0),
+        pygame.K_RIGHT: (1, 0),
+        pygame.K_UP: (0, -1),
+        pygame.K_DOWN: (0, 1),
+    }
+    
     def __init__(self, window, selected_grid, grid_mode, algorithm, seed=None):  # 🔥 ADD seed
         self.window = window
         self.selected_grid = selected_grid
@@ -25,12 +45,29 @@ class Visualizer:
         self.waypoints = []
         self.visited_nodes = []
         self.path_nodes = []
+        self.backward_nodes = set()  # Cells reached by the end-side search of bidirectional algorithms
+        self.search_error = None  # Exception the last search raised, shown in the stats
+        self.saved_as = None  # File name of the last Save, shown in the stats
         
         # Rendering and animation
         self.renderer = GridRenderer(grid_offset_x=200, grid_offset_y=80, cell_size=25)
         self.animator = None
         self.is_running = False
         
+        # Background search feeding the animator; never block the frame loop
+        self.search = None
+        
+        # Grid edits waiting for a cancelled search's thread to stop reading
+        # the grid, and whether the search after them plans from scratch
+        self.pending_edits = []
+        self.pending_fresh = False
+        
+        # Orders the waypoints; keeps its leg trees while the grid is unchanged
+        self.router = WaypointRouter()
+        
+        # Retained-mode drawing: whether the next frame must repaint everything
+        self.needs_full_redraw = True
+        
         # Debug
         print(f"DEBUG Visualizer: grid={selected_grid}, mode={grid_mode}, algo={algorithm}, seed={seed}")
         
@@ -49,6 +86,7 @@ class Visualizer:
         self.buttons.append(Button(10, 240, 90, 40, "Speed+", self.increase_speed))
         self.buttons.append(Button(10, 290, 90, 40, "Speed-", self.decrease_speed))
         self.buttons.append(Button(10, 340, 90, 40, "Back", self.go_back))
+        self.buttons.append(Button(10, 390, 90, 40, "Save", self.save_grid))
     
     def _load_grid(self):
         """Load the selected grid type."""
@@ -61,6 +99,16 @@ class Visualizer:
         rows = len(self.grid)
         cols = len(self.grid[0]) if rows > 0 else 0
         
+        # Saved grids can be any size; shrink the cells until the grid fits
+        # above the stats block (the presets keep the full 25px cells).
+        # Grids too big even at 1px cells scroll with the arrow keys and wheel
+        area_w = self.window.width - self.renderer.grid_offset_x - 20
+        area_h = self.window.height - self.renderer.grid_offset_y - 140
+        cell_size = max(1, min(25, area_w // max(cols, 1), area_h // max(rows, 1)))
+        self.renderer.cell_size = cell_size
+        if cols * cell_size > area_w or rows * cell_size > area_h:
+            self.renderer.set_viewport(area_w, area_h)
+        
         # Set start and end positions
         self.start_node = GridDefaults.get_start_position(rows, cols)
         self.end_node = GridDefaults.get_end_position(rows, cols)
@@ -71,28 +119,117 @@ class Visualizer:
         end_r, end_c = self.end_node
         self.grid[start_r][start_c].is_obstacle = False
         self.grid[end_r][end_c].is_obstacle = False
+        for row, col in self.waypoints:
+            self.grid[row][col].is_obstacle = False
+        
+        # Cache the static grid for incremental rendering
+        self.renderer.build_scene(self.grid, self.start_node, self.end_node, self.waypoints)
     
-    def _generate_algorithm_data(self):
-        """Generate visited and path nodes using the selected algorithm."""
-        rows = len(self.grid)
-        cols = len(self.grid[0]) if rows > 0 else 0
+    def _generate_algorithm_data(self, fresh=False):
+        """
+        Start searching with the selected algorithm.
         
-        # Get the algorithm function
-        algorithm_func = get_algorithm_function(self.algorithm)
+        The search runs on a SearchWorker thread; update() hands its
+        visited nodes and path to the animator as they arrive.
         
-        # Run the algorithm to get visited nodes and path
-        self.visited_nodes, self.path_nodes = algorithm_func(
-            self.grid,
-            self.start_node,
-            self.end_node
-        )
+        Args:
+            fresh: Plan from scratch, as when an edit cut the previous
+                search short
+        """
+        # A D* Lite search cancelled before we drew all of it must not
+        # come back as a repair of that unseen plan
+        fresh = self.cancel_search() or fresh
+        
+        # Get the algorithm function (flat kernels give identical results, faster)
+        algorithm_func = get_algorithm_function(self.algorithm, engine="flat")
+        
+        # Searches with event kernels stream visited nodes while they run
+        stream = None
+        if self.waypoints:
+            algorithm_func = self.router.pathfinder(algorithm_func, self.waypoints)
+        elif self.algorithm in EVENT_KERNELS:
+            stream = functools.partial(stream_search, self.algorithm, engine="flat")
+        
+        self.visited_nodes = []
+        self.path_nodes = []
+        self.backward_nodes = set()
+        self.search_error = None
         
-        # Initialize animator with the data
+        # The animator shares visited_nodes and grows with it; batched
+        # stepping keeps fast speeds and huge searches within MAX_ANIMATION_SECONDS
         self.animator = Animator(
             visited_nodes=self.visited_nodes,
             path_nodes=self.path_nodes,
-            animation_speed=0.05
+            animation_speed=0.05,
+            batched=True,
+            max_duration=self.MAX_ANIMATION_SECONDS,
+            complete=False
         )
+        
+        self.search = SearchWorker(
+            algorithm_func, self.grid, self.start_node, self.end_node,
+            bidirectional=self.algorithm in BIDIRECTIONAL, fresh=fresh,
+            stream=stream, visited_kind=visited_event(self.algorithm)
+        ).start()
+    
+    def cancel_search(self):
+        """
+        Stop the running search, if any.
+        
+        Returns:
+            True if a search was cancelled before all of its result arrived
+        """
+        if self.search is None or not self.search.is_running:
+            return False
+        self.search.cancel()
+        return True
+    
+    def edit_grid(self, edit):
+        """
+        Cancel the search, call edit() to change the grid and search again.
+        
+        A cancelled engine call can't be interrupted and keeps reading the
+        grid until it returns, so while its thread is alive the edit waits
+        in pending_edits and update() applies it once the thread ends.
+        The frame loop never waits for the search.
+        """
+        self.pending_fresh = self.cancel_search() or self.pending_fresh
+        self.pending_edits.append(edit)
+        self._apply_pending_edits()
+    
+    def _apply_pending_edits(self):
+        """Apply the queued edits and search again, unless the search thread still reads the grid."""
+        if not self.pending_edits or (self.search is not None and self.search.is_alive):
+            return
+        
+        edits, self.pending_edits = self.pending_edits, []
+        for edit in edits:
+            edit()
+        self.renderer.reset_scene()
+        fresh, self.pending_fresh = self.pending_fresh, False
+        self._generate_algorithm_data(fresh)
+        self.needs_full_redraw = True
+    
+    def _receive_search_results(self):
+        """Move whatever the search worker produced since last frame into the animator."""
+        if self.search is None:
+            return
+        
+        for message in self.search.poll():
+            kind = message[0]
+            if kind == "visited":
+                _, nodes, backward = message
+                self.backward_nodes.update(backward)
+                self.animator.add_visited(nodes)
+            elif kind == "path":
+                self.path_nodes = message[1]
+                self.animator.finish(self.path_nodes)
+            elif kind == "error":
+                # Keep the page running; the stats show the failure
+                self.search_error = message[1]
+                logger.error("%s search failed", self.algorithm, exc_info=message[1])
+                self.animator.finish([])
+                self.needs_full_redraw = True
     
     def start_animation(self):
         """Start the animation."""
@@ -107,10 +244,17 @@ class Visualizer:
             self.is_running = False
     
     def reset_animation(self):
-        """Reset the animation."""
-        if self.animator:
+        """Reset the animation, restarting the search if it is still running."""
+        if self.search is not None and self.search.is_running:
+            # Replay from the first node, as a reset of a finished run does
+            self._generate_algorithm_data()
+            self.is_running = False
+        elif self.animator:
             self.animator.reset()
             self.is_running = False
+        
+        self.renderer.reset_scene()
+        self.needs_full_redraw = True
     
     def skip_animation(self):
         """Skip to the end of animation."""
@@ -131,6 +275,7 @@ class Visualizer:
     def go_back(self):
         """Return to main menu."""
         from visualization.pages.main_menu import MainMenu
+        self.cancel_search()
         self.window.change_page(MainMenu)
     
     def handle_events(self, events):
@@ -141,37 +286,150 @@ class Visualizer:
             for button in self.buttons:
                 button.update(mouse_pos)
                 button.handle_event(event)
+            
+            if event.type == pygame.KEYDOWN and event.key in self.SCROLL_KEYS:
+                dx, dy = self.SCROLL_KEYS[event.key]
+                self.scroll_grid(dx, dy)
+            elif event.type == pygame.MOUSEWHEEL:
+                self.scroll_grid(event.x, -event.y)
+            
+            # Left click toggles an obstacle, right click a waypoint
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 3):
+                cell = self._cell_at(event.pos)
+                if cell is None:
+                    continue
+                if event.button == 1:
+                    self.toggle_obstacle(cell)
+                else:
+                    self.toggle_waypoint(cell)
+    
+    def _cell_at(self, pos):
+        """Grid (row, col) under a screen position, or None outside the grid."""
+        cell = self.renderer.cell_at(pos)
+        if cell is None:
+            return None
+        row, col = cell
+        if row < len(self.grid) and col < len(self.grid[0]):
+            return (row, col)
+        return None
+    
+    def scroll_grid(self, dx, dy):
+        """Scroll a grid bigger than its screen area by (dx, dy) steps of an eighth of the view."""
+        viewport = self.renderer.viewport
+        if viewport is None:
+            return
+        if self.renderer.scroll(dx * max(viewport.width // 8, 1), dy * max(viewport.height // 8, 1)):
+            self.needs_full_redraw = True
+    
+    def toggle_obstacle(self, cell):
+        """
+        Toggle an obstacle and search again.
+        
+        D* Lite repairs its previous plan, so it only animates the cells
+        the change affected; the other algorithms search from scratch.
+        """
+        if cell in (self.start_node, self.end_node) or cell in self.waypoints:
+            return
+        
+        def edit():
+            # A waypoint queued on this cell meanwhile stays open
+            if cell in self.waypoints:
+                return
+            row, col = cell
+            self.grid[row][col].is_obstacle = not self.grid[row][col].is_obstacle
+            self.renderer.update_cells(self.grid, [cell])
+        
+        self.edit_grid(edit)
+    
+    def toggle_waypoint(self, cell):
+        """
+        Add or remove a waypoint and search again.
+        
+        The route visits every waypoint in the cheapest order the router
+        finds, running the selected algorithm leg by leg.
+        """
+        if cell in (self.start_node, self.end_node):
+            return
+        
+        def edit():
+            if cell in self.waypoints:
+                self.waypoints.remove(cell)
+            else:
+                row, col = cell
+                self.grid[row][col].is_obstacle = False
+                self.waypoints.append(cell)
+            self.renderer.update_cells(self.grid, [cell])
+            self.renderer.set_markers(self.start_node, self.end_node, self.waypoints)
+        
+        self.edit_grid(edit)
+    
+    def save_grid(self):
+        """Save the grid as shown, obstacle edits included, for the grid select page."""
+        base = self.selected_grid
+        if GridLoader.is_saved_grid(base):
+            base = base[:-len(GridLoader.GRID_FILE_EXTENSION)]
+        base = "-".join(base.lower().split())
+        name = f"{base}-{time.strftime('%Y%m%d-%H%M%S')}{GridLoader.GRID_FILE_EXTENSION}"
+        GridLoader.save_grid(self.grid, name)
+        self.saved_as = name
+        self.needs_full_redraw = True
     
     def update(self, dt):
         """Update animation state."""
+        self._apply_pending_edits()
+        self._receive_search_results()
         if self.animator:
             self.animator.update(dt)
     
     def draw(self, screen):
-        """Draw the visualization."""
-        # Draw background
-        self.renderer.draw_background(screen)
+        """
+        Draw the visualization.
         
-        # Draw grid base
-        self.renderer.draw_grid(screen, self.grid)
+        Returns:
+            None after a full repaint (the window flips the whole display),
+            otherwise the list of rects that changed this frame
+        """
+        dirty = self._paint_new_cells(screen)
         
-        # Draw obstacles
-        self.renderer.draw_obstacles(screen, self.grid)
+        if self.needs_full_redraw:
+            self._draw_full(screen)
+            self.needs_full_redraw = False
+            return None
         
-        # Draw visited nodes
-        if self.animator:
-            visited = self.animator.get_current_visited()
-            self.renderer.draw_visited_nodes(screen, visited)
+        dirty = self.renderer.merge_dirty(dirty)
+        dirty.append(self._draw_stats(screen, clear=True))
         
-        # Draw path
-        if self.animator:
-            path = self.animator.get_current_path()
-            self.renderer.draw_path(screen, path)
+        # Buttons may change hover state between frames
+        for button in self.buttons:
+            button.draw(screen)
+            dirty.append(button.rect)
         
-        # Draw special nodes
-        self.renderer.draw_start_node(screen, self.start_node)
-        self.renderer.draw_end_node(screen, self.end_node)
-        self.renderer.draw_waypoints(screen, self.waypoints)
+        return dirty
+    
+    def _paint_new_cells(self, screen):
+        """Paint visited/path nodes the animator advanced past since the last frame."""
+        if not self.animator:
+            return []
+        
+        visited = self.animator.take_visited_delta()
+        if self.backward_nodes:
+            # Draw the start-side and end-side frontiers in different colors
+            backward = [node for node in visited if node in self.backward_nodes]
+            visited = [node for node in visited if node not in self.backward_nodes]
+            dirty = self.renderer.paint_cells(screen, backward, 'visited_backward')
+        else:
+            dirty = []
+        dirty += self.renderer.paint_cells(screen, visited, 'visited')
+        dirty += self.renderer.paint_cells(screen, self.animator.take_path_delta(), 'path')
+        return dirty
+    
+    def _draw_full(self, screen):
+        """Repaint the whole page."""
+        # Draw background
+        self.renderer.draw_background(screen)
+        
+        # Grid, obstacles, painted cells and special nodes from the cached scene
+        self.renderer.blit_scene(screen)
         
         # Draw grid border
         self.renderer.draw_grid_border(screen, self.grid)
@@ -181,13 +439,43 @@ class Visualizer:
         self.renderer.draw_title(screen, self.window.width, title)
         
         # Draw statistics
+        self._draw_stats(screen)
+        
+        # 🔥 ADD MODE INFO TO SCREEN
+        mode_info = f"Mode: {self.grid_mode}"
+        if self.grid_mode == 'fixed' and self.seed is not None:
+            mode_info += f" (Seed: {self.seed})"
+        
+        info_surface = TextCache.render(mode_info, 16, (200, 200, 200))
+        screen.blit(info_surface, (10, self.window.height - 30))
+        
+        # Draw buttons
+        for button in self.buttons:
+            button.draw(screen)
+    
+    def _draw_stats(self, screen, clear=False):
+        """Draw the stats block below the grid and return its screen rect."""
         stats = {
             "Visited": len(self.visited_nodes),
             "Path": len(self.path_nodes),
         }
         if self.animator:
             stats["Progress"] = f"{self.animator.get_progress()}%"
-            stats["Status"] = "Finished" if self.animator.is_finished else ("Paused" if self.animator.is_paused else "Running")
+            if self.search_error is not None:
+                stats["Status"] = "Error"
+            elif self.animator.is_finished:
+                stats["Status"] = "Finished"
+            elif self.animator.is_paused:
+                stats["Status"] = "Paused"
+            elif not self.animator.is_complete:
+                stats["Status"] = "Searching"
+            else:
+                stats["Status"] = "Running"
+
+        if self.search_error is not None:
+            stats["Error"] = f"{type(self.search_error).__name__}: {self.search_error}"
+        if self.saved_as:
+            stats["Saved"] = self.saved_as
 
         # Add algorithm complexity info
         complexities = {
@@ -195,24 +483,20 @@ class Visualizer:
             "Dijkstra": ("O((V+E) log V)", "O(V)"),
             "A*": ("O(E) worst-case, typically faster", "O(V)"),
             "DFS": ("O(V+E)", "O(V)"),
+            "JPS": ("O(E) worst-case, few heap ops", "O(V)"),
+            "Bi-BFS": ("O(V+E), ~half the nodes of BFS", "O(V)"),
+            "Bi-A*": ("O((V+E) log V), meets in the middle", "O(V)"),
+            "HPA*": ("A* on cluster graph + local refinement", "O(V) cached"),
+            "D* Lite": ("O((V+E) log V) first, then ~size of the change", "O(V) kept"),
         }
 
         time_c, space_c = complexities.get(self.algorithm, ("O(V+E)", "O(V)"))
         stats["Time Complexity"] = time_c
         stats["Space Complexity"] = space_c
 
+        if clear:
+            area = self.renderer.stats_bottom_area(len(stats), self.window.width, self.grid)
+            screen.fill(self.renderer.COLORS['background'], area)
+
         # Draw stats below the grid instead of on the left
-        self.renderer.draw_stats_bottom(screen, stats, self.window.width, self.window.height, self.grid)
-        
-        # 🔥 ADD MODE INFO TO SCREEN
-        mode_info = f"Mode: {self.grid_mode}"
-        if self.grid_mode == 'fixed' and self.seed is not None:
-            mode_info += f" (Seed: {self.seed})"
-        
-        info_font = pygame.font.SysFont("arial", 16)
-        info_surface = info_font.render(mode_info, True, (200, 200, 200))
-        screen.blit(info_surface, (10, self.window.height - 30))
-        
-        # Draw buttons
-        for button in self.buttons:
-            button.draw(screen)
+        return self.renderer.draw_stats_bottom(screen, stats, self.window.width, self.window.height, self.grid)
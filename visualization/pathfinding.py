@@ -1,258 +1,413 @@
-"""
-Pathfinding algorithms that work with tuple-based grid coordinates.
-These are wrappers around the core algorithms adapted for the visualizer.
-"""
-from collections import deque
-import heapq
-import itertools
-import math
-
-
-def bfs_pathfind(grid, start, end):
-    """
-    Breadth-First Search - finds shortest path in unweighted grids.
-    
-    Args:
-        grid: 2D list of Node objects
-        start: Tuple (row, col) for start position
-        end: Tuple (row, col) for end position
-    
-    Returns:
-        Tuple of (visited_list, path_list)
-    """
-    rows = len(grid)
-    cols = len(grid[0]) if rows > 0 else 0
-    
-    queue = deque([start])
-    visited = {start}
-    came_from = {start: None}
-    visited_list = [start]
-    
-    while queue:
-        current = queue.popleft()
-        
-        if current == end:
-            # Reconstruct path
-            path = []
-            node = end
-            while node is not None:
-                path.append(node)
-                node = came_from[node]
-            return visited_list, path[::-1]
-        
-        # 4-directional movement
-        for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            nr, nc = current[0] + dr, current[1] + dc
-            neighbor = (nr, nc)
-            
-            if (0 <= nr < rows and 0 <= nc < cols and
-                neighbor not in visited and
-                not grid[nr][nc].is_obstacle):
-                visited.add(neighbor)
-                came_from[neighbor] = current
-                queue.append(neighbor)
-                visited_list.append(neighbor)
-    
-    return visited_list, []
-
-
-def dijkstra_pathfind(grid, start, end):
-    """
-    Dijkstra's Algorithm - finds shortest path considering edge weights.
-    
-    Args:
-        grid: 2D list of Node objects
-        start: Tuple (row, col) for start position
-        end: Tuple (row, col) for end position
-    
-    Returns:
-        Tuple of (visited_list, path_list)
-    """
-    rows = len(grid)
-    cols = len(grid[0]) if rows > 0 else 0
-    
-    counter = itertools.count()
-    heap = [(0, next(counter), start)]
-    came_from = {start: None}
-    distances = {start: 0}
-    visited = set()
-    visited_list = []
-    
-    while heap:
-        current_dist, _, current = heapq.heappop(heap)
-        
-        if current in visited:
-            continue
-        
-        visited.add(current)
-        visited_list.append(current)
-        
-        if current == end:
-            # Reconstruct path
-            path = []
-            node = end
-            while node is not None:
-                path.append(node)
-                node = came_from[node]
-            return visited_list, path[::-1]
-        
-        r, c = current
-        
-        # 4-directional movement
-        for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            nr, nc = r + dr, c + dc
-            neighbor = (nr, nc)
-            
-            if (0 <= nr < rows and 0 <= nc < cols and
-                neighbor not in visited and
-                not grid[nr][nc].is_obstacle):
-                
-                cost = 1 if not hasattr(grid[nr][nc], 'cost') else grid[nr][nc].cost
-                new_dist = current_dist + cost
-                
-                if neighbor not in distances or new_dist < distances[neighbor]:
-                    distances[neighbor] = new_dist
-                    came_from[neighbor] = current
-                    heapq.heappush(heap, (new_dist, next(counter), neighbor))
-    
-    return visited_list, []
-
-
-def astar_pathfind(grid, start, end):
-    """
-    A* Algorithm - finds shortest path with heuristic guidance.
-    
-    Args:
-        grid: 2D list of Node objects
-        start: Tuple (row, col) for start position
-        end: Tuple (row, col) for end position
-    
-    Returns:
-        Tuple of (visited_list, path_list)
-    """
-    rows = len(grid)
-    cols = len(grid[0]) if rows > 0 else 0
-    
-    def heuristic(pos1, pos2):
-        """Manhattan distance heuristic."""
-        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
-    
-    start_h = heuristic(start, end)
-    counter = itertools.count()
-    heap = [(start_h, next(counter), start)]
-    came_from = {start: None}
-    g_score = {start: 0}
-    f_score = {start: start_h}
-    visited = set()
-    visited_list = []
-    
-    while heap:
-        _, _, current = heapq.heappop(heap)
-        
-        if current in visited:
-            continue
-        
-        visited.add(current)
-        visited_list.append(current)
-        
-        if current == end:
-            # Reconstruct path
-            path = []
-            node = end
-            while node is not None:
-                path.append(node)
-                node = came_from[node]
-            return visited_list, path[::-1]
-        
-        r, c = current
-        
-        # 4-directional movement
-        for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            nr, nc = r + dr, c + dc
-            neighbor = (nr, nc)
-            
-            if (0 <= nr < rows and 0 <= nc < cols and
-                neighbor not in visited and
-                not grid[nr][nc].is_obstacle):
-                
-                cost = 1 if not hasattr(grid[nr][nc], 'cost') else grid[nr][nc].cost
-                tentative_g = g_score[current] + cost
-                
-                if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g
-                    h = heuristic(neighbor, end)
-                    f = tentative_g + h
-                    f_score[neighbor] = f
-                    heapq.heappush(heap, (f, next(counter), neighbor))
-    
-    return visited_list, []
-
-
-def dfs_pathfind(grid, start, end):
-    """
-    Depth-First Search - explores deeply before backtracking.
-    
-    Args:
-        grid: 2D list of Node objects
-        start: Tuple (row, col) for start position
-        end: Tuple (row, col) for end position
-    
-    Returns:
-        Tuple of (visited_list, path_list)
-    """
-    rows = len(grid)
-    cols = len(grid[0]) if rows > 0 else 0
-    
-    visited = set()
-    came_from = {start: None}
-    visited_list = []
-    
-    def dfs(current):
-        if current in visited:
-            return False
-        
-        visited.add(current)
-        visited_list.append(current)
-        
-        if current == end:
-            return True
-        
-        r, c = current
-        
-        # 4-directional movement
-        for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            nr, nc = r + dr, c + dc
-            neighbor = (nr, nc)
-            
-            if (0 <= nr < rows and 0 <= nc < cols and
-                neighbor not in visited and
-                not grid[nr][nc].is_obstacle):
-                
-                came_from[neighbor] = current
-                if dfs(neighbor):
-                    return True
-        
-        return False
-    
-    if dfs(start):
-        # Reconstruct path
-        path = []
-        node = end
-        while node is not None:
-            path.append(node)
-            node = came_from[node]
-        return visited_list, path[::-1]
-    
-    return visited_list, []
-
-
-def get_algorithm_function(algorithm_name):
-    """Get the algorithm function by name."""
-    algorithms = {
-        "BFS": bfs_pathfind,
-        "Dijkstra": dijkstra_pathfind,
-        "A*": astar_pathfind,
-        "DFS": dfs_pathfind,
-    }
-    return algorithms.get(algorithm_name, bfs_pathfind)
+"""
+Pathfinding algorithms that work with tuple-based grid coordinates, and the
+engine registry.
+
+ENGINES is the one place algorithms are registered. The visualizer, the
+benchmarks, verify_shortest_path.py and the algorithms/ package (through
+algorithms/engine.py) all look up their functions here, so they all run the
+same kernels. The "reference" engine below is a plain tuple/dict version of
+each search kept as an oracle; the "flat" engine is the fast one.
+
+Weighted searches charge cost + delay for entering a cell in every engine.
+"""
+from collections import deque
+import math
+
+import numpy as np
+
+from visualization.grid_array import ArrayGrid
+from visualization.search.kernels import bfs_flat, dijkstra_flat, astar_flat, dfs_flat
+from visualization.search.jps import jps_pathfind
+from visualization.search.bidirectional import bidirectional_bfs_flat, bidirectional_astar_flat
+from visualization.search.components import known_unreachable
+from visualization.search.frontier import make_frontier
+from visualization.search.neighbors import FOUR_CONNECTED
+from visualization.search.hpa import hpa_pathfind
+from visualization.search.incremental import dstar_lite_pathfind
+from visualization.search.events import (
+    EVENT_KERNELS, VISITED_EVENT, EXPAND, position_events, replay_events)
+
+
+def _blocked_rows(grid):
+    """
+    Obstacle flags as a list of row lists, looked up as blocked[r][c].
+
+    An ArrayGrid's rows come straight from its obstacle plane; indexing
+    the grid itself builds a RowView and a CellView per lookup.
+    """
+    if isinstance(grid, ArrayGrid):
+        return grid.obstacle.tolist()
+    return [[node.is_obstacle for node in row] for row in grid]
+
+
+def _entry_cost(cell):
+    """Cost of stepping into a cell: movement cost plus delay."""
+    return getattr(cell, 'cost', 1) + getattr(cell, 'delay', 0)
+
+
+def _weight_rows(grid):
+    """
+    Entry costs (cost + delay) as a list of row lists, plus the smallest
+    and largest of them as Python numbers.
+    """
+    if isinstance(grid, ArrayGrid):
+        weight = grid.cost.astype(np.result_type(grid.cost, np.int64)) + grid.delay
+        if weight.size == 0:
+            return weight.tolist(), 1, 1
+        return weight.tolist(), weight.min().item(), weight.max().item()
+    weight = [[_entry_cost(node) for node in row] for row in grid]
+    costs = [cost for row in weight for cost in row]
+    return (weight, min(costs), max(costs)) if costs else (weight, 1, 1)
+
+
+def bfs_pathfind(grid, start, end):
+    """
+    Breadth-First Search - finds shortest path in unweighted grids.
+    
+    Args:
+        grid: 2D list of Node objects
+        start: Tuple (row, col) for start position
+        end: Tuple (row, col) for end position
+    
+    Returns:
+        Tuple of (visited_list, path_list)
+    """
+    if known_unreachable(grid, start, end):
+        return [], []
+    
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+    blocked = _blocked_rows(grid)
+    
+    queue = deque([start])
+    visited = {start}
+    came_from = {start: None}
+    visited_list = [start]
+    
+    while queue:
+        current = queue.popleft()
+        
+        if current == end:
+            # Reconstruct path
+            path = []
+            node = end
+            while node is not None:
+                path.append(node)
+                node = came_from[node]
+            return visited_list, path[::-1]
+        
+        # 4-directional movement
+        for dr, dc in FOUR_CONNECTED:
+            nr, nc = current[0] + dr, current[1] + dc
+            neighbor = (nr, nc)
+            
+            if (0 <= nr < rows and 0 <= nc < cols and
+                neighbor not in visited and
+                not blocked[nr][nc]):
+                visited.add(neighbor)
+                came_from[neighbor] = current
+                queue.append(neighbor)
+                visited_list.append(neighbor)
+    
+    return visited_list, []
+
+
+def dijkstra_pathfind(grid, start, end):
+    """
+    Dijkstra's Algorithm - finds shortest path considering edge weights
+    (cost + delay).
+    
+    Args:
+        grid: 2D list of Node objects
+        start: Tuple (row, col) for start position
+        end: Tuple (row, col) for end position
+    
+    Returns:
+        Tuple of (visited_list, path_list)
+    """
+    if known_unreachable(grid, start, end):
+        return [], []
+    
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+    
+    blocked = _blocked_rows(grid)
+    
+    # Bucket queue for small integer costs, heap otherwise
+    weight, min_cost, max_cost = _weight_rows(grid)
+    frontier = make_frontier(min_cost, max_cost)
+    frontier.push(0, start)
+    came_from = {start: None}
+    distances = {start: 0}
+    visited = set()
+    visited_list = []
+    
+    for current in frontier:
+        if current in visited:
+            continue
+        
+        visited.add(current)
+        visited_list.append(current)
+        
+        if current == end:
+            # Reconstruct path
+            path = []
+            node = end
+            while node is not None:
+                path.append(node)
+                node = came_from[node]
+            return visited_list, path[::-1]
+        
+        r, c = current
+        current_dist = distances[current]
+        
+        # 4-directional movement
+        for dr, dc in FOUR_CONNECTED:
+            nr, nc = r + dr, c + dc
+            neighbor = (nr, nc)
+            
+            if (0 <= nr < rows and 0 <= nc < cols and
+                neighbor not in visited and
+                not blocked[nr][nc]):
+                
+                cost = weight[nr][nc]
+                new_dist = current_dist + cost
+                
+                if neighbor not in distances or new_dist < distances[neighbor]:
+                    distances[neighbor] = new_dist
+                    came_from[neighbor] = current
+                    frontier.push(new_dist, neighbor)
+    
+    return visited_list, []
+
+
+def astar_pathfind(grid, start, end):
+    """
+    A* Algorithm - finds shortest path (cost + delay) with heuristic guidance.
+    
+    Args:
+        grid: 2D list of Node objects
+        start: Tuple (row, col) for start position
+        end: Tuple (row, col) for end position
+    
+    Returns:
+        Tuple of (visited_list, path_list)
+    """
+    if known_unreachable(grid, start, end):
+        return [], []
+    
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+    
+    def heuristic(pos1, pos2):
+        """Manhattan distance heuristic."""
+        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+    
+    start_h = heuristic(start, end)
+    blocked = _blocked_rows(grid)
+    
+    # f grows by cost - 1 to cost + 1 per step (Manhattan heuristic)
+    weight, min_cost, max_cost = _weight_rows(grid)
+    frontier = make_frontier(min_cost - 1, max_cost + 1)
+    frontier.push(start_h, start)
+    came_from = {start: None}
+    g_score = {start: 0}
+    f_score = {start: start_h}
+    visited = set()
+    visited_list = []
+    
+    for current in frontier:
+        if current in visited:
+            continue
+        
+        visited.add(current)
+        visited_list.append(current)
+        
+        if current == end:
+            # Reconstruct path
+            path = []
+            node = end
+            while node is not None:
+                path.append(node)
+                node = came_from[node]
+            return visited_list, path[::-1]
+        
+        r, c = current
+        
+        # 4-directional movement
+        for dr, dc in FOUR_CONNECTED:
+            nr, nc = r + dr, c + dc
+            neighbor = (nr, nc)
+            
+            if (0 <= nr < rows and 0 <= nc < cols and
+                neighbor not in visited and
+                not blocked[nr][nc]):
+                
+                cost = weight[nr][nc]
+                tentative_g = g_score[current] + cost
+                
+                if neighbor not in g_score or tentative_g < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g
+                    h = heuristic(neighbor, end)
+                    f = tentative_g + h
+                    f_score[neighbor] = f
+                    frontier.push(f, neighbor)
+    
+    return visited_list, []
+
+
+def dfs_pathfind(grid, start, end):
+    """
+    Depth-First Search - explores deeply before backtracking.
+    
+    Args:
+        grid: 2D list of Node objects
+        start: Tuple (row, col) for start position
+        end: Tuple (row, col) for end position
+    
+    Returns:
+        Tuple of (visited_list, path_list)
+    """
+    if known_unreachable(grid, start, end):
+        return [], []
+    
+    rows = len(grid)
+    cols = len(grid[0]) if rows > 0 else 0
+    directions = FOUR_CONNECTED
+    blocked = _blocked_rows(grid)
+    
+    visited = {start}
+    came_from = {start: None}
+    visited_list = [start]
+    
+    # Explicit stack of (cell, next direction index) frames instead of
+    # recursion, so long corridors can't hit the recursion limit
+    stack = [(start, 0)]
+    found = start == end
+    
+    while stack and not found:
+        current, d = stack.pop()
+        r, c = current
+        
+        # 4-directional movement, resuming where this cell left off
+        while d < len(directions):
+            dr, dc = directions[d]
+            d += 1
+            nr, nc = r + dr, c + dc
+            neighbor = (nr, nc)
+            
+            if (0 <= nr < rows and 0 <= nc < cols and
+                neighbor not in visited and
+                not blocked[nr][nc]):
+                
+                visited.add(neighbor)
+                visited_list.append(neighbor)
+                came_from[neighbor] = current
+                
+                if neighbor == end:
+                    found = True
+                else:
+                    stack.append((current, d))
+                    stack.append((neighbor, 0))
+                break
+    
+    if found:
+        # Reconstruct path
+        path = []
+        node = end
+        while node is not None:
+            path.append(node)
+            node = came_from[node]
+        return visited_list, path[::-1]
+    
+    return visited_list, []
+
+
+ENGINES = {
+    # Tuple/dict based implementations above
+    "reference": {
+        "BFS": bfs_pathfind,
+        "Dijkstra": dijkstra_pathfind,
+        "A*": astar_pathfind,
+        "DFS": dfs_pathfind,
+    },
+    # Flat cell id kernels from visualization/search/kernels.py
+    "flat": {
+        "BFS": bfs_flat,
+        "Dijkstra": dijkstra_flat,
+        "A*": astar_flat,
+        "DFS": dfs_flat,
+        # Uniform-cost grids only, weighted grids fall back to A*
+        "JPS": jps_pathfind,
+        "Bi-BFS": bidirectional_bfs_flat,
+        "Bi-A*": bidirectional_astar_flat,
+        # Near-optimal, see the error bound in visualization/search/hpa.py
+        "HPA*": hpa_pathfind,
+        # Keeps its search state per grid and repairs it after cell edits
+        "D* Lite": dstar_lite_pathfind,
+    },
+}
+
+# Algorithms that search from both ends. Their functions take an extra
+# sides=[] argument, filled with 0/1 (forward/backward) per visited node.
+BIDIRECTIONAL = {"Bi-BFS", "Bi-A*"}
+
+
+def get_algorithm_function(algorithm_name, engine="reference"):
+    """
+    Get the algorithm function by name.
+
+    Args:
+        algorithm_name: "BFS", "Dijkstra", "A*", "DFS", "JPS", "Bi-BFS", "Bi-A*", "HPA*"
+            or "D* Lite"
+        engine: Key into ENGINES selecting the implementation. Algorithms the
+            engine does not have come from whichever engine registers them.
+
+    Returns:
+        Function taking (grid, start, end) and returning (visited_list, path_list)
+    """
+    algorithms = ENGINES.get(engine, ENGINES["reference"])
+    if algorithm_name in algorithms:
+        return algorithms[algorithm_name]
+    for other in ENGINES.values():
+        if algorithm_name in other:
+            return other[algorithm_name]
+    return algorithms["BFS"]
+
+
+def stream_search(algorithm_name, grid, start, end, engine="flat", **options):
+    """
+    Run a search as a generator of exploration events.
+
+    BFS, Dijkstra, A* and DFS on the flat engine stream from their event
+    kernels (see visualization/search/events.py) as they search; every other
+    algorithm runs to completion first and its result is replayed as events.
+
+    Args:
+        algorithm_name, engine: As for get_algorithm_function()
+        grid: ArrayGrid, 2D list of Node objects, node grid or FlatGrid
+        start, end: (row, col) tuples
+        options: frontier/neighbors, passed on to the event kernel
+
+    Returns:
+        Iterator of (kind, ...) event tuples with (row, col) cells
+
+    Raises:
+        ValueError: options given for a search without an event kernel;
+            the other engines don't take them
+    """
+    if engine == "flat" and algorithm_name in EVENT_KERNELS:
+        return position_events(EVENT_KERNELS[algorithm_name], grid, start, end, **options)
+    if options:
+        raise ValueError(f"{algorithm_name} on the {engine} engine takes no options, "
+                         f"got {', '.join(sorted(options))}")
+    visited, path = get_algorithm_function(algorithm_name, engine)(grid, start, end, **options)
+    return replay_events(visited, path)
+
+
+def visited_event(algorithm_name, engine="flat"):
+    """The event kind in stream_search()'s output that marks a visited_list entry."""
+    if engine == "flat":
+        return VISITED_EVENT.get(algorithm_name, EXPAND)
+    return EXPAND
@@ -0,0 +1,168 @@
+"""
+Searches on a worker thread.
+
+Window.run() draws at 60 FPS, so a page can't call an engine directly: on a
+large grid one search takes many frames. A SearchWorker runs the engine on a
+daemon thread and streams the result through a queue.Queue, visited nodes in
+batches of CHUNK_SIZE and then the path. The page drains it once per frame
+with poll() and feeds what arrived to its Animator.
+
+Given an event stream (see visualization/search/events.py), the worker
+batches visited nodes while the search is still running, so the animation
+starts right away and cancel() stops the search itself between batches.
+Otherwise it can only start streaming once the engine call returns.
+
+Messages are tuples:
+
+    ("visited", nodes, backward)  a batch of visited nodes in search order;
+                                  backward lists those reached by the
+                                  end-side search (bidirectional engines)
+    ("path", path)                the final path, [] if there is none
+    ("error", exc)                the engine raised exc
+
+cancel() stops a worker: once cancelled, poll() returns nothing and the
+worker posts nothing more. A Python thread can't be interrupted, so a plain
+engine call that already started still runs to completion in the
+background and its result is dropped. The worker reads the grid until its
+thread ends; callers that want to edit the grid cancel() and then wait for
+is_alive to turn False, polling from their frame loop or with join().
+
+Engines keep state between calls (D* Lite planners, HPA* abstract graphs),
+so workers take turns through one lock instead of searching concurrently.
+"""
+import queue
+import threading
+
+from visualization.search.events import EXPAND, FOUND
+from visualization.search.incremental import IncrementalPathfinder
+
+# Visited nodes per queued batch
+CHUNK_SIZE = 2048
+
+# One search at a time; see the module docstring
+_engine_lock = threading.Lock()
+
+
+class SearchWorker:
+    """
+    One search on a background thread.
+
+    Args:
+        algorithm_func: Engine function, called as
+            algorithm_func(grid, start, end, **options)
+        grid, start, end: Passed on to algorithm_func
+        bidirectional: Whether algorithm_func accepts sides=[] and marks
+            which visited nodes the end-side search reached
+        fresh: Plan from scratch even if the engine is incremental. Pass
+            it when the previous search was cancelled before its result was
+            fully shown, since D* Lite would otherwise only return a repair
+            of that unseen plan
+        stream: Optional event generator function, called like
+            algorithm_func, to run instead of algorithm_func
+        visited_kind: The event kind in stream's output that marks a
+            visited node
+    """
+
+    def __init__(self, algorithm_func, grid, start, end, bidirectional=False, fresh=False,
+                 stream=None, visited_kind=EXPAND):
+        self.algorithm_func = algorithm_func
+        self.grid = grid
+        self.start_node = start
+        self.end_node = end
+        self.bidirectional = bidirectional
+        self.fresh = fresh
+        self.stream = stream
+        self.visited_kind = visited_kind
+
+        self.messages = queue.Queue()
+        self.cancelled = threading.Event()
+        # Set by poll() once the final message was taken
+        self.done = False
+        self.thread = threading.Thread(target=self._run, name="search-worker", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """Stop delivering results. Safe to call more than once."""
+        self.cancelled.set()
+
+    def join(self, timeout=None):
+        """Wait until the worker thread stopped reading the grid."""
+        if self.thread.is_alive():
+            self.thread.join(timeout)
+
+    @property
+    def is_alive(self):
+        """Whether the worker thread may still read the grid."""
+        return self.thread.is_alive()
+
+    @property
+    def is_running(self):
+        """Whether results may still arrive."""
+        return not self.done and not self.cancelled.is_set()
+
+    def poll(self):
+        """Return every message queued since the last call, without blocking."""
+        messages = []
+        while not self.cancelled.is_set():
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] != "visited":
+                self.done = True
+            messages.append(message)
+        return messages
+
+    def _run(self):
+        with _engine_lock:
+            if self.cancelled.is_set():
+                return
+            if self.fresh and isinstance(self.algorithm_func, IncrementalPathfinder):
+                self.algorithm_func.reset()
+            try:
+                if self.stream is not None:
+                    self._run_stream()
+                    return
+                sides = [] if self.bidirectional else None
+                if sides is None:
+                    visited, path = self.algorithm_func(self.grid, self.start_node, self.end_node)
+                else:
+                    visited, path = self.algorithm_func(
+                        self.grid, self.start_node, self.end_node, sides=sides)
+            except Exception as exc:
+                self.messages.put(("error", exc))
+                return
+
+        for i in range(0, len(visited), CHUNK_SIZE):
+            if self.cancelled.is_set():
+                return
+            chunk = visited[i:i + CHUNK_SIZE]
+            backward = []
+            if sides:
+                backward = [node for node, side in zip(chunk, sides[i:i + CHUNK_SIZE]) if side]
+            self.messages.put(("visited", chunk, backward))
+        self.messages.put(("path", path))
+
+    def _run_stream(self):
+        """Search through the event stream, posting visited nodes as they come."""
+        visited_kind = self.visited_kind
+        chunk = []
+        path = []
+        for event in self.stream(self.grid, self.start_node, self.end_node):
+            kind = event[0]
+            if kind == visited_kind:
+                chunk.append(event[1])
+                if len(chunk) == CHUNK_SIZE:
+                    if self.cancelled.is_set():
+                        return
+                    self.messages.put(("visited", chunk, []))
+                    chunk = []
+            elif kind == FOUND:
+                path = event[1]
+
+        if chunk:
+            self.messages.put(("visited", chunk, []))
+        self.messages.put(("path", path))
@@ -0,0 +1,195 @@
+"""
+Batch queries: many (start, end) pairs against one grid.
+
+The grid is flattened into a FlatGrid once and every query reuses its
+blocked/cost buffers and neighbor offsets. With workers > 1 the queries are
+split into chunks and run on a process pool; the FlatGrid buffers are placed
+in shared memory once and each worker attaches to them at startup, so only
+the (start, end) chunks and the results are pickled per task.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from visualization.grid_array import ArrayGrid
+from visualization.search.components import flat_component_labels
+from visualization.search.flat_grid import FlatGrid
+from visualization.search.kernels import ID_KERNELS, as_flat_grid
+
+QueryResult = namedtuple("QueryResult", ["start", "end", "path", "visited_count"])
+
+
+def run_batch(grid, queries, algorithm="A*", workers=None, chunk_size=32):
+    """
+    Run one search per (start, end) pair on the same grid.
+
+    Args:
+        grid: ArrayGrid, 2D list of Node objects or FlatGrid
+        queries: List of ((row, col), (row, col)) pairs
+        algorithm: "BFS", "Dijkstra", "A*" or "DFS"
+        workers: Number of worker processes, None or 1 runs in this process
+        chunk_size: Queries sent to a worker per task
+
+    Returns:
+        List of QueryResult(start, end, path, visited_count), in query order.
+        path is a list of (row, col) tuples, empty when end is unreachable.
+    """
+    if algorithm not in ID_KERNELS:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+
+    flat = as_flat_grid(grid)
+    queries = list(queries)
+
+    if not workers or workers <= 1 or len(queries) <= chunk_size:
+        return run_queries(flat, algorithm, queries)
+
+    chunks = [queries[i:i + chunk_size] for i in range(0, len(queries), chunk_size)]
+    with SharedFlatGrid(flat) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared.spec,)) as pool:
+            results = []
+            for chunk_results in pool.map(_run_chunk, [(algorithm, chunk) for chunk in chunks]):
+                results.extend(chunk_results)
+    return results
+
+
+def run_queries(flat, algorithm, queries):
+    """
+    Run queries one after another on a FlatGrid.
+
+    The grid's regions are labeled once up front, so queries whose end is in
+    a different region than their start return at once without searching.
+    """
+    kernel = ID_KERNELS[algorithm]
+    index = flat.index
+    labels = flat_component_labels(flat)
+    results = []
+    for start, end in queries:
+        s, t = index(start), index(end)
+        if s != t and (not labels[t] or (labels[s] and labels[s] != labels[t])):
+            results.append(QueryResult(start, end, [], 0))
+            continue
+        visited, path = kernel(flat, s, t)
+        results.append(QueryResult(start, end, flat.positions(path), len(visited)))
+    return results
+
+
+class SharedFlatGrid:
+    """
+    A FlatGrid's blocked and cost buffers copied into shared memory.
+
+    The creating process owns the segments and unlinks them on close().
+    Worker processes rebuild a FlatGrid from them with attach(spec).
+    """
+
+    def __init__(self, flat):
+        self._blocked = shared_memory.SharedMemory(create=True, size=flat.size)
+        self._cost = shared_memory.SharedMemory(create=True, size=flat.size * 8)
+        self._blocked.buf[:flat.size] = flat.blocked
+        dtype = "<i8" if flat.integral else "<f8"
+        cost = np.ndarray((flat.size,), dtype=dtype, buffer=self._cost.buf)
+        # Workers only need the edge weights, so share cost + delay as cost
+        cost[:] = flat.weight
+        del cost
+
+        self.spec = (flat.rows, flat.cols, self._blocked.name, self._cost.name, dtype)
+
+    @staticmethod
+    def attach(spec):
+        """Build a process-local FlatGrid from the shared segments named in spec."""
+        rows, cols, blocked_name, cost_name, dtype = spec
+        size = (rows + 2) * (cols + 2)
+        blocked_shm = shared_memory.SharedMemory(name=blocked_name)
+        cost_shm = shared_memory.SharedMemory(name=cost_name)
+
+        blocked = bytes(blocked_shm.buf[:size])
+        cost = np.ndarray((size,), dtype=dtype, buffer=cost_shm.buf).tolist()
+        blocked_shm.close()
+        cost_shm.close()
+
+        return FlatGrid.from_padded(rows, cols, blocked, cost)
+
+    def close(self):
+        for shm in (self._blocked, self._cost):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class SharedArrayGrid:
+    """
+    An ArrayGrid's cell arrays copied into one shared memory segment.
+
+    For engines that need a whole grid rather than a FlatGrid. Like
+    SharedFlatGrid the creating process owns the segment and unlinks it on
+    close(), but attach(spec) copies nothing: the worker's ArrayGrid arrays
+    are read-only views straight into the segment.
+    """
+
+    PLANES = ("obstacle", "cost", "delay", "terrain")
+
+    def __init__(self, grid):
+        layout = []
+        size = 0
+        for name in self.PLANES:
+            array = getattr(grid, name)
+            layout.append((array.dtype.str, size))
+            # Keep every plane 8-byte aligned
+            size += -(-array.nbytes // 8) * 8
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, (dtype, offset) in zip(self.PLANES, layout):
+            view = np.ndarray(grid.shape, dtype=dtype, buffer=self._shm.buf, offset=offset)
+            view[:] = getattr(grid, name)
+            del view
+
+        self.spec = (grid.rows, grid.cols, self._shm.name, tuple(layout))
+
+    @staticmethod
+    def attach(spec):
+        """Build a process-local, read-only ArrayGrid on the shared segment named in spec."""
+        rows, cols, name, layout = spec
+        shm = shared_memory.SharedMemory(name=name)
+        planes = []
+        for dtype, offset in layout:
+            plane = np.ndarray((rows, cols), dtype=dtype, buffer=shm.buf, offset=offset)
+            plane.flags.writeable = False
+            planes.append(plane)
+
+        grid = ArrayGrid.from_arrays(*planes)
+        # The views are only valid while the mapping is open
+        grid.shared_memory = shm
+        return grid
+
+    def close(self):
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# Per-worker FlatGrid, set up once by the pool initializer
+_worker_flat = None
+
+
+def _init_worker(spec):
+    global _worker_flat
+    _worker_flat = SharedFlatGrid.attach(spec)
+
+
+def _run_chunk(task):
+    algorithm, queries = task
+    return run_queries(_worker_flat, algorithm, queries)
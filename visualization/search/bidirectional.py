@@ -0,0 +1,278 @@
+"""
+Bidirectional search kernels.
+
+Both kernels grow one search from the start and one from the end and stop
+once the two meet with a provably shortest connection. On open grids each
+side only covers about half the distance, so together they explore roughly
+half the cells a one-sided search would.
+
+Moving into a cell costs its movement cost plus its delay, the same edge
+weights algorithms/dijkstra.py and algorithms/astar.py use. Searching
+backwards from the end, stepping from cell v to a neighbor u follows the
+forward edge u -> v, so it costs the weight of v, not of u.
+
+Each kernel accepts an optional `sides` list that it fills with 0 (forward)
+or 1 (backward) for every visited id, so callers can draw the two frontiers
+apart.
+"""
+from array import array
+import heapq
+
+from visualization.search.components import known_unreachable
+from visualization.search.kernels import as_flat_grid
+
+# owner byte values in bidirectional_bfs_ids
+_FORWARD, _BACKWARD, _WALL = 1, 2, 3
+_BLOCKED_AS_WALL = bytes([0, _WALL]) + bytes(range(2, 256))
+
+
+def bidirectional_bfs_ids(flat, s, t, sides=None):
+    """
+    Bidirectional BFS from cell id s to t (hop counts, costs ignored like BFS).
+
+    Expands one complete layer at a time, always on the side whose frontier
+    is smaller. When a layer touches the other side, the rest of that layer
+    is still checked and the shortest of all connections found is used.
+
+    Returns:
+        (visited_ids, path_ids)
+    """
+    if sides is None:
+        sides = []
+    if s == t:
+        sides.append(0)
+        return [s], [s]
+
+    offsets = flat.offsets
+
+    # Which side discovered each cell; obstacles count as walls
+    owner = bytearray(flat.blocked.translate(_BLOCKED_AS_WALL))
+    # Parent ids point towards s for forward cells and towards t for backward ones
+    parent = array('q', [0]) * flat.size
+    dist = [0] * flat.size
+    owner[s], owner[t] = _FORWARD, _BACKWARD
+    parent[s], parent[t] = s, t
+
+    visited = [s, t]
+    sides += [0, 1]
+    frontiers = {_FORWARD: [s], _BACKWARD: [t]}
+
+    while frontiers[_FORWARD] and frontiers[_BACKWARD]:
+        side = _FORWARD if len(frontiers[_FORWARD]) <= len(frontiers[_BACKWARD]) else _BACKWARD
+        other = _BACKWARD if side == _FORWARD else _FORWARD
+        side_flag = side - 1
+
+        best_length = -1
+        best_pair = None
+        next_layer = []
+        for current in frontiers[side]:
+            next_dist = dist[current] + 1
+            for offset in offsets:
+                neighbor = current + offset
+                o = owner[neighbor]
+                if o == 0:
+                    if best_pair is None:
+                        owner[neighbor] = side
+                        parent[neighbor] = current
+                        dist[neighbor] = next_dist
+                        next_layer.append(neighbor)
+                        visited.append(neighbor)
+                        sides.append(side_flag)
+                elif o == other:
+                    length = next_dist + dist[neighbor]
+                    if best_pair is None or length < best_length:
+                        best_length = length
+                        best_pair = (current, neighbor) if side == _FORWARD else (neighbor, current)
+
+        if best_pair is not None:
+            return visited, _join_paths(flat, parent, parent, *best_pair)
+
+        frontiers[side] = next_layer
+
+    return visited, []
+
+
+def bidirectional_astar_ids(flat, s, t, sides=None):
+    """
+    Bidirectional A* from cell id s to t, weighted by cost + delay.
+
+    Uses balanced potentials: the forward search orders cells by
+    g + (h_t - h_s) / 2 and the backward search by g + (h_s - h_t) / 2, where
+    h_s and h_t are Manhattan distances to s and t. Both are Dijkstra
+    searches on the same consistent reduced costs, so the usual bidirectional
+    Dijkstra stopping rule holds: once the two smallest queued keys add up
+    to the best meeting cost seen so far, that meeting is optimal. Keys are
+    doubled to stay integral. Ties go to the cell closer to the other end,
+    and the side with fewer queued cells is expanded next.
+
+    Returns:
+        (visited_ids, path_ids)
+
+    Raises:
+        ValueError: The grid has fractional cell costs
+    """
+    if not flat.integral:
+        raise ValueError("bidirectional A* needs integer cell costs")
+    if sides is None:
+        sides = []
+    if s == t:
+        sides.append(0)
+        return [s], [s]
+
+    offsets = flat.offsets
+    weight = flat.entry_costs()
+    size = flat.size
+    width = flat.width
+    start_r, start_c = divmod(s, width)
+    end_r, end_c = divmod(t, width)
+
+    closed_f = bytearray(flat.blocked)
+    closed_b = bytearray(flat.blocked)
+    closed_f[s] = closed_b[t] = 0
+    parent_f = array('q', [0]) * size
+    parent_b = array('q', [0]) * size
+    parent_f[s] = s
+    parent_b[t] = t
+    g_f = [-1] * size
+    g_b = [-1] * size
+    g_f[s] = g_b[t] = 0
+
+    # Heap keys pack (doubled key + h_span, h to the other end, cell id).
+    # h_span bounds any Manhattan distance, which keeps the packed parts
+    # apart and the doubled keys (which can be negative) non-negative.
+    h_span = width + size // width
+    key_span = h_span * size
+    distance = abs(start_r - end_r) + abs(start_c - end_c)
+    heap_f = [((distance + h_span) * h_span + distance) * size + s]
+    heap_b = [((distance + h_span) * h_span + distance) * size + t]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    best = -1
+    meet = -1
+    visited = []
+
+    while heap_f and heap_b:
+        if best >= 0 and heap_f[0] // key_span + heap_b[0] // key_span - 2 * h_span >= 2 * best:
+            break
+
+        if len(heap_f) <= len(heap_b):
+            current = heappop(heap_f) % size
+            if closed_f[current]:
+                continue
+            closed_f[current] = 1
+            visited.append(current)
+            sides.append(0)
+
+            current_g = g_f[current]
+            for offset in offsets:
+                neighbor = current + offset
+                if closed_f[neighbor]:
+                    continue
+
+                tentative_g = current_g + weight[neighbor]
+                old_g = g_f[neighbor]
+                if old_g < 0 or tentative_g < old_g:
+                    g_f[neighbor] = tentative_g
+                    parent_f[neighbor] = current
+                    r, c = divmod(neighbor, width)
+                    h_t = abs(r - end_r) + abs(c - end_c)
+                    h_s = abs(r - start_r) + abs(c - start_c)
+                    heappush(heap_f, ((2 * tentative_g + h_t - h_s + h_span) * h_span + h_t) * size
+                             + neighbor)
+
+                    other_g = g_b[neighbor]
+                    if other_g >= 0 and (best < 0 or tentative_g + other_g < best):
+                        best = tentative_g + other_g
+                        meet = neighbor
+        else:
+            current = heappop(heap_b) % size
+            if closed_b[current]:
+                continue
+            closed_b[current] = 1
+            visited.append(current)
+            sides.append(1)
+
+            # Every backward step out of current follows an edge into current
+            tentative_g = g_b[current] + weight[current]
+            for offset in offsets:
+                neighbor = current + offset
+                if closed_b[neighbor]:
+                    continue
+
+                old_g = g_b[neighbor]
+                if old_g < 0 or tentative_g < old_g:
+                    g_b[neighbor] = tentative_g
+                    parent_b[neighbor] = current
+                    r, c = divmod(neighbor, width)
+                    h_t = abs(r - end_r) + abs(c - end_c)
+                    h_s = abs(r - start_r) + abs(c - start_c)
+                    heappush(heap_b, ((2 * tentative_g + h_s - h_t + h_span) * h_span + h_s) * size
+                             + neighbor)
+
+                    other_g = g_f[neighbor]
+                    if other_g >= 0 and (best < 0 or tentative_g + other_g < best):
+                        best = tentative_g + other_g
+                        meet = neighbor
+
+    if meet < 0:
+        return visited, []
+    return visited, _join_paths(flat, parent_f, parent_b, meet, meet)
+
+
+def _join_paths(flat, parent_f, parent_b, forward_end, backward_start):
+    """
+    Path from s to forward_end along parent_f, then from backward_start to t
+    along parent_b. Pass the same id twice to join the halves at one cell.
+    """
+    path = flat.trace_ids(parent_f, forward_end)
+    node = backward_start
+    if node == forward_end:
+        node = parent_b[node] if parent_b[node] != node else -1
+    while node >= 0:
+        path.append(node)
+        previous = parent_b[node]
+        node = previous if previous != node else -1
+    return path
+
+
+def bidirectional_bfs_flat(grid, start, end, sides=None):
+    """
+    Bidirectional Breadth-First Search on flat cell ids.
+
+    Args:
+        grid: ArrayGrid, 2D list of Node objects or FlatGrid
+        start: Tuple (row, col) for start position
+        end: Tuple (row, col) for end position
+        sides: Optional list, filled with 0/1 (forward/backward) per visited node
+
+    Returns:
+        Tuple of (visited_list, path_list)
+    """
+    if known_unreachable(grid, start, end):
+        return [], []
+
+    flat = as_flat_grid(grid)
+    visited, path = bidirectional_bfs_ids(flat, flat.index(start), flat.index(end), sides)
+    return flat.positions(visited), flat.positions(path)
+
+
+def bidirectional_astar_flat(grid, start, end, sides=None):
+    """
+    Bidirectional A* (cost + delay, Manhattan heuristic) on flat cell ids.
+
+    Args:
+        grid: ArrayGrid, 2D list of Node objects or FlatGrid
+        start: Tuple (row, col) for start position
+        end: Tuple (row, col) for end position
+        sides: Optional list, filled with 0/1 (forward/backward) per visited node
+
+    Returns:
+        Tuple of (visited_list, path_list)
+    """
+    if known_unreachable(grid, start, end):
+        return [], []
+
+    flat = as_flat_grid(grid)
+    visited, path = bidirectional_astar_ids(flat, flat.index(start), flat.index(end), sides)
+    return flat.positions(visited), flat.positions(path)
@@ -0,0 +1,252 @@
+"""
+Connected-component index for answering unreachable queries in O(1).
+
+When the end lies in a different region than the start, every search floods
+the whole region around the start before giving up. A ComponentIndex labels
+every walkable cell with its 4-connected region once per grid, so those
+queries are answered by comparing two labels.
+
+The labels are built with NumPy: horizontal runs of free cells get one label
+each, and runs touching vertically are then merged by min-label hooking and
+pointer jumping over all run pairs at once. Afterwards, obstacle toggles made
+through ArrayGrid.set_obstacle() (which grid[r][c].is_obstacle = ... uses)
+update the labels incrementally instead of rebuilding them.
+"""
+from collections import deque
+
+import numpy as np
+
+from visualization.grid_array import ArrayGrid
+from visualization.search.neighbors import FOUR_CONNECTED, NEIGHBORHOODS
+
+
+def label_components(free):
+    """
+    Label the 4-connected regions of a 2D bool array.
+
+    Args:
+        free: (rows, cols) bool array, True for walkable cells
+
+    Returns:
+        (rows, cols) int32 array. Blocked cells are 0, and two free cells
+        share a positive label exactly when they are connected. Labels are
+        not consecutive.
+    """
+    rows, cols = free.shape
+    if free.size == 0:
+        return np.zeros((rows, cols), dtype=np.int32)
+
+    # One id per horizontal run of free cells, numbered from 1
+    run_starts = free.copy()
+    run_starts[:, 1:] &= ~free[:, :-1]
+    run_id = np.cumsum(run_starts.ravel(), dtype=np.int32).reshape(rows, cols)
+    run_count = int(run_id[-1, -1])
+
+    # Pairs of runs touching vertically. Neighboring columns usually repeat
+    # the same pair, so keep only where the pair changes.
+    touching = free[1:, :] & free[:-1, :]
+    upper = run_id[:-1, :][touching]
+    lower = run_id[1:, :][touching]
+    if upper.size:
+        changed = np.empty(upper.size, dtype=np.bool_)
+        changed[0] = True
+        changed[1:] = (upper[1:] != upper[:-1]) | (lower[1:] != lower[:-1])
+        upper, lower = upper[changed], lower[changed]
+
+    # Hook every root onto the smallest root it touches, then flatten the
+    # trees, until each pair of touching runs shares a root. Every round
+    # merges each unfinished region with at least one neighbor, so this
+    # takes O(log runs) rounds.
+    parent = np.arange(run_count + 1, dtype=np.int32)
+    while upper.size:
+        root_upper = parent[upper]
+        root_lower = parent[lower]
+        split = root_upper != root_lower
+        if not split.any():
+            break
+        upper, lower = upper[split], lower[split]
+        root_upper, root_lower = root_upper[split], root_lower[split]
+        np.minimum.at(parent, np.maximum(root_upper, root_lower),
+                      np.minimum(root_upper, root_lower))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    return np.where(free, parent[run_id], 0).astype(np.int32)
+
+
+class ComponentIndex:
+    """
+    Region labels for one ArrayGrid, kept current as obstacles are toggled.
+
+    Use ComponentIndex.for_grid(grid) to get the grid's index; it is built
+    on first use and attached to the grid as grid.components.
+    """
+
+    def __init__(self, grid):
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self.width = grid.cols + 2
+
+        # Padded, flattened like FlatGrid, so the border reads as blocked (0)
+        padded = np.zeros((grid.rows + 2, self.width), dtype=np.int32)
+        padded[1:-1, 1:-1] = label_components(~grid.obstacle)
+        self.labels = padded.ravel()
+        self.offsets = (1, self.width, -1, -self.width)
+        self._next_label = int(self.labels.max()) + 1
+
+    @classmethod
+    def for_grid(cls, grid):
+        """Return grid's attached index, building it if needed."""
+        if grid.components is None:
+            grid.components = cls(grid)
+        return grid.components
+
+    def label(self, pos):
+        """Region label of a (row, col) cell, 0 if it is an obstacle."""
+        return int(self.labels[(pos[0] + 1) * self.width + pos[1] + 1])
+
+    def connected(self, start, end):
+        """True when start and end are both walkable and in the same region."""
+        start_label = self.label(start)
+        return start_label != 0 and start_label == self.label(end)
+
+    def set_obstacle(self, row, col, blocked):
+        """Update the labels after cell (row, col) became blocked or free."""
+        cell = (row + 1) * self.width + col + 1
+        if blocked:
+            if self.labels[cell]:
+                self.labels[cell] = 0
+                self._split_around(cell)
+        elif not self.labels[cell]:
+            self._join_at(cell)
+
+    def _join_at(self, cell):
+        """A cell opened up: give it a label, merging the regions it touches."""
+        labels = self.labels
+        touching = {int(labels[cell + offset]) for offset in self.offsets} - {0}
+
+        if not touching:
+            labels[cell] = self._next_label
+            self._next_label += 1
+            return
+
+        keep = min(touching)
+        for other in touching - {keep}:
+            labels[labels == other] = keep
+        labels[cell] = keep
+
+    def _split_around(self, cell):
+        """
+        A cell got blocked: check whether its region fell apart.
+
+        Neighbors that are still linked through a free diagonal cell stay
+        together for sure. The remaining groups each grow a BFS in turn;
+        groups merge when their searches meet, and a group whose search runs
+        out first is a region of its own and gets a new label. So the work
+        is bounded by the smaller pieces, not by the whole region.
+        """
+        labels = self.labels
+        offsets = self.offsets
+        seeds = [cell + offset for offset in offsets if labels[cell + offset]]
+        if len(seeds) < 2:
+            return
+
+        # Group neighbors that touch through a shared free diagonal cell
+        group_of = list(range(len(seeds)))
+        for i in range(len(seeds)):
+            for j in range(i + 1, len(seeds)):
+                a, b = seeds[i], seeds[j]
+                if a + b - cell != cell and labels[a + b - cell]:
+                    old, new = group_of[j], group_of[i]
+                    group_of = [new if g == old else g for g in group_of]
+        if len(set(group_of)) < 2:
+            return
+
+        owner = {}
+        queues = {}
+        members = {}
+        for seed, group in zip(seeds, group_of):
+            owner[seed] = group
+            queues.setdefault(group, deque()).append(seed)
+            members.setdefault(group, []).append(seed)
+
+        merged_into = {group: group for group in queues}
+
+        def find(group):
+            while merged_into[group] != group:
+                group = merged_into[group]
+            return group
+
+        active = list(queues)
+        while len(active) > 1:
+            for group in list(active):
+                if group not in active:
+                    continue
+                queue = queues[group]
+                if not queue:
+                    # Sealed off from every other group: a new region
+                    active.remove(group)
+                    labels[members[group]] = self._next_label
+                    self._next_label += 1
+                    if len(active) < 2:
+                        break
+                    continue
+
+                current = queue.popleft()
+                for offset in offsets:
+                    neighbor = current + offset
+                    if not labels[neighbor]:
+                        continue
+                    other = owner.get(neighbor)
+                    if other is None:
+                        owner[neighbor] = group
+                        queue.append(neighbor)
+                        members[group].append(neighbor)
+                        continue
+                    other = find(other)
+                    if other != group:
+                        # Searches met: still one region
+                        merged_into[other] = group
+                        queue.extend(queues.pop(other))
+                        members[group].extend(members.pop(other))
+                        active.remove(other)
+
+
+def flat_component_labels(flat):
+    """Region labels for a FlatGrid, as a list indexed by padded cell id."""
+    width = flat.width
+    blocked = np.frombuffer(flat.blocked, dtype=np.uint8).reshape(flat.size // width, width)
+    return label_components(blocked == 0).ravel().tolist()
+
+
+def known_unreachable(grid, start, end, neighbors=None):
+    """
+    True when the searches are certain to find no path from start to end.
+
+    ArrayGrids are checked against their ComponentIndex, which is built on
+    the first call and kept up to date afterwards, so the check is O(1).
+    Other grids always return False and are simply searched.
+
+    The labels are 4-connected, so they only prove anything for searches
+    whose steps (the kernels' neighbors option) are all 4-connected steps;
+    for others, e.g. "8", this returns False.
+    """
+    if start == end or not isinstance(grid, ArrayGrid):
+        return False
+    if neighbors is not None:
+        steps = NEIGHBORHOODS[neighbors] if isinstance(neighbors, str) else neighbors
+        if not set(map(tuple, steps)) <= set(FOUR_CONNECTED):
+            return False
+
+    index = ComponentIndex.for_grid(grid)
+    end_label = index.label(end)
+    if end_label == 0:
+        # Searches never step onto an obstacle
+        return True
+    start_label = index.label(start)
+    # Searches starting on an obstacle can still step off it, so only
+    # compare labels when the start is walkable
+    return start_label != 0 and start_label != end_label
@@ -0,0 +1,156 @@
+"""
+Single-source shortest-path trees ("distance fields") and an LRU cache.
+
+dijkstra_pathfind stops as soon as it reaches the end and throws its
+distances away. A DistanceField instead keeps the complete tree from one
+source as two compact arrays (distance and parent per cell), so every later
+query from that source to any destination is a walk along the parent array,
+O(path length), with no search at all.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from visualization.search.kernels import TREE_KERNELS, as_flat_grid
+
+
+class DistanceField:
+    """
+    Shortest-path tree from one source cell.
+
+    Attributes:
+        source: (row, col) the tree was grown from
+        algorithm: "BFS" (hop counts) or "Dijkstra" (movement costs)
+        dist: NumPy array of path costs per padded cell id, -1 if unreachable;
+            float64 when fractional costs make fractional distances
+        parent: NumPy array of parent ids per padded cell id, -1 if unreachable
+    """
+
+    def __init__(self, flat, source, algorithm, dist, parent):
+        self.source = source
+        self.algorithm = algorithm
+        self.rows = flat.rows
+        self.cols = flat.cols
+        self.width = flat.width
+
+        # Smallest dtypes that can hold every value
+        if algorithm == "BFS" or flat.integral:
+            dtype = np.int32 if max(dist) < 2**31 else np.int64
+        else:
+            dtype = np.float64
+        self.dist = np.array(dist, dtype=dtype)
+        self.parent = np.frombuffer(parent, dtype=np.int64).astype(
+            np.int32 if flat.size < 2**31 else np.int64)
+
+    @property
+    def nbytes(self):
+        return self.dist.nbytes + self.parent.nbytes
+
+    def _index(self, pos):
+        r, c = pos
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise IndexError(f"{pos} is outside the grid")
+        return (r + 1) * self.width + c + 1
+
+    def distance(self, pos):
+        """Shortest path cost from the source to pos, or None if unreachable."""
+        value = self.dist[self._index(pos)].item()
+        return None if value < 0 else value
+
+    def path_to(self, pos):
+        """
+        Shortest path from the source to pos.
+
+        Returns:
+            List of (row, col) tuples from source to pos, empty if unreachable
+        """
+        node = self._index(pos)
+        parent = self.parent
+        if parent[node] < 0:
+            return []
+
+        width = self.width
+        path = [(node // width - 1, node % width - 1)]
+        while True:
+            previous = int(parent[node])
+            if previous == node:
+                break
+            node = previous
+            path.append((node // width - 1, node % width - 1))
+
+        path.reverse()
+        return path
+
+
+def build_distance_field(grid, source, algorithm="Dijkstra"):
+    """
+    Grow the complete shortest-path tree from source.
+
+    Args:
+        grid: ArrayGrid, 2D list of Node objects or FlatGrid
+        source: Tuple (row, col)
+        algorithm: "BFS" or "Dijkstra"
+
+    Returns:
+        DistanceField
+    """
+    if algorithm not in TREE_KERNELS:
+        raise ValueError(f"No single-source tree mode for {algorithm}")
+
+    flat = as_flat_grid(grid)
+    dist, parent = TREE_KERNELS[algorithm](flat, flat.index(source))
+    return DistanceField(flat, source, algorithm, dist, parent)
+
+
+class DistanceFieldCache:
+    """
+    Memory-bounded LRU of DistanceFields keyed by (grid version, source, algorithm).
+
+    Any change to an ArrayGrid gives it a new version, so stale trees are
+    never returned; they just age out of the LRU.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._fields = OrderedDict()
+
+    def get(self, grid, source, algorithm="Dijkstra"):
+        """Return the cached tree for source, building it on a miss."""
+        version = getattr(grid, 'version', None)
+        if version is None:
+            # No way to tell whether a plain Node grid changed, so never cache it
+            self.misses += 1
+            return build_distance_field(grid, source, algorithm)
+
+        key = (version, tuple(source), algorithm)
+        field = self._fields.get(key)
+        if field is not None:
+            self.hits += 1
+            self._fields.move_to_end(key)
+            return field
+
+        self.misses += 1
+        field = build_distance_field(grid, source, algorithm)
+        self._fields[key] = field
+        self.total_bytes += field.nbytes
+
+        # Evict least recently used trees, but always keep the newest one
+        while self.total_bytes > self.max_bytes and len(self._fields) > 1:
+            _, evicted = self._fields.popitem(last=False)
+            self.total_bytes -= evicted.nbytes
+
+        return field
+
+    def path(self, grid, source, target, algorithm="Dijkstra"):
+        """Shortest path from source to target, answered from the cached tree."""
+        return self.get(grid, source, algorithm).path_to(target)
+
+    def clear(self):
+        self._fields.clear()
+        self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._fields)
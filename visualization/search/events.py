@@ -0,0 +1,256 @@
+"""
+Streaming searches: generators yielding exploration events.
+
+The kernels in visualization/search/kernels.py return their whole visited
+list when they finish. The generators here run the same searches (same
+frontiers, neighbor order and tie-breaking, so the same cells in the same
+order) but yield an event each time something happens, so a consumer can
+draw or record the search as it goes, hold only what it needs, and stop it
+early by simply not asking for more (or calling close()).
+
+Events are small tuples whose first item is the kind:
+
+    (EXPAND, cell)          cell was taken off the frontier and is expanded
+    (PUSH, cell, parent)    cell was reached for the first time, from parent
+    (RELAX, cell, parent)   cell, already queued, got a cheaper route via parent
+    (FOUND, path)           the search reached the end; path is start to end
+
+A search that can't reach the end just stops without a FOUND event. The
+*_events functions work on FlatGrid cell ids like the *_ids kernels;
+position_events() runs one on (row, col) endpoints and converts every cell
+in its events to (row, col) tuples.
+
+Which event puts a cell in the kernel's visited list depends on the search:
+BFS and DFS report cells when they discover them (every PUSH, including the
+start), Dijkstra and A* when they close them (every EXPAND). VISITED_EVENT
+records that per algorithm, so collecting those events reproduces visited_list.
+"""
+from array import array
+
+from visualization.search.components import known_unreachable
+from visualization.search.frontier import new_frontier, new_plain_frontier
+from visualization.search.flat_grid import as_flat_grid
+from visualization.search.neighbors import step_offsets, step_span
+
+EXPAND = "expand"
+PUSH = "push"
+RELAX = "relax"
+FOUND = "path"
+
+
+def bfs_events(flat, s, t, frontier=None, neighbors=None):
+    """BFS from cell id s to t, as in bfs_ids, yielding events."""
+    offsets = step_offsets(flat, neighbors)
+
+    seen = bytearray(flat.blocked)
+    parent = array('q', [0]) * flat.size
+    seen[s] = 1
+    parent[s] = s
+
+    frontier = new_plain_frontier(frontier)
+    push = frontier.push
+    push(s)
+    yield (PUSH, s, s)
+
+    for current in frontier:
+        if current == t:
+            yield (FOUND, flat.trace_ids(parent, t))
+            return
+
+        yield (EXPAND, current)
+        for offset in offsets:
+            neighbor = current + offset
+            if not seen[neighbor]:
+                seen[neighbor] = 1
+                parent[neighbor] = current
+                push(neighbor)
+                yield (PUSH, neighbor, current)
+
+
+def dijkstra_events(flat, s, t, frontier=None, neighbors=None):
+    """Dijkstra (cost + delay) from cell id s to t, as in dijkstra_ids, yielding events."""
+    offsets = step_offsets(flat, neighbors)
+    weight = flat.weight
+    size = flat.size
+
+    closed = bytearray(flat.blocked)
+    closed[s] = 0
+    parent = array('q', [0]) * size
+    parent[s] = s
+    dist = [-1] * size
+    dist[s] = 0
+
+    frontier = new_frontier(frontier, flat.min_weight, flat.max_weight, size, len(offsets))
+    push = frontier.push
+    push(0, s)
+    yield (PUSH, s, s)
+
+    for current in frontier:
+        if closed[current]:
+            continue
+
+        closed[current] = 1
+        yield (EXPAND, current)
+
+        if current == t:
+            yield (FOUND, flat.trace_ids(parent, t))
+            return
+
+        current_dist = dist[current]
+        for offset in offsets:
+            neighbor = current + offset
+            if closed[neighbor]:
+                continue
+
+            new_dist = current_dist + weight[neighbor]
+            old_dist = dist[neighbor]
+            if old_dist < 0 or new_dist < old_dist:
+                dist[neighbor] = new_dist
+                parent[neighbor] = current
+                push(new_dist, neighbor)
+                yield (PUSH if old_dist < 0 else RELAX, neighbor, current)
+
+
+def astar_events(flat, s, t, frontier=None, neighbors=None):
+    """A* (cost + delay, Manhattan heuristic) from cell id s to t, as in astar_ids, yielding events."""
+    offsets = step_offsets(flat, neighbors)
+    span = step_span(neighbors)
+    weight = flat.weight
+    size = flat.size
+    width = flat.width
+    start_r, start_c = divmod(s, width)
+    end_r, end_c = divmod(t, width)
+
+    closed = bytearray(flat.blocked)
+    closed[s] = 0
+    parent = array('q', [0]) * size
+    parent[s] = s
+    g_score = [-1] * size
+    g_score[s] = 0
+
+    frontier = new_frontier(frontier, flat.min_weight - span, flat.max_weight + span, size, len(offsets))
+    push = frontier.push
+    push(abs(start_r - end_r) + abs(start_c - end_c), s)
+    yield (PUSH, s, s)
+
+    for current in frontier:
+        if closed[current]:
+            continue
+
+        closed[current] = 1
+        yield (EXPAND, current)
+
+        if current == t:
+            yield (FOUND, flat.trace_ids(parent, t))
+            return
+
+        current_g = g_score[current]
+        for offset in offsets:
+            neighbor = current + offset
+            if closed[neighbor]:
+                continue
+
+            tentative_g = current_g + weight[neighbor]
+            old_g = g_score[neighbor]
+            if old_g < 0 or tentative_g < old_g:
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = current
+                r, c = divmod(neighbor, width)
+                push(tentative_g + abs(r - end_r) + abs(c - end_c), neighbor)
+                yield (PUSH if old_g < 0 else RELAX, neighbor, current)
+
+
+def dfs_events(flat, s, t, neighbors=None):
+    """DFS from cell id s to t, as in dfs_ids, yielding events."""
+    offsets = step_offsets(flat, neighbors)
+    directions = len(offsets)
+
+    seen = bytearray(flat.blocked)
+    next_dir = bytearray(flat.size)
+    parent = array('q', [0]) * flat.size
+    seen[s] = 1
+    parent[s] = s
+    yield (PUSH, s, s)
+
+    if s == t:
+        yield (FOUND, [s])
+        return
+
+    stack = [s]
+    while stack:
+        current = stack[-1]
+        d = next_dir[current]
+        if d == 0:
+            yield (EXPAND, current)
+        if d == directions:
+            stack.pop()
+            continue
+
+        next_dir[current] = d + 1
+        neighbor = current + offsets[d]
+        if not seen[neighbor]:
+            seen[neighbor] = 1
+            parent[neighbor] = current
+            yield (PUSH, neighbor, current)
+            if neighbor == t:
+                yield (FOUND, flat.trace_ids(parent, t))
+                return
+            stack.append(neighbor)
+
+
+def position_events(kernel, grid, start, end, **options):
+    """
+    Run an event kernel on (row, col) endpoints, yielding its events with
+    every cell converted to a (row, col) tuple.
+
+    Args:
+        kernel: One of the *_events functions
+        grid: ArrayGrid, 2D list of Node objects, node grid or FlatGrid
+        start, end: (row, col) tuples
+        options: frontier/neighbors, passed on to the kernel
+    """
+    if known_unreachable(grid, start, end, options.get("neighbors")):
+        return
+
+    flat = as_flat_grid(grid)
+    width = flat.width
+    for event in kernel(flat, flat.index(start), flat.index(end), **options):
+        kind = event[0]
+        if kind == FOUND:
+            yield (FOUND, flat.positions(event[1]))
+        elif kind == EXPAND:
+            cell = event[1]
+            yield (EXPAND, (cell // width - 1, cell % width - 1))
+        else:
+            cell, parent = event[1], event[2]
+            yield (kind, (cell // width - 1, cell % width - 1),
+                   (parent // width - 1, parent % width - 1))
+
+
+def replay_events(visited, path):
+    """
+    Events for an engine that only returns (visited_list, path_list): an
+    EXPAND per visited cell, then FOUND if there is a path. Unlike the event
+    kernels this runs the whole search before the first event.
+    """
+    for cell in visited:
+        yield (EXPAND, cell)
+    if path:
+        yield (FOUND, path)
+
+
+# Event kernels by algorithm name, like kernels.ID_KERNELS
+EVENT_KERNELS = {
+    "BFS": bfs_events,
+    "Dijkstra": dijkstra_events,
+    "A*": astar_events,
+    "DFS": dfs_events,
+}
+
+# The event kind that adds a cell to each algorithm's visited list
+VISITED_EVENT = {
+    "BFS": PUSH,
+    "Dijkstra": EXPAND,
+    "A*": EXPAND,
+    "DFS": PUSH,
+}
@@ -0,0 +1,133 @@
+"""
+Flattened, padded grid layout used by the index-based search kernels.
+
+Every cell gets an integer id r * width + c in a grid that has been padded
+with a one-cell obstacle border. Neighbor lookups then become a fixed offset
+added to the id, without any bounds checks.
+
+FlatGrid is also the common grid protocol of the search engines: it can be
+built from an ArrayGrid, a 2D list of Node objects, or any grid object with
+rows, cols and get_node(row, col) like the one algorithms/ is written for.
+Cells need is_obstacle; cost (default 1) and delay (default 0) are optional.
+"""
+import numpy as np
+
+from visualization.grid_array import ArrayGrid
+
+
+class FlatGrid:
+    """
+    Read-only flat snapshot of a grid.
+
+    Attributes:
+        rows, cols: Size of the original (unpadded) grid
+        width: Row stride of the padded grid (cols + 2)
+        size: Number of cells in the padded grid
+        version: ArrayGrid.version the snapshot was taken at
+        blocked: bytes, 1 for obstacle or padding, 0 for walkable
+        cost: list of per-cell movement costs
+        delay: list of per-cell delays, None when every delay is 0
+        weight: list of per-cell entry costs (cost + delay), the edge
+            weights of the weighted searches
+        min_weight, max_weight: Smallest and largest entry of weight
+        integral: True when every weight is an integer
+        offsets: Neighbor id offsets in (0,1), (1,0), (0,-1), (-1,0) order
+    """
+
+    def __init__(self, grid):
+        if not isinstance(grid, ArrayGrid):
+            grid = ArrayGrid.from_nodes(grid)
+
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self.version = grid.version
+        self.width = grid.cols + 2
+        self.size = (grid.rows + 2) * self.width
+
+        blocked = np.ones((grid.rows + 2, self.width), dtype=np.uint8)
+        blocked[1:-1, 1:-1] = grid.obstacle
+        self.blocked = blocked.tobytes()
+
+        # int64, or float64 for fractional costs
+        cost = np.ones((grid.rows + 2, self.width), dtype=np.result_type(grid.cost, np.int64))
+        cost[1:-1, 1:-1] = grid.cost
+        self.cost = cost.ravel().tolist()
+
+        self.delay = None
+        weight = cost
+        if grid.delay.any():
+            delay = np.zeros((grid.rows + 2, self.width), dtype=np.result_type(grid.delay, np.int64))
+            delay[1:-1, 1:-1] = grid.delay
+            self.delay = delay.ravel().tolist()
+            weight = cost + delay
+        self.weight = self.cost if self.delay is None else weight.ravel().tolist()
+        self.min_weight = weight.min().item()
+        self.max_weight = weight.max().item()
+        self.integral = weight.dtype.kind in "iu"
+
+        self.offsets = (1, self.width, -1, -self.width)
+
+    @classmethod
+    def from_padded(cls, rows, cols, blocked, cost, delay=None):
+        """
+        Rebuild a FlatGrid from already padded, flattened buffers.
+
+        Args:
+            rows, cols: Size of the original (unpadded) grid
+            blocked: Buffer of (rows + 2) * (cols + 2) bytes
+            cost: Sequence of the same length with per-cell costs
+            delay: Optional sequence of the same length with per-cell delays
+        """
+        flat = cls.__new__(cls)
+        flat.rows = rows
+        flat.cols = cols
+        flat.version = None
+        flat.width = cols + 2
+        flat.size = (rows + 2) * flat.width
+        flat.blocked = bytes(blocked)
+        flat.cost = cost.tolist() if hasattr(cost, 'tolist') else list(cost)
+        flat.delay = None
+        flat.weight = flat.cost
+        if delay is not None:
+            delay = delay.tolist() if hasattr(delay, 'tolist') else list(delay)
+            if any(delay):
+                flat.delay = delay
+                flat.weight = [c + d for c, d in zip(flat.cost, delay)]
+        flat.min_weight = min(flat.weight)
+        flat.max_weight = max(flat.weight)
+        flat.integral = not any(isinstance(w, float) for w in flat.weight)
+        flat.offsets = (1, flat.width, -1, -flat.width)
+        return flat
+
+    def entry_costs(self):
+        """Cost of stepping into each cell: movement cost plus delay."""
+        return self.weight
+
+    def index(self, pos):
+        """Convert a (row, col) tuple to a flat cell id."""
+        return (pos[0] + 1) * self.width + pos[1] + 1
+
+    def position(self, index):
+        """Convert a flat cell id back to a (row, col) tuple."""
+        r, c = divmod(index, self.width)
+        return (r - 1, c - 1)
+
+    def positions(self, indices):
+        """Convert a sequence of flat cell ids to (row, col) tuples."""
+        width = self.width
+        return [(i // width - 1, i % width - 1) for i in indices]
+
+    def trace_ids(self, parent, end):
+        """Walk a parent array (start is its own parent) back from end to start."""
+        path = [end]
+        node = parent[end]
+        while node != path[-1]:
+            path.append(node)
+            node = parent[node]
+        path.reverse()
+        return path
+
+
+def as_flat_grid(grid):
+    """Return grid as a FlatGrid, building one if needed."""
+    return grid if isinstance(grid, FlatGrid) else FlatGrid(grid)
@@ -0,0 +1,267 @@
+"""
+Pluggable frontiers (open lists) for the search kernels.
+
+A frontier is used once per search:
+
+    frontier = make_frontier(min_step, max_step, size)
+    frontier.push(priority, item)
+    for item in frontier:       # smallest priority first
+        ...                     # may push more items while iterating
+
+Priority frontiers (HeapFrontier, BucketFrontier) serve Dijkstra and A*.
+Items with equal priority come out in the order they were pushed, so both
+give the same expansion order as a heap with an insertion counter as
+tie-breaker. Stale entries are not removed; searches skip items they
+already closed, as they do with heapq.
+
+Plain frontiers (QueueFrontier, StackFrontier) serve BFS-style searches that
+close a cell as soon as it is discovered. They have no priorities, so their
+push takes just the item and is the list's own append.
+
+HeapFrontier is a binary heap and works for any priorities. BucketFrontier
+is Dial's bucket queue: a ring of max_step + 1 FIFO buckets, one per
+priority, which is O(1) per push and pop. It is only valid when the searches
+never push a priority below the one being expanded or more than max_step
+above it. That holds for Dijkstra with non-negative integer costs
+(steps 0..max cost) and for A* with the Manhattan heuristic when every cost
+is at least 1 (f grows by cost - 1 to cost + 1 per step). The grids here use
+integer costs 1-5, so make_frontier() picks buckets for them automatically.
+
+Inside a count_operations() block every frontier the kernels create is
+wrapped in a CountingFrontier, so benchmarks can count pushes and pops
+whichever frontier a search uses. Outside one, nothing is wrapped.
+"""
+from contextlib import contextmanager
+from heapq import heappop, heappush
+import itertools
+
+# Largest priority step for which a bucket ring beats the heap. Above this
+# most buckets are empty and scanning past them costs more than heap pops.
+MAX_BUCKET_STEP = 64
+
+
+class QueueFrontier:
+    """First in, first out; push(item)."""
+
+    def __init__(self):
+        self.items = []
+        self.push = self.items.append
+
+    def __iter__(self):
+        # List iteration picks up items appended while iterating
+        return iter(self.items)
+
+
+class StackFrontier:
+    """Last in, first out; push(item)."""
+
+    def __init__(self):
+        self.items = []
+        self.push = self.items.append
+
+    def __iter__(self):
+        items = self.items
+        while items:
+            yield items.pop()
+
+
+class HeapFrontier:
+    """
+    Binary heap frontier.
+
+    With size given, items must be ints in range(size) (cell ids),
+    priorities non-negative ints and at most degree * size + 1 pushes made,
+    which holds for the flat kernels when degree is the number of neighbor
+    steps (every cell is closed once and pushes each neighbor at most once
+    then). Each entry is then packed into a single int (priority, push
+    order, item) instead of a tuple.
+    """
+
+    def __init__(self, size=None, degree=4):
+        self.size = size
+        self.heap = heap = []
+
+        if size is None:
+            counter = itertools.count()
+
+            def push(priority, item):
+                heappush(heap, (priority, next(counter), item))
+        else:
+            key_span = (degree * size + 1) * size
+            seq = itertools.count(0, size)
+
+            def push(priority, item):
+                heappush(heap, priority * key_span + next(seq) + item)
+
+        self.push = push
+
+    def __iter__(self):
+        heap = self.heap
+        size = self.size
+        if size is None:
+            while heap:
+                yield heappop(heap)[2]
+        else:
+            while heap:
+                yield heappop(heap) % size
+
+
+class BucketFrontier:
+    """
+    Dial's bucket queue for integer priorities that grow by 0..max_step.
+
+    Priority p lives in bucket p % (max_step + 1). All queued priorities lie
+    within max_step of the one being expanded, so they never share a bucket
+    with a different priority, and the ring is empty once a full turn finds
+    nothing.
+    """
+
+    def __init__(self, max_step):
+        self.count = count = max_step + 1
+        self.buckets = buckets = [[] for _ in range(count)]
+
+        def push(priority, item):
+            buckets[priority % count].append(item)
+
+        self.push = push
+
+    def __iter__(self):
+        buckets = self.buckets
+        count = self.count
+        slot = 0
+        empty_run = 0
+        while empty_run < count:
+            bucket = buckets[slot]
+            if bucket:
+                empty_run = 0
+                # List iteration also picks up items pushed at the same
+                # priority while this bucket is being expanded
+                yield from bucket
+                bucket.clear()
+            else:
+                empty_run += 1
+            slot = slot + 1 if slot + 1 < count else 0
+
+
+class FrontierStats:
+    """Push and pop totals collected by count_operations()."""
+
+    def __init__(self):
+        self.pushes = 0
+        self.pops = 0
+
+
+class CountingFrontier:
+    """Wraps a frontier of either kind, counting its pushes and pops into stats."""
+
+    def __init__(self, frontier, stats):
+        self.frontier = frontier
+        inner_push = frontier.push
+
+        def push(*entry):
+            stats.pushes += 1
+            inner_push(*entry)
+
+        self.push = push
+        self.stats = stats
+
+    def __iter__(self):
+        stats = self.stats
+        for item in self.frontier:
+            stats.pops += 1
+            yield item
+
+
+# FrontierStats of the count_operations() blocks currently open
+_counting = []
+
+
+@contextmanager
+def count_operations():
+    """
+    Count the pushes and pops of every frontier created inside the block.
+
+    Yields:
+        FrontierStats, filled in as searches run
+    """
+    stats = FrontierStats()
+    _counting.append(stats)
+    try:
+        yield stats
+    finally:
+        _counting.remove(stats)
+
+
+def _observed(frontier):
+    if not _counting:
+        return frontier
+    return CountingFrontier(frontier, _counting[-1])
+
+
+# Frontiers by name. Plain ones take no arguments, priority ones are built
+# from (min_step, max_step, size, degree) like make_frontier()
+PLAIN_FRONTIERS = {
+    "queue": QueueFrontier,
+    "stack": StackFrontier,
+}
+PRIORITY_FRONTIERS = {
+    "heap": lambda min_step, max_step, size, degree: HeapFrontier(size, degree),
+    "bucket": lambda min_step, max_step, size, degree: BucketFrontier(max_step),
+}
+
+
+def make_frontier(min_step, max_step, size=None, degree=4):
+    """
+    Pick the fastest frontier that is valid for a search.
+
+    Args:
+        min_step, max_step: Smallest and largest amount a pushed priority
+            can exceed the priority being expanded (e.g. the min and max
+            edge cost for Dijkstra)
+        size: Passed to HeapFrontier when items are cell ids below size
+        degree: Neighbor steps per cell, bounds HeapFrontier's push count
+
+    Returns:
+        BucketFrontier when priorities are integers that never decrease and
+        grow by at most MAX_BUCKET_STEP, else HeapFrontier
+    """
+    integral = isinstance(min_step, int) and isinstance(max_step, int)
+    if integral and 0 <= min_step and max_step <= MAX_BUCKET_STEP:
+        return _observed(BucketFrontier(max_step))
+    # Packed heap keys need non-negative integer priorities
+    if not (integral and 0 <= min_step):
+        size = None
+    return _observed(HeapFrontier(size, degree))
+
+
+def new_frontier(frontier, min_step, max_step, size=None, degree=4):
+    """
+    Resolve a weighted kernel's frontier argument.
+
+    Args:
+        frontier: None or "auto" for make_frontier(), a key of
+            PRIORITY_FRONTIERS, or a frontier instance, used as is
+        min_step, max_step, size, degree: As for make_frontier()
+    """
+    if frontier is None or frontier == "auto":
+        return make_frontier(min_step, max_step, size, degree)
+    if isinstance(frontier, str):
+        if frontier not in PRIORITY_FRONTIERS:
+            raise ValueError(f"Unknown priority frontier: {frontier}")
+        if frontier == "bucket" and not (isinstance(min_step, int) and 0 <= min_step):
+            raise ValueError("bucket frontier needs priorities that never decrease")
+        if not (isinstance(min_step, int) and isinstance(max_step, int) and 0 <= min_step):
+            size = None
+        return _observed(PRIORITY_FRONTIERS[frontier](min_step, max_step, size, degree))
+    return _observed(frontier)
+
+
+def new_plain_frontier(frontier):
+    """Resolve an unweighted kernel's frontier argument (default "queue")."""
+    if frontier is None:
+        return _observed(QueueFrontier())
+    if isinstance(frontier, str):
+        if frontier not in PLAIN_FRONTIERS:
+            raise ValueError(f"Unknown plain frontier: {frontier}")
+        return _observed(PLAIN_FRONTIERS[frontier]())
+    return _observed(frontier)
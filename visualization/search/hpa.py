@@ -0,0 +1,487 @@
+"""
+Hierarchical pathfinding (HPA*) for large grids.
+
+The grid is cut into square clusters. Wherever two neighboring clusters
+share a run of open cells along their border, that run is an entrance, and
+one or two cell pairs on it become transitions: abstract nodes joined by an
+inter-cluster edge. Inside every cluster the exact shortest-path cost
+between each pair of its abstract nodes is precomputed with a search that
+never leaves the cluster.
+
+A query adds the start and end to the abstract graph (one search inside
+their own clusters), runs A* on the small abstract graph, and refines each
+abstract hop back into cells with a search inside a single cluster.
+
+Error bound:
+    The search is exact except that a path may only cross a cluster border
+    at a transition. Narrow entrances (< 6 cells) have one transition in
+    the middle, wider ones one at each end, so the nearest transition is at
+    most d = cluster_size // 2 cells from any crossing point. Moving a
+    crossing there detours at most d cells along each side of the border:
+
+        cost(HPA*) <= cost(optimal) + k * 2 * d * w_max
+
+    where k is the number of cluster borders the optimal path crosses and
+    w_max is the largest cost + delay of a cell. On uniform-cost grids
+    paths are usually within a few percent of optimal.
+"""
+from collections import OrderedDict
+import heapq
+import itertools
+import time
+
+import numpy as np
+
+from visualization.search.components import known_unreachable
+from visualization.search.kernels import as_flat_grid, astar_flat
+
+# Entrances at least this wide get a transition at each end instead of one
+# in the middle
+WIDE_ENTRANCE = 6
+
+
+class AbstractGraph:
+    """
+    Cluster abstraction of one grid.
+
+    Attributes:
+        cluster_size: Side length of the square clusters
+        nodes: Padded cell id of each abstract node
+        edges: Per node, list of (neighbor node, cost) out-edges
+        cluster_nodes: Per cluster id, list of its abstract nodes
+        build_ms: Time taken to build the graph
+    """
+
+    def __init__(self, grid, cluster_size=16):
+        t0 = time.perf_counter()
+        flat = as_flat_grid(grid)
+        if not flat.integral:
+            raise ValueError("HPA* needs integer cell costs")
+        self.rows = flat.rows
+        self.cols = flat.cols
+        self.width = flat.width
+        self.version = flat.version
+        self.cluster_size = cluster_size
+        self.cluster_cols = -(-flat.cols // cluster_size)
+        self.cluster_rows = -(-flat.rows // cluster_size)
+
+        height = flat.size // flat.width
+        self.blocked = np.frombuffer(flat.blocked, dtype=np.uint8).reshape(height, flat.width)
+        self.weight = np.asarray(flat.entry_costs(), dtype=np.int64).reshape(height, flat.width)
+
+        self.nodes = []
+        self.edges = []
+        self.node_of_cell = {}
+        self.cluster_nodes = [[] for _ in range(self.cluster_rows * self.cluster_cols)]
+
+        self._add_entrances()
+        self._add_intra_edges()
+        self.build_ms = (time.perf_counter() - t0) * 1000
+
+    @property
+    def edge_count(self):
+        return sum(len(out) for out in self.edges)
+
+    def stats(self):
+        """Build time and abstract graph size, for benchmark output."""
+        return {
+            "build_ms": round(self.build_ms, 3),
+            "abstract_nodes": len(self.nodes),
+            "abstract_edges": self.edge_count,
+        }
+
+    # --------------------------------------------------
+    # BUILD
+    # --------------------------------------------------
+
+    def cluster_of(self, cell):
+        r, c = divmod(cell, self.width)
+        return ((r - 1) // self.cluster_size) * self.cluster_cols + (c - 1) // self.cluster_size
+
+    def _node(self, cell):
+        node = self.node_of_cell.get(cell)
+        if node is None:
+            node = len(self.nodes)
+            self.node_of_cell[cell] = node
+            self.nodes.append(cell)
+            self.edges.append([])
+            self.cluster_nodes[self.cluster_of(cell)].append(node)
+        return node
+
+    def _add_entrances(self):
+        size = self.cluster_size
+        width = self.width
+        weight = self.weight.ravel()
+
+        # Horizontal borders: cell pairs (r - 1, c) / (r, c), runs cut at cluster columns
+        for r in range(size, self.rows, size):
+            open_pairs = (self.blocked[r, 1:-1] == 0) & (self.blocked[r + 1, 1:-1] == 0)
+            for first, last in _runs(open_pairs, size):
+                for c in _transitions(first, last):
+                    self._connect(r * width + c + 1, (r + 1) * width + c + 1, weight)
+
+        # Vertical borders: cell pairs (r, c - 1) / (r, c), runs cut at cluster rows
+        for c in range(size, self.cols, size):
+            open_pairs = (self.blocked[1:-1, c] == 0) & (self.blocked[1:-1, c + 1] == 0)
+            for first, last in _runs(open_pairs, size):
+                for r in _transitions(first, last):
+                    self._connect((r + 1) * width + c, (r + 1) * width + c + 1, weight)
+
+    def _connect(self, a, b, weight):
+        node_a, node_b = self._node(a), self._node(b)
+        self.edges[node_a].append((node_b, int(weight[b])))
+        self.edges[node_b].append((node_a, int(weight[a])))
+
+    def _add_intra_edges(self):
+        for cluster, members in enumerate(self.cluster_nodes):
+            if len(members) < 2:
+                continue
+            local = _ClusterView(self, cluster)
+            for node in members:
+                dist, _ = local.search(local.to_local(self.nodes[node]))
+                out = self.edges[node]
+                for other in members:
+                    if other != node:
+                        d = dist[local.to_local(self.nodes[other])]
+                        if d >= 0:
+                            out.append((other, d))
+
+    # --------------------------------------------------
+    # QUERY
+    # --------------------------------------------------
+
+    def find_path(self, s, t):
+        """
+        Near-optimal path between padded cell ids s and t.
+
+        Returns:
+            (visited_ids, path_ids): the cells of the abstract nodes A*
+            expanded, in order, and the refined cell-by-cell path
+        """
+        if s == t:
+            return [s], [s]
+
+        start_view = _ClusterView(self, self.cluster_of(s))
+        end_view = _ClusterView(self, self.cluster_of(t))
+        start_dist, start_parent = start_view.search(start_view.to_local(s))
+        end_dist, end_parent = end_view.search(end_view.to_local(t), backward=True)
+
+        # Virtual abstract nodes for the two endpoints
+        start_node = len(self.nodes)
+        end_node = start_node + 1
+        cells = {start_node: s, end_node: t}
+        start_edges = []
+        for node in self.cluster_nodes[start_view.cluster]:
+            d = start_dist[start_view.to_local(self.nodes[node])]
+            if d >= 0:
+                start_edges.append((node, d))
+        end_edges = {}
+        for node in self.cluster_nodes[end_view.cluster]:
+            d = end_dist[end_view.to_local(self.nodes[node])]
+            if d >= 0:
+                end_edges[node] = d
+        if start_view.cluster == end_view.cluster:
+            d = start_dist[start_view.to_local(t)]
+            if d >= 0:
+                start_edges.append((end_node, d))
+
+        abstract_path, visited = self._abstract_search(start_node, end_node, start_edges, end_edges, cells)
+        if not abstract_path:
+            return visited, []
+
+        # Refine every abstract hop into cells
+        first = t if abstract_path[1] == end_node else self.nodes[abstract_path[1]]
+        path = start_view.trace_from_source(start_parent, first)
+        for a, b in zip(abstract_path[1:-2], abstract_path[2:-1]):
+            cell_a, cell_b = self.nodes[a], self.nodes[b]
+            cluster = self.cluster_of(cell_a)
+            if cluster != self.cluster_of(cell_b):
+                path.append(cell_b)
+            else:
+                path.extend(_ClusterView(self, cluster).shortest_path(cell_a, cell_b)[1:])
+        if abstract_path[-2] != start_node:
+            path.extend(end_view.trace_to_target(end_parent, self.nodes[abstract_path[-2]])[1:])
+
+        return visited, path
+
+    def _abstract_search(self, start_node, end_node, start_edges, end_edges, cells):
+        """A* over the abstract graph plus the two virtual endpoint nodes."""
+        width = self.width
+        end_r, end_c = divmod(cells[end_node], width)
+        nodes = self.nodes
+
+        def heuristic(node):
+            r, c = divmod(cells[node] if node >= len(nodes) else nodes[node], width)
+            return abs(r - end_r) + abs(c - end_c)
+
+        g_score = {start_node: 0}
+        parent = {start_node: None}
+        closed = set()
+        visited = []
+        counter = itertools.count()
+        heap = [(heuristic(start_node), next(counter), start_node)]
+
+        while heap:
+            _, _, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            closed.add(current)
+            visited.append(cells[current] if current >= len(nodes) else nodes[current])
+
+            if current == end_node:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parent[current]
+                return path[::-1], visited
+
+            if current == start_node:
+                out = start_edges
+            else:
+                out = self.edges[current]
+                if current in end_edges:
+                    out = out + [(end_node, end_edges[current])]
+
+            current_g = g_score[current]
+            for neighbor, cost in out:
+                if neighbor in closed:
+                    continue
+                tentative_g = current_g + cost
+                if neighbor not in g_score or tentative_g < g_score[neighbor]:
+                    g_score[neighbor] = tentative_g
+                    parent[neighbor] = current
+                    heapq.heappush(heap, (tentative_g + heuristic(neighbor), next(counter), neighbor))
+
+        return [], visited
+
+
+class _ClusterView:
+    """
+    One cluster copied into a small padded grid of its own, so searches
+    inside it need no bounds checks and can't leave it.
+    """
+
+    def __init__(self, graph, cluster):
+        self.cluster = cluster
+        size = graph.cluster_size
+        cluster_r, cluster_c = divmod(cluster, graph.cluster_cols)
+        # Padded coordinates of the cluster's top-left cell
+        self.top = cluster_r * size + 1
+        self.left = cluster_c * size + 1
+        height = min(size, graph.rows - cluster_r * size)
+        width = min(size, graph.cols - cluster_c * size)
+
+        self.graph_width = graph.width
+        self.width = width + 2
+        blocked = np.ones((height + 2, width + 2), dtype=np.uint8)
+        blocked[1:-1, 1:-1] = graph.blocked[self.top:self.top + height, self.left:self.left + width]
+        weight = np.ones((height + 2, width + 2), dtype=np.int64)
+        weight[1:-1, 1:-1] = graph.weight[self.top:self.top + height, self.left:self.left + width]
+        self.blocked = blocked.tobytes()
+        self.weight = weight.ravel().tolist()
+
+        # When every open cell costs the same, plain BFS gives the same
+        # distances as Dijkstra without the heap
+        open_weights = weight[blocked == 0]
+        self.uniform_weight = None
+        if open_weights.size and (open_weights == open_weights[0]).all():
+            self.uniform_weight = int(open_weights[0])
+
+    def to_local(self, cell):
+        r, c = divmod(cell, self.graph_width)
+        return (r - self.top + 1) * self.width + c - self.left + 1
+
+    def to_global(self, local):
+        r, c = divmod(local, self.width)
+        return (r + self.top - 1) * self.graph_width + c + self.left - 1
+
+    def search(self, source, backward=False, target=-1):
+        """
+        Dijkstra from a local id over the cluster.
+
+        With backward=True distances are costs of reaching source from each
+        cell (each step pays for the cell it enters) and parents point
+        towards source.
+
+        Returns:
+            (dist, parent) lists by local id, -1 where unreachable
+        """
+        if self.uniform_weight is not None:
+            return self._breadth_first(source, target)
+
+        weight = self.weight
+        size = len(weight)
+        width = self.width
+        offsets = (1, width, -1, -width)
+
+        closed = bytearray(self.blocked)
+        closed[source] = 0
+        dist = [-1] * size
+        parent = [-1] * size
+        dist[source] = 0
+        parent[source] = source
+        heap = [source]
+
+        while heap:
+            key = heapq.heappop(heap)
+            current = key % size
+            if closed[current]:
+                continue
+            closed[current] = 1
+            if current == target:
+                break
+
+            current_dist = key // size
+            backward_step = current_dist + weight[current]
+            for offset in offsets:
+                neighbor = current + offset
+                if closed[neighbor]:
+                    continue
+                new_dist = backward_step if backward else current_dist + weight[neighbor]
+                old_dist = dist[neighbor]
+                if old_dist < 0 or new_dist < old_dist:
+                    dist[neighbor] = new_dist
+                    parent[neighbor] = current
+                    heapq.heappush(heap, new_dist * size + neighbor)
+
+        return dist, parent
+
+    def _breadth_first(self, source, target=-1):
+        """search() for clusters of one uniform weight; same in both directions."""
+        size = len(self.weight)
+        width = self.width
+        offsets = (1, width, -1, -width)
+        step = self.uniform_weight
+
+        seen = bytearray(self.blocked)
+        seen[source] = 1
+        dist = [-1] * size
+        parent = [-1] * size
+        dist[source] = 0
+        parent[source] = source
+
+        queue = [source]
+        for current in queue:
+            if current == target:
+                break
+            next_dist = dist[current] + step
+            for offset in offsets:
+                neighbor = current + offset
+                if not seen[neighbor]:
+                    seen[neighbor] = 1
+                    dist[neighbor] = next_dist
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+
+        return dist, parent
+
+    def shortest_path(self, a, b):
+        """Global cell ids of the shortest path from a to b inside the cluster."""
+        _, parent = self.search(self.to_local(a), target=self.to_local(b))
+        path = [self.to_local(b)]
+        while parent[path[-1]] != path[-1]:
+            path.append(parent[path[-1]])
+        return [self.to_global(local) for local in reversed(path)]
+
+    def trace_from_source(self, parent, cell):
+        """Path from a forward search's source along its parents to cell."""
+        path = [self.to_local(cell)]
+        while parent[path[-1]] != path[-1]:
+            path.append(parent[path[-1]])
+        return [self.to_global(local) for local in reversed(path)]
+
+    def trace_to_target(self, parent, cell):
+        """Path from cell along a backward search's parents to its source."""
+        path = [self.to_local(cell)]
+        while parent[path[-1]] != path[-1]:
+            path.append(parent[path[-1]])
+        return [self.to_global(local) for local in path]
+
+
+def _runs(open_pairs, size):
+    """(first, last) index ranges of True runs, cut at multiples of size."""
+    runs = []
+    start = None
+    for i, is_open in enumerate(open_pairs.tolist()):
+        if start is not None and (not is_open or i % size == 0):
+            runs.append((start, i - 1))
+            start = None
+        if is_open and start is None:
+            start = i
+    if start is not None:
+        runs.append((start, len(open_pairs) - 1))
+    return runs
+
+
+def _transitions(first, last):
+    """Transition positions for an entrance spanning first..last."""
+    if last - first + 1 >= WIDE_ENTRANCE:
+        return (first, last)
+    return ((first + last) // 2,)
+
+
+class HierarchicalPathfinder:
+    """
+    HPA* engine with an LRU of abstract graphs keyed by grid version.
+
+    Called like the other engines, pathfinder(grid, start, end). The first
+    query on a grid version builds its AbstractGraph; prepare(grid) does
+    that up front and returns the build statistics.
+    """
+
+    def __init__(self, cluster_size=16, max_graphs=4):
+        self.cluster_size = cluster_size
+        self.max_graphs = max_graphs
+        self._graphs = OrderedDict()
+
+    def graph(self, grid):
+        """Return the AbstractGraph for grid's current version, building it if needed."""
+        version = getattr(grid, 'version', None)
+        if version is None:
+            return AbstractGraph(grid, self.cluster_size)
+
+        graph = self._graphs.get(version)
+        if graph is None:
+            graph = AbstractGraph(grid, self.cluster_size)
+            self._graphs[version] = graph
+            if len(self._graphs) > self.max_graphs:
+                self._graphs.popitem(last=False)
+        else:
+            self._graphs.move_to_end(version)
+        return graph
+
+    def prepare(self, grid):
+        """Build (or fetch) grid's abstract graph and return its stats."""
+        return self.graph(grid).stats()
+
+    def __call__(self, grid, start, end):
+        """
+        Hierarchical A* - near-optimal paths for large grids.
+
+        Args:
+            grid: ArrayGrid, 2D list of Node objects or FlatGrid
+            start: Tuple (row, col) for start position
+            end: Tuple (row, col) for end position
+
+        Returns:
+            Tuple of (visited_list, path_list); visited_list holds the cells
+            of the abstract nodes expanded
+        """
+        if known_unreachable(grid, start, end):
+            return [], []
+
+        graph = self.graph(grid)
+        if graph.blocked[start[0] + 1, start[1] + 1]:
+            # Searches may step off a blocked start, even across a cluster
+            # border where no entrance exists, so leave those to plain A*
+            return astar_flat(grid, start, end)
+
+        width = graph.width
+        visited, path = graph.find_path((start[0] + 1) * width + start[1] + 1,
+                                        (end[0] + 1) * width + end[1] + 1)
+        return ([(i // width - 1, i % width - 1) for i in visited],
+                [(i // width - 1, i % width - 1) for i in path])
+
+
+# Shared engine instance registered in visualization.pathfinding.ENGINES
+hpa_pathfind = HierarchicalPathfinder()
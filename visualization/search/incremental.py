@@ -0,0 +1,304 @@
+"""
+Incremental replanning with D* Lite.
+
+Every other engine searches from scratch, so toggling one obstacle or
+changing one delay costs a whole new search. A DStarLite planner keeps its
+search state (g and rhs values per cell) between queries. When cells change
+it only re-examines the cells whose shortest distance the change can affect,
+and when the start moves it keeps everything, so replanning costs roughly
+in proportion to the change, not to the grid.
+
+D* Lite searches backwards from the end towards the start. rhs(u) is the
+one-step lookahead min over neighbors v of weight(v) + g(v), where weight is
+cost + delay of entering v, like the other weighted engines. A cell is
+consistent when g == rhs. Inconsistent cells wait in a priority queue keyed
+by (min(g, rhs) + h(start, u) + km, min(g, rhs)); km grows by h(old start,
+new start) whenever the start moves so old keys stay valid lower bounds.
+
+Changes are found by comparing a padded snapshot of obstacles and weights
+with the grid, so edits made any way (grid[r][c].is_obstacle = ..., cost or
+delay setters, or writing the ArrayGrid arrays directly) are picked up.
+"""
+from collections import OrderedDict
+import heapq
+import weakref
+
+import numpy as np
+
+from visualization.grid_array import ArrayGrid
+from visualization.search.components import known_unreachable
+from visualization.search.kernels import astar_flat
+
+INF = float('inf')
+
+# Past this share of changed cells a fresh plan is cheaper than repairing
+REPLAN_FRACTION = 0.25
+
+
+def _padded_cells(grid):
+    """Padded, flattened (blocked, weight) NumPy arrays of a grid."""
+    if not isinstance(grid, ArrayGrid):
+        grid = ArrayGrid.from_nodes(grid)
+    blocked = np.pad(grid.obstacle, 1, constant_values=True).astype(np.uint8).ravel()
+    weight = grid.cost.astype(np.result_type(grid.cost, np.int64)) + grid.delay
+    weight = np.pad(weight, 1, constant_values=1).ravel()
+    return blocked, weight
+
+
+class DStarLite:
+    """
+    D* Lite planner for one end cell on one grid.
+
+    Attributes:
+        start, goal: Padded cell ids
+        expanded: Cells expanded by the last replan() call
+        changed: Cells found changed by the last replan() call
+    """
+
+    def __init__(self, grid, start, end):
+        self.rows = len(grid)
+        self.cols = len(grid[0]) if self.rows > 0 else 0
+        self.width = self.cols + 2
+        self.goal = self.index(end)
+        self.start = self.index(start)
+        self.expanded = 0
+        self.changed = 0
+        self._reset(*_padded_cells(grid), getattr(grid, 'version', None))
+
+    def index(self, pos):
+        return (pos[0] + 1) * self.width + pos[1] + 1
+
+    def _reset(self, blocked, weight, version):
+        """Start over from a fresh snapshot."""
+        self._snapshot = (blocked, weight)
+        self.version = version
+        self.blocked = bytearray(blocked.tobytes())
+        self.weight = weight.tolist()
+        size = len(self.blocked)
+        self.offsets = (1, self.width, -1, -self.width)
+
+        # Manhattan distance is only a lower bound when every move costs >= 1
+        free = blocked == 0
+        self.h_scale = 1 if not free.any() or weight[free].min() >= 1 else 0
+
+        self.km = 0
+        self.last_start = self.start
+        self.g = [INF] * size
+        self.rhs = [INF] * size
+        self.queued = [None] * size
+        self.heap = []
+        self.rhs[self.goal] = 0
+        self._update_vertex(self.goal)
+
+    def _h(self, a, b):
+        ar, ac = divmod(a, self.width)
+        br, bc = divmod(b, self.width)
+        return (abs(ar - br) + abs(ac - bc)) * self.h_scale
+
+    def _key(self, u):
+        m = min(self.g[u], self.rhs[u])
+        return (m + self._h(self.start, u) + self.km, m)
+
+    def _update_vertex(self, u):
+        """Recompute rhs(u) and (re)queue u if it is inconsistent."""
+        g, rhs, weight, blocked = self.g, self.rhs, self.weight, self.blocked
+        if u != self.goal:
+            best = INF
+            if not blocked[u]:
+                for offset in self.offsets:
+                    v = u + offset
+                    if not blocked[v]:
+                        candidate = weight[v] + g[v]
+                        if candidate < best:
+                            best = candidate
+            rhs[u] = best
+
+        if g[u] != rhs[u]:
+            key = self._key(u)
+            self.queued[u] = key
+            heapq.heappush(self.heap, (key[0], key[1], u))
+        else:
+            self.queued[u] = None
+
+    def _compute(self):
+        """Expand inconsistent cells until the start is consistent. Returns them in order."""
+        g, rhs, queued, heap, blocked = self.g, self.rhs, self.queued, self.heap, self.blocked
+        offsets = self.offsets
+        start = self.start
+        visited = []
+
+        while heap:
+            k1, k2, u = heap[0]
+            if queued[u] != (k1, k2):
+                # Stale entry, u was requeued or became consistent
+                heapq.heappop(heap)
+                continue
+            if (k1, k2) >= self._key(start) and rhs[start] == g[start]:
+                break
+
+            heapq.heappop(heap)
+            new_key = self._key(u)
+            if (k1, k2) < new_key:
+                queued[u] = new_key
+                heapq.heappush(heap, (new_key[0], new_key[1], u))
+                continue
+
+            queued[u] = None
+            visited.append(u)
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+            for offset in offsets:
+                v = u + offset
+                if not blocked[v]:
+                    self._update_vertex(v)
+
+        return visited
+
+    def _sync(self, grid):
+        """Apply cell changes since the last snapshot. Returns the number changed."""
+        version = getattr(grid, 'version', None)
+        if version is not None and version == self.version:
+            return 0
+
+        blocked, weight = _padded_cells(grid)
+        old_blocked, old_weight = self._snapshot
+        if blocked.shape != old_blocked.shape:
+            self._reset(blocked, weight, version)
+            return len(blocked)
+
+        changed = np.flatnonzero((blocked != old_blocked) | (weight != old_weight))
+        free_weight = weight[blocked == 0]
+        if (len(changed) > REPLAN_FRACTION * len(blocked)
+                or (self.h_scale and free_weight.size and free_weight.min() < 1)):
+            self._reset(blocked, weight, version)
+            return len(changed)
+
+        self._snapshot = (blocked, weight)
+        self.version = version
+        if not len(changed):
+            return 0
+
+        changed = changed.tolist()
+        for cell in changed:
+            self.blocked[cell] = int(blocked[cell])
+            self.weight[cell] = int(weight[cell])
+
+        # A cell's change alters the edges into it (seen by its neighbors)
+        # and, for obstacle toggles, the edges out of it
+        touched = set(changed)
+        for cell in changed:
+            touched.update(cell + offset for offset in self.offsets)
+        for cell in touched:
+            self._update_vertex(cell)
+        return len(changed)
+
+    def replan(self, grid, start):
+        """
+        Bring the plan up to date with grid and the given start.
+
+        Returns:
+            (visited_ids, path_ids): cells expanded by this call, and the
+            path from start to end ([] if there is none)
+        """
+        new_start = self.index(start)
+        if new_start != self.start:
+            self.km += self._h(self.last_start, new_start)
+            self.last_start = self.start = new_start
+
+        self.changed = self._sync(grid)
+        visited = self._compute()
+        self.expanded = len(visited)
+        return visited, self._extract_path()
+
+    def _extract_path(self):
+        """Follow the cheapest weight + g neighbor from the start to the end."""
+        g, weight, blocked = self.g, self.weight, self.blocked
+        u = self.start
+        if self.rhs[u] == INF or blocked[self.goal]:
+            return []
+
+        path = [u]
+        limit = len(blocked)
+        while u != self.goal:
+            best, best_cost = -1, INF
+            for offset in self.offsets:
+                v = u + offset
+                if not blocked[v] and weight[v] + g[v] < best_cost:
+                    best, best_cost = v, weight[v] + g[v]
+            if best < 0 or len(path) > limit:
+                return []
+            u = best
+            path.append(u)
+        return path
+
+
+class IncrementalPathfinder:
+    """
+    D* Lite engine keeping one planner per (grid, end), most recent first.
+
+    Called like the other engines, pathfinder(grid, start, end). Calls on a
+    grid and end it has seen before repair the previous plan instead of
+    searching again, and return only the cells that repair expanded.
+    """
+
+    def __init__(self, max_planners=4):
+        self.max_planners = max_planners
+        self._planners = OrderedDict()
+
+    def planner(self, grid, start, end):
+        """Return the planner for grid and end, creating it if needed."""
+        key = (id(grid), end)
+        entry = self._planners.get(key)
+        if entry is not None and entry[0]() is grid:
+            self._planners.move_to_end(key)
+            return entry[1]
+
+        planner = DStarLite(grid, start, end)
+        try:
+            self._planners[key] = (weakref.ref(grid), planner)
+        except TypeError:
+            # Plain lists can't be weakly referenced; plan without caching
+            return planner
+        if len(self._planners) > self.max_planners:
+            self._planners.popitem(last=False)
+        return planner
+
+    def reset(self):
+        """Forget all planners, so the next call plans from scratch."""
+        self._planners.clear()
+
+    def __call__(self, grid, start, end):
+        """
+        D* Lite - incremental shortest paths (cost + delay) that survive grid edits.
+
+        Args:
+            grid: ArrayGrid or 2D list of Node objects
+            start: Tuple (row, col) for start position
+            end: Tuple (row, col) for end position
+
+        Returns:
+            Tuple of (visited_list, path_list); visited_list holds only the
+            cells expanded since the previous call on this grid and end
+        """
+        if start == end:
+            return [start], [start]
+        if known_unreachable(grid, start, end):
+            return [], []
+        if grid[end[0]][end[1]].is_obstacle:
+            return [], []
+        if grid[start[0]][start[1]].is_obstacle:
+            # The other engines may step off a blocked start; leave that to A*
+            return astar_flat(grid, start, end)
+
+        planner = self.planner(grid, start, end)
+        visited, path = planner.replan(grid, start)
+        width = planner.width
+        return ([(i // width - 1, i % width - 1) for i in visited],
+                [(i // width - 1, i % width - 1) for i in path])
+
+
+# Shared engine instance registered in visualization.pathfinding.ENGINES
+dstar_lite_pathfind = IncrementalPathfinder()
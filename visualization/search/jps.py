@@ -0,0 +1,203 @@
+"""
+Jump Point Search for 4-connected grids where every move costs 1.
+
+A* on an open uniform-cost grid pushes almost every frontier cell onto the
+heap even though most of them lie on interchangeable straight runs. JPS
+only puts "jump points" on the heap: cells where an optimal path may have
+to turn. Everything between two jump points is a straight line, which the
+path reconstruction fills back in.
+
+Canonical ordering used here (vertical moves first, then horizontal):
+- Moving horizontally, a search keeps going straight and only stops at
+  the goal or at a cell with a forced neighbor: an open cell above/below
+  whose diagonal neighbor behind it is blocked, so no earlier cell could
+  have turned into it.
+- Moving vertically, a search keeps going straight and also branches left
+  and right at every cell. It stops where one of those horizontal scans
+  would reach the goal or a jump point.
+
+Horizontal scans use precomputed "next stop" tables (the nearest forced
+cell or wall in each row, in each direction), so a scan is O(1) and a
+vertical jump is linear in its length.
+
+Path lengths are identical to BFS. On grids with non-uniform costs JPS
+is not optimal, so those fall back to plain A*.
+"""
+import heapq
+
+import numpy as np
+
+from visualization.search.components import known_unreachable
+from visualization.search.kernels import as_flat_grid, astar_ids
+
+
+def is_uniform_cost(flat):
+    """True when every cell of the FlatGrid costs 1 to enter (delays included)."""
+    return flat.min_weight == 1 == flat.max_weight
+
+
+def horizontal_stop_tables(flat):
+    """
+    Nearest horizontal stop cells for every padded cell id.
+
+    Returns:
+        (next_right, next_left): lists mapping a cell id to the id of the
+        first cell at or after it (to the right / left) that is blocked or
+        has a forced neighbor for a search moving in that direction
+    """
+    width = flat.width
+    height = flat.size // width
+    blocked = np.frombuffer(flat.blocked, dtype=np.uint8).reshape(height, width).astype(np.bool_)
+    free = ~blocked
+
+    # Forced neighbor when moving right into (r, c): (r-1, c) open but
+    # (r-1, c-1) blocked, or the same below. Mirror image for moving left.
+    forced_right = np.zeros_like(blocked)
+    forced_right[1:-1, 1:] = ((free[:-2, 1:] & blocked[:-2, :-1]) |
+                              (free[2:, 1:] & blocked[2:, :-1]))
+    forced_left = np.zeros_like(blocked)
+    forced_left[1:-1, :-1] = ((free[:-2, :-1] & blocked[:-2, 1:]) |
+                              (free[2:, :-1] & blocked[2:, 1:]))
+
+    cols = np.arange(width)
+    row_start = (np.arange(height) * width)[:, None]
+
+    # Padding columns are blocked, so every row has a stop in each direction
+    right_stops = np.where(blocked | forced_right, cols, width)
+    next_right = np.minimum.accumulate(right_stops[:, ::-1], axis=1)[:, ::-1]
+    left_stops = np.where(blocked | forced_left, cols, -1)
+    next_left = np.maximum.accumulate(left_stops, axis=1)
+
+    return (next_right + row_start).ravel().tolist(), (next_left + row_start).ravel().tolist()
+
+
+def jps_ids(flat, s, t):
+    """
+    Jump Point Search from cell id s to t.
+
+    Returns:
+        (visited_ids, path_ids), where visited_ids are the jump points in
+        the order they were expanded and path_ids is the full cell path
+    """
+    if not is_uniform_cost(flat):
+        return astar_ids(flat, s, t)
+
+    width = flat.width
+    size = flat.size
+    blocked = flat.blocked
+    next_right, next_left = horizontal_stop_tables(flat)
+    end_row, end_col = divmod(t, width)
+
+    def scan_right(i):
+        """Jump point (or goal) reached moving right from i, else -1."""
+        stop = next_right[i + 1]
+        if i < t <= stop and i // width == end_row:
+            return t
+        return -1 if blocked[stop] else stop
+
+    def scan_left(i):
+        stop = next_left[i - 1]
+        if stop <= t < i and i // width == end_row:
+            return t
+        return -1 if blocked[stop] else stop
+
+    def scan_vertical(i, step):
+        """Jump point reached moving up/down from i, else -1."""
+        while True:
+            i += step
+            if blocked[i]:
+                return -1
+            if i == t or scan_right(i) >= 0 or scan_left(i) >= 0:
+                return i
+
+    g_score = {s: 0}
+    parent = {s: s}
+    closed = set()
+    visited = []
+
+    seq_span = 4 * size + 1
+    key_span = seq_span * size
+    seq = 0
+    heap = [(abs(s // width - end_row) + abs(s % width - end_col)) * key_span + s]
+
+    while heap:
+        current = heapq.heappop(heap) % size
+        if current in closed:
+            continue
+
+        closed.add(current)
+        visited.append(current)
+
+        if current == t:
+            return visited, _fill_path(parent, t, width)
+
+        # Directions to search from here, pruned by how we arrived
+        came_from = parent[current]
+        if current == s:
+            jumps = [scan_right(current), scan_left(current),
+                     scan_vertical(current, width), scan_vertical(current, -width)]
+        elif current // width == came_from // width:
+            step = 1 if current > came_from else -1
+            jumps = [scan_right(current) if step == 1 else scan_left(current)]
+            for vertical in (width, -width):
+                if not blocked[current + vertical] and blocked[current + vertical - step]:
+                    jumps.append(scan_vertical(current, vertical))
+        else:
+            step = width if current > came_from else -width
+            jumps = [scan_vertical(current, step), scan_right(current), scan_left(current)]
+
+        current_g = g_score[current]
+        r, c = divmod(current, width)
+        for jump in jumps:
+            if jump < 0 or jump in closed:
+                continue
+
+            jr, jc = divmod(jump, width)
+            tentative_g = current_g + abs(jr - r) + abs(jc - c)
+            old_g = g_score.get(jump)
+            if old_g is None or tentative_g < old_g:
+                g_score[jump] = tentative_g
+                parent[jump] = current
+                f = tentative_g + abs(jr - end_row) + abs(jc - end_col)
+                seq += 1
+                heapq.heappush(heap, f * key_span + seq * size + jump)
+
+    return visited, []
+
+
+def _fill_path(parent, end, width):
+    """Expand the chain of jump points ending at end into every cell on the path."""
+    path = [end]
+    node = end
+    while parent[node] != node:
+        previous = parent[node]
+        if node // width == previous // width:
+            step = 1 if previous > node else -1
+        else:
+            step = width if previous > node else -width
+        while node != previous:
+            node += step
+            path.append(node)
+    path.reverse()
+    return path
+
+
+def jps_pathfind(grid, start, end):
+    """
+    Jump Point Search - optimal on 4-connected uniform-cost grids.
+
+    Args:
+        grid: ArrayGrid, 2D list of Node objects or FlatGrid
+        start: Tuple (row, col) for start position
+        end: Tuple (row, col) for end position
+
+    Returns:
+        Tuple of (visited_list, path_list); visited_list holds the expanded
+        jump points
+    """
+    if known_unreachable(grid, start, end):
+        return [], []
+
+    flat = as_flat_grid(grid)
+    visited, path = jps_ids(flat, flat.index(start), flat.index(end))
+    return flat.positions(visited), flat.positions(path)
@@ -0,0 +1,373 @@
+"""
+Index-based search kernels.
+
+Same contract as the functions in visualization/pathfinding.py (a grid plus
+(row, col) start/end in, (visited_list, path_list) of tuples out), but the
+search itself runs on flat integer cell ids with preallocated buffers for
+distance, parent and closed state. Each kernel also accepts an already built
+FlatGrid so repeated queries on one grid skip the preprocessing.
+
+The *_ids functions are the kernels proper. They take a FlatGrid and start/end
+cell ids and return (visited_ids, path_ids), leaving conversion back to
+(row, col) tuples to the caller. The event generators of
+visualization/search/events.py run the same searches step by step; the
+loops are kept separate here because yielding an event per step makes the
+plain searches much slower (verify Test 12 checks the two give identical
+results). Every kernel takes two optional plug-ins:
+
+    frontier: the open list (see visualization/search/frontier.py). BFS takes
+        a plain "queue" (default) or "stack"; Dijkstra and A* take a priority
+        "heap" or "bucket" and pick the faster valid one by default.
+    neighbors: the neighbor generator, a sequence of (dr, dc) steps or a key
+        of NEIGHBORHOODS (see visualization/search/neighbors.py). Defaults to
+        4-connected moves in right, down, left, up order.
+
+Weighted kernels charge cost + delay for entering a cell (FlatGrid.weight).
+"""
+from array import array
+
+from visualization.search.components import known_unreachable
+from visualization.search.flat_grid import as_flat_grid
+from visualization.search.frontier import new_frontier, new_plain_frontier
+from visualization.search.neighbors import step_offsets, step_span
+
+
+def _as_positions(kernel, grid, start, end, **options):
+    """Run an id kernel on (row, col) endpoints and convert its result to tuples."""
+    if known_unreachable(grid, start, end, options.get("neighbors")):
+        return [], []
+
+    flat = as_flat_grid(grid)
+    visited, path = kernel(flat, flat.index(start), flat.index(end), **options)
+    return flat.positions(visited), flat.positions(path)
+
+
+def bfs_ids(flat, s, t, frontier=None, neighbors=None):
+    """BFS from cell id s to t. Returns (visited_ids, path_ids)."""
+    offsets = step_offsets(flat, neighbors)
+
+    # Obstacles and already discovered cells share one lookup table
+    seen = bytearray(flat.blocked)
+    parent = array('q', [0]) * flat.size
+    seen[s] = 1
+    parent[s] = s
+
+    frontier = new_plain_frontier(frontier)
+    push = frontier.push
+    push(s)
+    visited = [s]
+
+    for current in frontier:
+        if current == t:
+            return visited, flat.trace_ids(parent, t)
+
+        for offset in offsets:
+            neighbor = current + offset
+            if not seen[neighbor]:
+                seen[neighbor] = 1
+                parent[neighbor] = current
+                visited.append(neighbor)
+                push(neighbor)
+
+    return visited, []
+
+
+def dijkstra_ids(flat, s, t, frontier=None, neighbors=None):
+    """
+    Dijkstra from cell id s to t. Returns (visited_ids, path_ids).
+
+    The default frontier is a bucket queue for small integer weights and a
+    heap otherwise. Ties are expanded in push order either way.
+    """
+    offsets = step_offsets(flat, neighbors)
+    weight = flat.weight
+    size = flat.size
+
+    closed = bytearray(flat.blocked)
+    closed[s] = 0
+    parent = array('q', [0]) * size
+    parent[s] = s
+    dist = [-1] * size
+    dist[s] = 0
+
+    frontier = new_frontier(frontier, flat.min_weight, flat.max_weight, size, len(offsets))
+    push = frontier.push
+    push(0, s)
+    visited = []
+
+    for current in frontier:
+        if closed[current]:
+            continue
+
+        closed[current] = 1
+        visited.append(current)
+
+        if current == t:
+            return visited, flat.trace_ids(parent, t)
+
+        current_dist = dist[current]
+        for offset in offsets:
+            neighbor = current + offset
+            if closed[neighbor]:
+                continue
+
+            new_dist = current_dist + weight[neighbor]
+            old_dist = dist[neighbor]
+            if old_dist < 0 or new_dist < old_dist:
+                dist[neighbor] = new_dist
+                parent[neighbor] = current
+                push(new_dist, neighbor)
+
+    return visited, []
+
+
+def astar_ids(flat, s, t, frontier=None, neighbors=None):
+    """
+    A* (Manhattan heuristic) from cell id s to t. Returns (visited_ids, path_ids).
+
+    The frontier is chosen like in dijkstra_ids. f changes by the entered
+    cell's weight plus or minus the step's Manhattan length, so with
+    4-connected moves buckets are used when every weight is at least 1.
+    """
+    offsets = step_offsets(flat, neighbors)
+    span = step_span(neighbors)
+    weight = flat.weight
+    size = flat.size
+    width = flat.width
+    start_r, start_c = divmod(s, width)
+    end_r, end_c = divmod(t, width)
+
+    closed = bytearray(flat.blocked)
+    closed[s] = 0
+    parent = array('q', [0]) * size
+    parent[s] = s
+    g_score = [-1] * size
+    g_score[s] = 0
+
+    frontier = new_frontier(frontier, flat.min_weight - span, flat.max_weight + span, size, len(offsets))
+    push = frontier.push
+    push(abs(start_r - end_r) + abs(start_c - end_c), s)
+    visited = []
+
+    for current in frontier:
+        if closed[current]:
+            continue
+
+        closed[current] = 1
+        visited.append(current)
+
+        if current == t:
+            return visited, flat.trace_ids(parent, t)
+
+        current_g = g_score[current]
+        for offset in offsets:
+            neighbor = current + offset
+            if closed[neighbor]:
+                continue
+
+            tentative_g = current_g + weight[neighbor]
+            old_g = g_score[neighbor]
+            if old_g < 0 or tentative_g < old_g:
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = current
+                r, c = divmod(neighbor, width)
+                push(tentative_g + abs(r - end_r) + abs(c - end_c), neighbor)
+
+    return visited, []
+
+
+def dfs_ids(flat, s, t, neighbors=None):
+    """
+    DFS from cell id s to t. Returns (visited_ids, path_ids).
+
+    Visits cells in the same order as the recursive formulation, but keeps
+    an explicit stack plus a per-cell next-direction counter, so memory and
+    time stay linear in the number of cells and there is no recursion limit.
+    The stack is part of that ordering, so DFS takes no frontier argument;
+    bfs_ids(frontier="stack") is the stack-based alternative.
+    """
+    offsets = step_offsets(flat, neighbors)
+    directions = len(offsets)
+
+    seen = bytearray(flat.blocked)
+    next_dir = bytearray(flat.size)
+    parent = array('q', [0]) * flat.size
+    seen[s] = 1
+    parent[s] = s
+    visited = [s]
+
+    if s == t:
+        return visited, [s]
+
+    stack = [s]
+    while stack:
+        current = stack[-1]
+        d = next_dir[current]
+        if d == directions:
+            stack.pop()
+            continue
+
+        next_dir[current] = d + 1
+        neighbor = current + offsets[d]
+        if not seen[neighbor]:
+            seen[neighbor] = 1
+            parent[neighbor] = current
+            visited.append(neighbor)
+            if neighbor == t:
+                return visited, flat.trace_ids(parent, t)
+            stack.append(neighbor)
+
+    return visited, []
+
+
+def bfs_flat(grid, start, end, **options):
+    """
+    Breadth-First Search on flat cell ids.
+
+    Args:
+        grid: ArrayGrid, 2D list of Node objects, node grid or FlatGrid
+        start: Tuple (row, col) for start position
+        end: Tuple (row, col) for end position
+        options: frontier/neighbors, passed on to bfs_ids
+
+    Returns:
+        Tuple of (visited_list, path_list)
+    """
+    return _as_positions(bfs_ids, grid, start, end, **options)
+
+
+def dijkstra_flat(grid, start, end, **options):
+    """
+    Dijkstra's Algorithm (cost + delay) on flat cell ids.
+
+    Args:
+        grid: ArrayGrid, 2D list of Node objects, node grid or FlatGrid
+        start: Tuple (row, col) for start position
+        end: Tuple (row, col) for end position
+        options: frontier/neighbors, passed on to dijkstra_ids
+
+    Returns:
+        Tuple of (visited_list, path_list)
+    """
+    return _as_positions(dijkstra_ids, grid, start, end, **options)
+
+
+def astar_flat(grid, start, end, **options):
+    """
+    A* (cost + delay) with a Manhattan heuristic on flat cell ids.
+
+    Args:
+        grid: ArrayGrid, 2D list of Node objects, node grid or FlatGrid
+        start: Tuple (row, col) for start position
+        end: Tuple (row, col) for end position
+        options: frontier/neighbors, passed on to astar_ids
+
+    Returns:
+        Tuple of (visited_list, path_list)
+    """
+    return _as_positions(astar_ids, grid, start, end, **options)
+
+
+def dfs_flat(grid, start, end, **options):
+    """
+    Depth-First Search on flat cell ids.
+
+    Args:
+        grid: ArrayGrid, 2D list of Node objects, node grid or FlatGrid
+        start: Tuple (row, col) for start position
+        end: Tuple (row, col) for end position
+        options: neighbors, passed on to dfs_ids
+
+    Returns:
+        Tuple of (visited_list, path_list)
+    """
+    return _as_positions(dfs_ids, grid, start, end, **options)
+
+
+def bfs_tree_ids(flat, s, neighbors=None):
+    """
+    Full BFS tree from cell id s.
+
+    Returns:
+        (dist, parent): hop counts (-1 where unreachable) and parent ids
+        (-1 where unreachable, s for s itself), both indexed by cell id
+    """
+    offsets = step_offsets(flat, neighbors)
+    seen = bytearray(flat.blocked)
+    parent = array('q', [-1]) * flat.size
+    dist = [-1] * flat.size
+    seen[s] = 1
+    parent[s] = s
+    dist[s] = 0
+
+    queue = [s]
+    for current in queue:
+        next_dist = dist[current] + 1
+        for offset in offsets:
+            neighbor = current + offset
+            if not seen[neighbor]:
+                seen[neighbor] = 1
+                parent[neighbor] = current
+                dist[neighbor] = next_dist
+                queue.append(neighbor)
+
+    return dist, parent
+
+
+def dijkstra_tree_ids(flat, s, neighbors=None):
+    """
+    Full Dijkstra shortest-path tree (cost + delay) from cell id s.
+
+    Returns:
+        (dist, parent): path costs (-1 where unreachable) and parent ids
+        (-1 where unreachable, s for s itself), both indexed by cell id
+    """
+    offsets = step_offsets(flat, neighbors)
+    weight = flat.weight
+    size = flat.size
+
+    closed = bytearray(flat.blocked)
+    closed[s] = 0
+    parent = array('q', [-1]) * size
+    parent[s] = s
+    dist = [-1] * size
+    dist[s] = 0
+
+    frontier = new_frontier(None, flat.min_weight, flat.max_weight, size, len(offsets))
+    push = frontier.push
+    push(0, s)
+
+    for current in frontier:
+        if closed[current]:
+            continue
+        closed[current] = 1
+
+        current_dist = dist[current]
+        for offset in offsets:
+            neighbor = current + offset
+            if closed[neighbor]:
+                continue
+
+            new_dist = current_dist + weight[neighbor]
+            old_dist = dist[neighbor]
+            if old_dist < 0 or new_dist < old_dist:
+                dist[neighbor] = new_dist
+                parent[neighbor] = current
+                push(new_dist, neighbor)
+
+    return dist, parent
+
+
+# Id kernels by algorithm name, for callers that work on FlatGrids directly
+ID_KERNELS = {
+    "BFS": bfs_ids,
+    "Dijkstra": dijkstra_ids,
+    "A*": astar_ids,
+    "DFS": dfs_ids,
+}
+
+# Single-source tree kernels by algorithm name
+TREE_KERNELS = {
+    "BFS": bfs_tree_ids,
+    "Dijkstra": dijkstra_tree_ids,
+}
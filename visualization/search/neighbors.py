@@ -0,0 +1,58 @@
+"""
+Neighbor generators for the flat search kernels.
+
+A neighbor generator is a sequence of (dr, dc) steps. The kernels turn it
+into cell id offsets once per search with step_offsets() and try the steps
+in the order given, which also fixes the order DFS and tie-broken searches
+visit cells in. FlatGrid pads the grid by one cell, so steps may move at
+most one row and one column.
+
+A* and the bucket queue bounds assume a move costs at least as much as the
+Manhattan distance it covers, which holds for FOUR_CONNECTED. With diagonal
+steps A* still finds paths, but they are not guaranteed to be shortest.
+"""
+
+# Right, down, left, up: the order every engine has always used
+FOUR_CONNECTED = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+# FOUR_CONNECTED plus the four diagonals
+EIGHT_CONNECTED = FOUR_CONNECTED + ((1, 1), (1, -1), (-1, -1), (-1, 1))
+
+NEIGHBORHOODS = {
+    "4": FOUR_CONNECTED,
+    "8": EIGHT_CONNECTED,
+}
+
+
+def step_offsets(flat, neighbors=None):
+    """
+    Cell id offsets for a neighbor generator on a FlatGrid.
+
+    Args:
+        flat: FlatGrid the offsets are for
+        neighbors: Sequence of (dr, dc) steps, a key of NEIGHBORHOODS, or
+            None for FOUR_CONNECTED
+
+    Returns:
+        Tuple of id offsets in the same order as the steps
+    """
+    if neighbors is None:
+        return flat.offsets
+    if isinstance(neighbors, str):
+        neighbors = NEIGHBORHOODS[neighbors]
+
+    offsets = []
+    for dr, dc in neighbors:
+        if max(abs(dr), abs(dc)) != 1:
+            raise ValueError(f"step {(dr, dc)} must move to an adjacent cell")
+        offsets.append(dr * flat.width + dc)
+    return tuple(offsets)
+
+
+def step_span(neighbors=None):
+    """Largest Manhattan distance a single step covers."""
+    if neighbors is None:
+        return 1
+    if isinstance(neighbors, str):
+        neighbors = NEIGHBORHOODS[neighbors]
+    return max(abs(dr) + abs(dc) for dr, dc in neighbors)
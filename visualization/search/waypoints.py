@@ -0,0 +1,368 @@
+"""
+Routing from start to end through a set of waypoints, in the cheapest order.
+
+Finding the order is a shortest open-path travelling salesman problem over
+the stops, so it needs the shortest distance between every pair of stops
+(the leg matrix). One single-source search per stop gives a whole row of it:
+the start and every waypoint each grow a shortest-path tree (a DistanceField)
+that holds the distance to every other stop, and later gives the leg's path
+by walking its parent array. Trees live in a DistanceFieldCache keyed by grid
+version, so reordering, adding or removing waypoints on an unchanged grid
+only grows trees for stops it hasn't seen.
+
+The order is solved exactly with Held-Karp dynamic programming for up to
+HELD_KARP_LIMIT waypoints, O(2^k k^2). Past that, a nearest-neighbor tour
+is improved with 2-opt (reverse a run of stops) and or-opt (move a run of
+1-3 stops elsewhere, either way round) until neither finds a cheaper route.
+
+Legs are directed: moving charges the entered cell's weight, so a -> b and
+b -> a can differ, and every cost here uses the matrix in travel direction.
+
+pathfinder() searches each leg with the page's own algorithm so the
+animation shows it. Those leg results are kept too, in an LRU keyed by
+(grid version, algorithm, a, b) and bounded by LEG_CACHE_CELLS, so a new
+waypoint on an unchanged grid only searches the legs the route didn't
+have before.
+"""
+from collections import OrderedDict
+
+from visualization.search.distance_field import DistanceFieldCache
+
+INF = float('inf')
+
+# Largest waypoint count solved exactly
+HELD_KARP_LIMIT = 10
+
+# Longest run of stops or-opt tries to move
+OR_OPT_SEGMENT = 3
+
+# Visited and path cells kept across all cached leg searches
+LEG_CACHE_CELLS = 2_000_000
+
+
+def route_cost(matrix, order):
+    """Total cost of visiting matrix indices in order."""
+    return sum(matrix[a][b] for a, b in zip(order, order[1:]))
+
+
+def held_karp(matrix):
+    """
+    Exact cheapest order for the stops of a leg matrix.
+
+    Args:
+        matrix: (k + 2) x (k + 2) leg costs; index 0 is the start, k + 1
+            the end and 1..k the waypoints. INF marks unreachable legs.
+
+    Returns:
+        List of matrix indices from 0 to k + 1, None when no order reaches
+        every stop
+    """
+    end = len(matrix) - 1
+    k = end - 1
+    if k == 0:
+        return [0, end] if matrix[0][end] != INF else None
+
+    full = (1 << k) - 1
+    cost = [[INF] * k for _ in range(full + 1)]
+    parent = [[-1] * k for _ in range(full + 1)]
+    for j in range(k):
+        cost[1 << j][j] = matrix[0][j + 1]
+
+    for mask in range(1, full + 1):
+        row = cost[mask]
+        for j in range(k):
+            base = row[j]
+            if base == INF:
+                continue
+            legs = matrix[j + 1]
+            for nxt in range(k):
+                bit = 1 << nxt
+                if mask & bit:
+                    continue
+                value = base + legs[nxt + 1]
+                if value < cost[mask | bit][nxt]:
+                    cost[mask | bit][nxt] = value
+                    parent[mask | bit][nxt] = j
+
+    last = min(range(k), key=lambda j: cost[full][j] + matrix[j + 1][end])
+    if cost[full][last] + matrix[last + 1][end] == INF:
+        # Some waypoint is unreachable; the parent chain would stop short
+        return None
+    order = [end]
+    mask = full
+    while last >= 0:
+        order.append(last + 1)
+        mask, last = mask & ~(1 << last), parent[mask][last]
+    order.append(0)
+    order.reverse()
+    return order
+
+
+def nearest_neighbor(matrix):
+    """Greedy order: always go to the closest unvisited waypoint next."""
+    end = len(matrix) - 1
+    left = set(range(1, end))
+    order = [0]
+    while left:
+        legs = matrix[order[-1]]
+        nxt = min(left, key=lambda j: (legs[j], j))
+        left.remove(nxt)
+        order.append(nxt)
+    order.append(end)
+    return order
+
+
+def two_opt(matrix, order):
+    """
+    Reverse runs of waypoints while that makes the route cheaper.
+
+    The first and last stop stay in place. Legs inside a reversed run are
+    travelled backwards, so their cost is summed both ways as the run grows.
+    """
+    order = list(order)
+    n = len(order)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n - 3):
+            a, b = order[i], order[i + 1]
+            forward = backward = 0
+            for j in range(i + 2, n - 1):
+                c, d = order[j], order[j + 1]
+                forward += matrix[order[j - 1]][c]
+                backward += matrix[c][order[j - 1]]
+                old = matrix[a][b] + forward + matrix[c][d]
+                new = matrix[a][c] + backward + matrix[b][d]
+                if new < old:
+                    order[i + 1:j + 1] = order[j:i:-1]
+                    improved = True
+                    break
+            if improved:
+                break
+    return order
+
+
+def or_opt(matrix, order):
+    """
+    Move runs of up to OR_OPT_SEGMENT waypoints elsewhere, as they are or
+    reversed, while that makes the route cheaper.
+    """
+    order = list(order)
+    improved = True
+    while improved:
+        improved = False
+        n = len(order)
+        for length in range(1, OR_OPT_SEGMENT + 1):
+            for i in range(1, n - length):
+                run = order[i:i + length]
+                before, after = order[i - 1], order[i + length]
+                inside = route_cost(matrix, run)
+                removed = (matrix[before][run[0]] + inside + matrix[run[-1]][after]
+                           - matrix[before][after])
+                rest = order[:i] + order[i + length:]
+                candidates = [(run, inside)]
+                if length > 1:
+                    candidates.append((run[::-1], route_cost(matrix, run[::-1])))
+                for j in range(len(rest) - 1):
+                    a, b = rest[j], rest[j + 1]
+                    for moved, moved_inside in candidates:
+                        if j == i - 1 and moved is run:
+                            continue
+                        added = (matrix[a][moved[0]] + moved_inside + matrix[moved[-1]][b]
+                                 - matrix[a][b])
+                        if added < removed:
+                            order = rest[:j + 1] + moved + rest[j + 1:]
+                            improved = True
+                            break
+                    if improved:
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+    return order
+
+
+def solve_order(matrix):
+    """
+    Cheapest order found for a leg matrix (see held_karp() for its layout).
+
+    Exact up to HELD_KARP_LIMIT waypoints, 2-opt/or-opt local search beyond.
+    Returns None when no order reaches every stop.
+    """
+    if len(matrix) - 2 <= HELD_KARP_LIMIT:
+        return held_karp(matrix)
+
+    order = nearest_neighbor(matrix)
+    if route_cost(matrix, order) == INF:
+        return None
+    while True:
+        cost = route_cost(matrix, order)
+        order = or_opt(matrix, two_opt(matrix, order))
+        if route_cost(matrix, order) >= cost:
+            return order
+
+
+class WaypointRouter:
+    """
+    Routes through waypoints on a grid, reusing shortest-path trees.
+
+    Args:
+        algorithm: "Dijkstra" (cost + delay) or "BFS" (hops) leg costs
+        cache: DistanceFieldCache holding the trees, shared if given
+    """
+
+    def __init__(self, algorithm="Dijkstra", cache=None):
+        self.algorithm = algorithm
+        self.cache = cache if cache is not None else DistanceFieldCache()
+        # (version, algorithm_func, a, b) -> (visited, path, sides) of one leg search
+        self._legs = OrderedDict()
+        self._leg_cells = 0
+
+    @staticmethod
+    def _run_leg(algorithm_func, grid, a, b, sides, options):
+        """
+        Run algorithm_func on one leg.
+
+        Returns:
+            (visited, path, leg_sides); leg_sides is None unless sides is
+            a list
+        """
+        if sides is None:
+            visited, path = algorithm_func(grid, a, b, **options)
+            return visited, path, None
+        leg_sides = []
+        visited, path = algorithm_func(grid, a, b, sides=leg_sides, **options)
+        return visited, path, leg_sides
+
+    def _search_leg(self, algorithm_func, grid, a, b, sides):
+        """Like _run_leg() without options, answered from the leg cache when possible."""
+        version = getattr(grid, 'version', None)
+        key = (version, algorithm_func, a, b, sides is not None)
+        leg = self._legs.get(key)
+        if leg is not None:
+            self._legs.move_to_end(key)
+            return leg
+
+        leg = self._run_leg(algorithm_func, grid, a, b, sides, {})
+        visited, path, _ = leg
+        if version is None:
+            # Like DistanceFieldCache: a plain Node grid may change unseen
+            return leg
+
+        self._legs[key] = leg
+        self._leg_cells += len(visited) + len(path)
+        # Evict least recently used legs, but always keep the newest one
+        while self._leg_cells > LEG_CACHE_CELLS and len(self._legs) > 1:
+            _, (old_visited, old_path, _) = self._legs.popitem(last=False)
+            self._leg_cells -= len(old_visited) + len(old_path)
+        return leg
+
+    def _fields(self, grid, sources):
+        """One tree per distinct source, from the cache where possible."""
+        fields = {}
+        for source in sources:
+            if source not in fields:
+                fields[source] = self.cache.get(grid, source, self.algorithm)
+        return fields
+
+    def leg_matrix(self, grid, start, end, waypoints):
+        """
+        Leg costs between stops, INF where a leg can't be travelled.
+
+        Returns:
+            (k + 2) x (k + 2) list of lists; index 0 is start, k + 1 is end
+            and 1..k are the waypoints in the given order
+        """
+        stops = [start] + list(waypoints) + [end]
+        fields = self._fields(grid, stops[:-1])
+        matrix = []
+        for i, source in enumerate(stops):
+            if i == len(stops) - 1:
+                # Nothing leaves the end; these legs are never used
+                matrix.append([INF] * len(stops))
+                continue
+            field = fields[source]
+            row = []
+            for target in stops:
+                distance = field.distance(target)
+                row.append(INF if distance is None else distance)
+            matrix.append(row)
+        return matrix
+
+    def order(self, grid, start, end, waypoints):
+        """
+        Stops in the cheapest visiting order found.
+
+        Returns:
+            List of (row, col) from start to end with every waypoint once,
+            or None if some stop can't be reached
+        """
+        stops = [start] + list(waypoints) + [end]
+        matrix = self.leg_matrix(grid, start, end, waypoints)
+        order = solve_order(matrix)
+        if order is None or len(order) != len(stops) or route_cost(matrix, order) == INF:
+            return None
+        return [stops[i] for i in order]
+
+    def route(self, grid, start, end, waypoints):
+        """
+        Cheapest route found through every waypoint, stitched from the cached trees.
+
+        Returns:
+            (stops, path, cost): the stops in visiting order, the full path
+            as (row, col) tuples and its cost; (None, [], None) when some
+            stop can't be reached
+        """
+        stops = self.order(grid, start, end, waypoints)
+        if stops is None:
+            return None, [], None
+
+        fields = self._fields(grid, stops[:-1])
+        path = [stops[0]]
+        cost = 0
+        for a, b in zip(stops, stops[1:]):
+            field = fields[a]
+            path.extend(field.path_to(b)[1:])
+            cost += field.distance(b)
+        return stops, path, cost
+
+    def pathfinder(self, algorithm_func, waypoints):
+        """
+        Wrap an engine function so it searches leg by leg through waypoints.
+
+        The returned function takes (grid, start, end, **options) like any
+        engine. It orders the stops with the leg matrix, then runs
+        algorithm_func on each leg and concatenates the visited lists and
+        paths, so the animation shows the chosen algorithm's own legs. Legs
+        already searched on this grid version come from the leg cache. A
+        sides=[] option is passed on to every leg and keeps lining up with
+        the concatenated visited list; other options bypass the cache.
+        """
+        waypoints = list(waypoints)
+
+        def pathfind(grid, start, end, **options):
+            if not waypoints:
+                return algorithm_func(grid, start, end, **options)
+
+            stops = self.order(grid, start, end, waypoints)
+            if stops is None:
+                return [], []
+
+            sides = options.pop("sides", None)
+            visited, path = [], [start]
+            for a, b in zip(stops, stops[1:]):
+                if options:
+                    leg = self._run_leg(algorithm_func, grid, a, b, sides, options)
+                else:
+                    leg = self._search_leg(algorithm_func, grid, a, b, sides)
+                leg_visited, leg_path, leg_sides = leg
+                visited.extend(leg_visited)
+                if sides is not None:
+                    sides.extend(leg_sides)
+                if not leg_path:
+                    return visited, []
+                path.extend(leg_path[1:])
+            return visited, path
+
+        return pathfind
@@ -4,7 +4,8 @@ import pygame
 class Animator:
     """Handles animation of algorithm visualization."""
     
-    def __init__(self, visited_nodes=None, path_nodes=None, animation_speed=0.05):
+    def __init__(self, visited_nodes=None, path_nodes=None, animation_speed=0.05,
+                 batched=False, max_duration=None, complete=True):
         """
         Initialize animator.
         
@@ -12,16 +13,31 @@ class Animator:
             visited_nodes: List of visited nodes to animate through
             path_nodes: List of path nodes to animate
             animation_speed: Delay between frames (in seconds)
+            batched: Advance as many nodes per update() as the elapsed time
+                covers, instead of at most one node per update()
+            max_duration: In batched mode, shorten the per-node delay so the
+                whole animation takes at most this many seconds
+            complete: False while the search is still running; add its
+                results with add_visited() and finish() as they arrive
         """
-        self.visited_nodes = visited_nodes or []
-        self.path_nodes = path_nodes or []
+        # Keep the caller's lists (even empty ones) so it sees streamed nodes
+        self.visited_nodes = visited_nodes if visited_nodes is not None else []
+        self.path_nodes = path_nodes if path_nodes is not None else []
         self.animation_speed = animation_speed
+        self.batched = batched
+        self.max_duration = max_duration
+        self.is_complete = complete
         
         self.current_visited_index = 0
         self.current_path_index = 0
         self.time_accumulator = 0.0
         self.is_paused = False
         self.is_finished = False
+        self.skip_requested = False
+        
+        # Read cursors for take_visited_delta() / take_path_delta()
+        self.visited_cursor = 0
+        self.path_cursor = 0
     
     def update(self, dt):
         """Update animation state."""
@@ -30,12 +46,19 @@ class Animator:
         
         self.time_accumulator += dt
         
+        if self.batched:
+            self._update_batched()
+            return
+        
         if self.time_accumulator >= self.animation_speed:
             self.time_accumulator = 0.0
             
             # Animate visited nodes first
             if self.current_visited_index < len(self.visited_nodes):
                 self.current_visited_index += 1
+            elif not self.is_complete:
+                # Caught up with a search that is still running
+                return
             else:
                 # Then animate path
                 if self.current_path_index < len(self.path_nodes):
@@ -43,14 +66,84 @@ class Animator:
                 else:
                     self.is_finished = True
     
+    def _update_batched(self):
+        """Advance every step the accumulated time covers, carrying the remainder."""
+        step_time = self.step_time()
+        steps = int(self.time_accumulator / step_time)
+        if steps == 0:
+            return
+        self.time_accumulator -= steps * step_time
+        
+        # Animate visited nodes first, then spill the remaining steps into the path
+        visited_left = len(self.visited_nodes) - self.current_visited_index
+        visited_steps = min(steps, visited_left)
+        self.current_visited_index += visited_steps
+        steps -= visited_steps
+        
+        if not self.is_complete:
+            if steps > 0:
+                # Caught up with the search; don't bank the wait, or the
+                # next batch would flash past
+                self.time_accumulator = 0.0
+            return
+        
+        path_left = len(self.path_nodes) - self.current_path_index
+        path_steps = min(steps, path_left)
+        self.current_path_index += path_steps
+        steps -= path_steps
+        
+        # Like the single-step mode, finish one step after the last node
+        if steps > 0:
+            self.is_finished = True
+            self.time_accumulator = 0.0
+    
+    def step_time(self):
+        """Seconds per animated node, honoring max_duration."""
+        if not self.max_duration:
+            return self.animation_speed
+        total_steps = len(self.visited_nodes) + len(self.path_nodes) + 1
+        return min(self.animation_speed, self.max_duration / total_steps)
+    
+    def add_visited(self, nodes):
+        """Append visited nodes streamed from a running search."""
+        self.visited_nodes.extend(nodes)
+        if self.skip_requested:
+            self.skip_to_end()
+    
+    def finish(self, path_nodes):
+        """Mark the search complete with its final path."""
+        self.path_nodes = path_nodes or []
+        self.is_complete = True
+        if self.skip_requested:
+            self.skip_to_end()
+    
     def get_current_visited(self):
-        """Get nodes to display as visited up to current frame."""
+        """Get nodes to display as visited up to current frame (copies, O(n))."""
         return self.visited_nodes[:self.current_visited_index]
     
     def get_current_path(self):
-        """Get path nodes to display up to current frame."""
+        """Get path nodes to display up to current frame (copies, O(n))."""
         return self.path_nodes[:self.current_path_index]
     
+    def take_visited_delta(self):
+        """
+        Get the visited nodes the animation advanced past since the last call.
+        
+        Work is proportional to the number of new nodes, not to how far the
+        animation has progressed. reset() and skip_to_end() behave like any
+        other progress change: after a reset the next delta starts from the
+        first node again.
+        """
+        start = self.visited_cursor
+        self.visited_cursor = self.current_visited_index
+        return self.visited_nodes[start:self.visited_cursor]
+    
+    def take_path_delta(self):
+        """Get the path nodes the animation advanced past since the last call."""
+        start = self.path_cursor
+        self.path_cursor = self.current_path_index
+        return self.path_nodes[start:self.path_cursor]
+    
     def pause(self):
         """Pause animation."""
         self.is_paused = True
@@ -63,15 +156,19 @@ class Animator:
         """Reset animation to beginning."""
         self.current_visited_index = 0
         self.current_path_index = 0
+        self.visited_cursor = 0
+        self.path_cursor = 0
         self.time_accumulator = 0.0
         self.is_paused = False
         self.is_finished = False
+        self.skip_requested = False
     
     def skip_to_end(self):
-        """Skip animation to the end."""
+        """Skip animation to the end, or to the newest node while the search runs."""
         self.current_visited_index = len(self.visited_nodes)
         self.current_path_index = len(self.path_nodes)
-        self.is_finished = True
+        self.skip_requested = True
+        self.is_finished = self.is_complete
     
     def set_speed(self, speed):
         """Set animation speed (0.01 = fast, 0.1 = slow)."""
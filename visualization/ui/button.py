@@ -1,4 +1,5 @@
 import pygame
+from visualization.ui.text_cache import TextCache
 
 
 class Button:
@@ -31,7 +32,6 @@ class Button:
         pygame.draw.rect(screen, color, self.rect)
         pygame.draw.rect(screen, (255, 255, 255), self.rect, 2)
         
-        font = pygame.font.SysFont("arial", 18, bold=True)
-        text_surf = font.render(self.text, True, self.text_color)
+        text_surf = TextCache.render(self.text, 18, self.text_color, bold=True)
         text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
@@ -1,4 +1,6 @@
+import numpy as np
 import pygame
+from visualization.ui.text_cache import TextCache
 
 
 class GridRenderer:
@@ -11,6 +13,7 @@ class GridRenderer:
         'empty': (240, 240, 240),
         'obstacle': (30, 30, 30),
         'visited': (52, 152, 219),      # Blue
+        'visited_backward': (236, 112, 99),  # Salmon, second frontier of bidirectional searches
         'path': (46, 204, 113),          # Green
         'start': (155, 89, 182),         # Purple
         'end': (230, 126, 34),           # Orange
@@ -30,6 +33,8 @@ class GridRenderer:
         self.grid_offset_x = grid_offset_x
         self.grid_offset_y = grid_offset_y
         self.cell_size = cell_size
+        # Part of the scene shown on screen, None for all of it (see set_viewport)
+        self.viewport = None
     
     def draw_background(self, screen):
         """Draw the background."""
@@ -174,8 +179,7 @@ class GridRenderer:
     
     def draw_title(self, screen, window_width, title_text):
         """Draw title text."""
-        font = pygame.font.SysFont("arial", 32, bold=True)
-        title_surf = font.render(title_text, True, (255, 255, 255))
+        title_surf = TextCache.render(title_text, 32, (255, 255, 255), bold=True)
         title_rect = title_surf.get_rect(center=(window_width // 2, 20))
         screen.blit(title_surf, title_rect)
     
@@ -186,23 +190,21 @@ class GridRenderer:
         
         x1 = self.grid_offset_x
         y1 = self.grid_offset_y
-        x2 = self.grid_offset_x + cols * self.cell_size
-        y2 = self.grid_offset_y + rows * self.cell_size
+        width, height = self.shown_size(grid)
         
         pygame.draw.rect(
             screen,
             self.COLORS['grid_border'],
-            (x1, y1, cols * self.cell_size, rows * self.cell_size),
+            (x1, y1, width, height),
             3
         )
     
     def draw_stats(self, screen, stats_dict):
         """Draw statistics on screen."""
-        font = pygame.font.SysFont("arial", 14)
         y_offset = 10
         
         for key, value in stats_dict.items():
-            text_surf = font.render(f"{key}: {value}", True, (200, 200, 200))
+            text_surf = TextCache.render(f"{key}: {value}", 14, (200, 200, 200))
             screen.blit(text_surf, (10, y_offset))
             y_offset += 25
 
@@ -216,15 +218,10 @@ class GridRenderer:
             window_height: height of the window
             grid: the grid (2D list) used to compute bottom position
         """
-        font = pygame.font.SysFont("arial", 14)
-
         # Compute grid area
-        rows = len(grid)
-        cols = len(grid[0]) if rows > 0 else 0
         grid_x = self.grid_offset_x
         grid_y = self.grid_offset_y
-        grid_w = cols * self.cell_size
-        grid_h = rows * self.cell_size
+        grid_w, grid_h = self.shown_size(grid)
 
         # Start drawing a little below the grid
         start_y = grid_y + grid_h + 10
@@ -233,7 +230,203 @@ class GridRenderer:
         y_offset = start_y
         for key, value in stats_dict.items():
             text = f"{key}: {value}"
-            text_surf = font.render(text, True, (200, 200, 200))
+            text_surf = TextCache.render(text, 14, (200, 200, 200))
             text_x = grid_x + (grid_w // 2) - (text_surf.get_width() // 2)
             screen.blit(text_surf, (text_x, y_offset))
             y_offset += 20
+
+        return self.stats_bottom_area(len(stats_dict), window_width, grid)
+
+    def stats_bottom_area(self, line_count, window_width, grid):
+        """Screen rect covered by draw_stats_bottom() for the given number of lines."""
+        start_y = self.grid_offset_y + self.shown_size(grid)[1] + 10
+        return pygame.Rect(0, start_y, window_width, line_count * 20)
+
+    def shown_size(self, grid):
+        """On-screen (width, height) of the grid, cut to the viewport."""
+        rows = len(grid)
+        cols = len(grid[0]) if rows > 0 else 0
+        width, height = cols * self.cell_size, rows * self.cell_size
+        if self.viewport is not None:
+            width, height = min(width, self.viewport.width), min(height, self.viewport.height)
+        return width, height
+
+    # --------------------------------------------------
+    # RETAINED-MODE RENDERING
+    # --------------------------------------------------
+    # Instead of redrawing every cell each frame, the static grid and
+    # obstacles are drawn once onto an offscreen layer. A scene surface
+    # (a copy of that layer) then accumulates visited and path cells as the
+    # animation advances, and only the cells painted this frame are copied
+    # to the screen and reported as dirty rects.
+
+    def build_scene(self, grid, start_node=None, end_node=None, waypoints=()):
+        """
+        Cache the static grid on an offscreen surface and start a new scene.
+
+        Args:
+            grid: 2D grid of nodes (list of lists or ArrayGrid)
+            start_node, end_node, waypoints: Markers kept on top of painted cells
+        """
+        self.static_layer = self._static_layer(grid)
+        self.set_markers(start_node, end_node, waypoints)
+        self.reset_scene()
+
+    def set_markers(self, start_node=None, end_node=None, waypoints=()):
+        """Replace the start, end and waypoint markers; shown from the next reset_scene()."""
+        self.markers = {}
+        for waypoint in waypoints:
+            self.markers[self._as_position(waypoint)] = ('waypoint', 2)
+        if start_node:
+            self.markers[self._as_position(start_node)] = ('start', 3)
+        if end_node:
+            self.markers[self._as_position(end_node)] = ('end', 3)
+
+    def update_cells(self, grid, cells):
+        """
+        Repaint a few cells of the static layer after their obstacles changed.
+
+        Cheaper than build_scene() for a click's worth of edits; the scene
+        shows them from the next reset_scene().
+        """
+        for row, col in cells:
+            color = self.COLORS['obstacle' if grid[row][col].is_obstacle else 'empty']
+            self._paint_cell(self.static_layer, row, col, color, self.COLORS['grid_line'], 1)
+
+    def _static_layer(self, grid):
+        """Empty and obstacle cells with their grid lines, built as one pixel array."""
+        blocked = self._obstacle_mask(grid)
+        rows, cols = blocked.shape
+        size = self.cell_size
+
+        colors = np.array([self.COLORS['empty'], self.COLORS['obstacle']], dtype=np.uint8)
+        # surfarray indexes pixels [x, y], so build the picture column-major
+        pixels = colors[blocked.T.astype(np.intp)]
+        pixels = pixels.repeat(size, axis=0).repeat(size, axis=1)
+        if self._has_lines():
+            line = np.arange(size * max(cols, rows)) % size
+            on_line = (line == 0) | (line == size - 1)
+            pixels[on_line[:cols * size], :] = self.COLORS['grid_line']
+            pixels[:, on_line[:rows * size]] = self.COLORS['grid_line']
+
+        layer = pygame.Surface((cols * size, rows * size))
+        if rows and cols:
+            pygame.surfarray.blit_array(layer, pixels)
+        return layer
+
+    def reset_scene(self):
+        """Discard painted cells, restoring the scene to the static layer."""
+        self.scene = self.static_layer.copy()
+        for position in self.markers:
+            self._paint_marker(position)
+        self._paint_scene_border()
+
+    def blit_scene(self, screen):
+        """Copy the shown part of the scene to the screen and return the covered rect."""
+        return screen.blit(self.scene, (self.grid_offset_x, self.grid_offset_y), self.view_area())
+
+    # Grids too big for their screen area even at 1px cells show a scrollable
+    # window of the scene: blits and clicks go through view_area().
+
+    def set_viewport(self, width=None, height=None):
+        """Show at most width x height scene pixels, from the top left; None shows all."""
+        self.viewport = None if width is None else pygame.Rect(0, 0, width, height)
+
+    def scroll(self, dx, dy):
+        """Move the viewport by (dx, dy) pixels within the scene. Returns whether it moved."""
+        if self.viewport is None:
+            return False
+        before = self.viewport.topleft
+        scene_width, scene_height = self.scene.get_size()
+        self.viewport.x = max(0, min(self.viewport.x + dx, scene_width - self.viewport.width))
+        self.viewport.y = max(0, min(self.viewport.y + dy, scene_height - self.viewport.height))
+        return self.viewport.topleft != before
+
+    def view_area(self):
+        """The part of the scene on screen, in scene pixels."""
+        area = self.scene.get_rect()
+        return area if self.viewport is None else area.clip(self.viewport)
+
+    def cell_at(self, pos):
+        """(row, col) of the cell under a screen position, None off the shown scene."""
+        view = self.view_area()
+        x = pos[0] - self.grid_offset_x
+        y = pos[1] - self.grid_offset_y
+        if not (0 <= x < view.width and 0 <= y < view.height):
+            return None
+        return ((y + view.y) // self.cell_size, (x + view.x) // self.cell_size)
+
+    def paint_cells(self, screen, cells, color_key):
+        """
+        Paint cells onto the scene and copy just those cells to the screen.
+
+        Args:
+            screen: pygame surface
+            cells: Iterable of (row, col) tuples
+            color_key: Key into COLORS, e.g. 'visited' or 'path'
+
+        Returns:
+            List of dirty screen rects
+        """
+        color = self.COLORS[color_key]
+        size = self.cell_size
+        areas = []
+
+        for position in cells:
+            row, col = position
+            self._paint_cell(self.scene, row, col, color, self.COLORS['grid_line'], 1)
+            if position in self.markers:
+                self._paint_marker(position)
+            areas.append(pygame.Rect(col * size, row * size, size, size))
+
+        # The grid border overlaps the outer cells and stays on top of them
+        self._paint_scene_border()
+
+        # Copy only what the viewport shows
+        view = self.view_area()
+        offset = (self.grid_offset_x - view.x, self.grid_offset_y - view.y)
+        areas = [area.clip(view) for area in areas]
+        return [screen.blit(self.scene, area.move(offset), area) for area in areas if area]
+
+    @staticmethod
+    def merge_dirty(rects, limit=64):
+        """Collapse long dirty rect lists into their bounding rect."""
+        if len(rects) <= limit:
+            return rects
+        return [rects[0].unionall(rects[1:])]
+
+    def _paint_marker(self, position):
+        color_key, border = self.markers[position]
+        self._paint_cell(self.scene, position[0], position[1],
+                         self.COLORS[color_key], (255, 255, 255), border)
+
+    def _paint_scene_border(self):
+        pygame.draw.rect(self.scene, self.COLORS['grid_border'], self.scene.get_rect(), 3)
+
+    def _has_lines(self):
+        # Below 4px a 1px line on each side would leave no room for the color
+        return self.cell_size >= 4
+
+    def _paint_cell(self, surface, row, col, color, border_color, border):
+        rect = (col * self.cell_size, row * self.cell_size, self.cell_size, self.cell_size)
+        pygame.draw.rect(surface, color, rect)
+        if self._has_lines():
+            pygame.draw.rect(surface, border_color, rect, border)
+
+    @staticmethod
+    def _obstacle_mask(grid):
+        """(rows, cols) bool array of obstacles, the array itself on ArrayGrids."""
+        obstacle = getattr(grid, 'obstacle', None)
+        if obstacle is not None:
+            return np.asarray(obstacle, dtype=np.bool_)
+        rows = len(grid)
+        cols = len(grid[0]) if rows > 0 else 0
+        mask = np.zeros((rows, cols), dtype=np.bool_)
+        for r, row in enumerate(grid):
+            for c, node in enumerate(row):
+                mask[r, c] = getattr(node, 'is_obstacle', False)
+        return mask
+
+    @staticmethod
+    def _as_position(node):
+        return node if isinstance(node, tuple) else (node.row, node.col)
@@ -0,0 +1,63 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache:
+    """
+    Shared cache of fonts and rendered text surfaces.
+
+    pygame.font.SysFont() lookups and font.render() calls are expensive, and
+    most labels are identical from one frame to the next. Fonts are cached
+    for the lifetime of the app; rendered surfaces are kept in an LRU keyed
+    by (text, size, bold, color). Returned surfaces are shared, so callers
+    must only blit them, never draw onto them.
+    """
+
+    FONT_NAME = "arial"
+    MAX_SURFACES = 512
+
+    _fonts = {}
+    _surfaces = OrderedDict()
+
+    @classmethod
+    def font(cls, size, bold=False):
+        """Get the (cached) font for a size and weight."""
+        key = (size, bold)
+        font = cls._fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(cls.FONT_NAME, size, bold=bold)
+            cls._fonts[key] = font
+        return font
+
+    @classmethod
+    def render(cls, text, size, color, bold=False):
+        """
+        Get an antialiased surface for text, rendering it only on a cache miss.
+
+        Args:
+            text: String to render
+            size: Font size
+            color: RGB tuple
+            bold: Whether to use the bold font
+
+        Returns:
+            pygame.Surface shared with other callers
+        """
+        key = (text, size, bold, color)
+        surface = cls._surfaces.get(key)
+        if surface is not None:
+            cls._surfaces.move_to_end(key)
+            return surface
+
+        surface = cls.font(size, bold).render(text, True, color)
+        cls._surfaces[key] = surface
+        if len(cls._surfaces) > cls.MAX_SURFACES:
+            cls._surfaces.popitem(last=False)
+        return surface
+
+    @classmethod
+    def clear(cls):
+        """Drop all cached fonts and surfaces, e.g. after pygame.quit()."""
+        cls._fonts.clear()
+        cls._surfaces.clear()
@@ -31,8 +31,12 @@ class Window:
             # Delegate handling to current page
             self.current_page.handle_events(events)
             self.current_page.update(dt)
-            self.current_page.draw(self.screen)
+            dirty_rects = self.current_page.draw(self.screen)
 
-            pygame.display.flip()
+            # Pages may return the rects they changed instead of needing a full flip
+            if dirty_rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty_rects)
 
         pygame.quit()